@@ -219,6 +219,7 @@ module "go-to-deep" {
   backup_vault_name = module.auroraDB.backup_vault_name
   backup_vault_arn  = module.auroraDB.backup_vault_arn
   aurora_cluster_id = module.auroraDB.cluster_id
+  export_kms_key_arn = var.aurora_export_kms_key_arn
   project_name = var.project_name
   tags = var.tags
 }
@@ -246,8 +247,9 @@ module "iam-fire" {
 module "sg-checker" {
   source = "./modules/automation/SG-checker"
 
-  project_name = var.project_name
-  tags         = var.tags
+  project_name   = var.project_name
+  internal_cidrs = [module.vpc.vpc_cidr_block]
+  tags           = var.tags
 }
 
 ################################################################################
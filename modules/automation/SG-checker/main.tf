@@ -37,6 +37,37 @@ resource "aws_lambda_permission" "permission-sg-checker" {
     source_arn = aws_cloudwatch_event_rule.sg-checker-rule.arn
 }
 
+# 계정 전체 보안 그룹 정기 일괄 검사
+resource "aws_cloudwatch_event_rule" "sg-checker-scan-rule" {
+    count = var.enable_scheduled_scan ? 1 : 0
+    name = "${var.event_rule_name}-scan"
+    description = "Scheduled account-wide security group scan"
+    schedule_expression = var.schedule_expression
+    tags = merge(
+        var.tags,
+        {
+            Name = "${var.project_name}-${var.event_rule_name}-scan"
+        }
+    )
+}
+
+resource "aws_cloudwatch_event_target" "sg-checker-scan-target" {
+    count = var.enable_scheduled_scan ? 1 : 0
+    rule = aws_cloudwatch_event_rule.sg-checker-scan-rule[0].name
+    arn = aws_lambda_function.sg-checker-lambda.arn
+    target_id = "lambda-scan"
+    input = jsonencode({ mode = "scan" })
+}
+
+resource "aws_lambda_permission" "permission-sg-checker-scan" {
+    count = var.enable_scheduled_scan ? 1 : 0
+    statement_id = "AllowExecutionFromEventBridgeScan"
+    action = "lambda:InvokeFunction"
+    function_name = aws_lambda_function.sg-checker-lambda.function_name
+    principal = "events.amazonaws.com"
+    source_arn = aws_cloudwatch_event_rule.sg-checker-scan-rule[0].arn
+}
+
 resource "aws_iam_role" "sg-checker-role" {
     name = var.iam_role_name
     assume_role_policy = jsonencode({
@@ -90,6 +121,19 @@ resource "aws_iam_role_policy" "sg-checker-policy" {
                 "arn:aws:ec2:*:*:network-interface/*"
             ]
         },
+        {
+            Sid    = "AllowEC2Describe"
+            Effect = "Allow"
+            Action = [
+                "ec2:DescribeSecurityGroups",
+                "ec2:DescribeInstances",
+                "ec2:DescribeNetworkInterfaces",
+                "ec2:DescribeSecurityGroupRules",
+                "ec2:DescribeManagedPrefixLists",
+                "ec2:GetManagedPrefixListEntries"
+            ]
+            Resource = "*"
+        },
         {
             Sid    = "AllowRDSDescribe"
             Effect = "Allow"
@@ -106,6 +150,14 @@ resource "aws_iam_role_policy" "sg-checker-policy" {
                 "elasticloadbalancing:DescribeLoadBalancers"
             ]
             Resource = "*"
+        },
+        {
+            Sid    = "AllowLambdaList"
+            Effect = "Allow"
+            Action = [
+                "lambda:ListFunctions"
+            ]
+            Resource = "*"
         }
         ]
     })
@@ -125,9 +177,18 @@ resource "aws_lambda_function" "sg-checker-lambda" {
         variables = {
             AUTO_DELETE = var.auto_delete ? "true" : "false"
             DELETE_ONLY_CRITICAL = var.delete_only_critical ? "true" : "false"
+            REMEDIATION_MODE = var.remediation_mode
             TARGET_TAG_KEY = var.target_tag_key != "" ? var.target_tag_key : ""
             TARGET_TAG_VALUE = var.target_tag_value != "" ? var.target_tag_value : ""
             EXCEPTION_TAG_KEY = var.exception_tag_key != "" ? var.exception_tag_key : "SGCheckerException"
+            SG_POLICY_RULES = length(var.policy_rules) > 0 ? jsonencode(var.policy_rules) : ""
+            INTERNAL_CIDRS = join(",", var.internal_cidrs)
+            TRUSTED_CIDRS = join(",", var.trusted_cidrs)
+            BROAD_PREFIX_IPV4 = tostring(var.broad_prefix_ipv4)
+            BROAD_PREFIX_IPV6 = tostring(var.broad_prefix_ipv6)
+            LOG_LEVEL = var.log_level
+            LOG_MAX_CHARS = tostring(var.log_max_chars)
+            LOG_SAMPLE_RATE = tostring(var.log_sample_rate)
         }
     }
     
@@ -22,3 +22,7 @@ output "iam_role_name" {
   value = aws_iam_role.sg-checker-role.name
 }
 
+
+output "scan_event_rule_arn" {
+    value = try(aws_cloudwatch_event_rule.sg-checker-scan-rule[0].arn, null)
+}
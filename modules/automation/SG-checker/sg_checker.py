@@ -1,36 +1,446 @@
 import json
 import logging
 import os
+import random
+import time
+from bisect import bisect_right
+from functools import lru_cache
 from ipaddress import ip_network
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO"))
 
-ec2 = boto3.client("ec2")
+# boto3 클라이언트 설정 (연결 풀, 적응형 재시도, 타임아웃)
+BOTO_CONFIG = Config(
+    max_pool_connections=20,
+    retries={"max_attempts": 5, "mode": "adaptive"},
+    connect_timeout=3,
+    read_timeout=10,
+)
+
+
+@lru_cache(maxsize=None)
+def get_client(service: str):
+    """boto3 클라이언트를 처음 사용할 때 생성하고 컨테이너 수명 동안 재사용"""
+    return boto3.client(service, config=BOTO_CONFIG)
+
+
+# 구조화 로그 설정 (허용 목록 필드만, 크기 제한, 샘플링)
+LOG_MAX_CHARS = int(os.getenv("LOG_MAX_CHARS", "2048"))
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_EVENT_FIELDS = ("id", "source", "detail-type", "time", "account", "region", "mode")
+LOG_DETAIL_FIELDS = ("eventName", "eventSource", "eventID", "awsRegion")
+
+
+class LazyJson:
+    """로그 레코드가 실제로 출력될 때만 JSON으로 직렬화하고 LOG_MAX_CHARS 길이로 자릅니다."""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self) -> str:
+        text = json.dumps(self.value, ensure_ascii=False, default=str)
+        if len(text) <= LOG_MAX_CHARS:
+            return text
+        return f"{text[:LOG_MAX_CHARS]}...(truncated {len(text) - LOG_MAX_CHARS} chars)"
+
+
+def event_summary(event: dict) -> dict:
+    """이벤트에서 허용 목록 필드만 추린 요약 (SQS 배치는 메시지 수만 기록)"""
+    summary = {key: event[key] for key in LOG_EVENT_FIELDS if key in event}
+    detail = event.get("detail")
+    if isinstance(detail, dict):
+        summary["detail"] = {key: detail[key] for key in LOG_DETAIL_FIELDS if key in detail}
+    if "Records" in event:
+        summary["records"] = len(event["Records"])
+    return summary
 
-# SSM 사용 권장 포트 (무조건 차단)
-BLOCKED_PORTS = {
-    22: "SSH - Use SSM Session Manager instead",
-    3389: "RDP - Use SSM Session Manager instead"
-}
 
-# HTTPS는 허용
-ALLOWED_PORTS = {443}
+def log_event(message: str, event: dict) -> None:
+    """LOG_SAMPLE_RATE 비율로 이벤트 요약을 INFO 로그로 남깁니다."""
+    if LOG_SAMPLE_RATE < 1.0 and random.random() >= LOG_SAMPLE_RATE:
+        return
+    logger.info("%s: %s", message, LazyJson(event_summary(event)))
+
+
+# 기본 보안 그룹 정책 (선언형 규칙, 위에서부터 먼저 일치하는 규칙이 적용됨)
+#   direction   : "ingress" | "egress" | "both"
+#   protocols   : "tcp", "udp", "icmp", "icmpv6", "-1"(모든 트래픽), "*"(모든 프로토콜)
+#   ports       : 포트 또는 [from, to] 구간 목록 (생략 시 전체 포트, tcp/udp 규칙에만 지정 가능,
+#                 "*" 규칙에 지정하면 tcp/udp에만 적용)
+#   cidr_classes: 소스/대상 분류 (CIDR/prefix list 엔트리는 classify_cidr 결과:
+#                 world, broad, external, trusted, internal /
+#                 참조 SG는 "group" 또는 다른 계정의 "cross_account_group")
+#   severity    : finding 심각도 / action "allow"는 finding 없이 이후 규칙을 가림
+# 모든 트래픽(-1) 권한은 "-1" 규칙이 있으면 그 규칙으로, 없으면 tcp/udp 전체 포트 규칙으로 평가합니다.
+# 기본 egress 규칙(-1 → 0.0.0.0/0)은 모든 SG에 존재하므로 all-traffic-egress-world로 명시적으로 허용하고
+# egress는 특정 포트만 검사합니다. 이 규칙을 SG_POLICY_RULES에서 빼거나 severity를 주면
+# 모든 트래픽 egress도 검사합니다.
+DEFAULT_POLICY_RULES = [
+    {
+        "name": "all-traffic-world",
+        "direction": "ingress",
+        "protocols": ["-1"],
+        "cidr_classes": ["world", "broad"],
+        "severity": "critical",
+        "description": "All ports and protocols exposed to internet",
+    },
+    {
+        "name": "ssh-world",
+        "direction": "ingress",
+        "protocols": ["tcp", "udp"],
+        "ports": [22],
+        "cidr_classes": ["world", "broad"],
+        "severity": "critical",
+        "description": "SSH - Use SSM Session Manager instead",
+        "action": "block",
+    },
+    {
+        "name": "rdp-world",
+        "direction": "ingress",
+        "protocols": ["tcp", "udp"],
+        "ports": [3389],
+        "cidr_classes": ["world", "broad"],
+        "severity": "critical",
+        "description": "RDP - Use SSM Session Manager instead",
+        "action": "block",
+    },
+    {
+        "name": "https-world",
+        "direction": "ingress",
+        "protocols": ["tcp", "udp"],
+        "ports": [443],
+        "cidr_classes": ["world", "broad"],
+        "action": "allow",
+    },
+    {
+        "name": "port-world",
+        "direction": "ingress",
+        "protocols": ["tcp", "udp"],
+        "cidr_classes": ["world", "broad"],
+        "severity": "high",
+        "description": "Port {ports} exposed to internet",
+    },
+    {
+        "name": "protocol-world",
+        "direction": "ingress",
+        "protocols": ["*"],
+        "cidr_classes": ["world", "broad"],
+        "severity": "high",
+        "description": "Protocol {protocol} exposed to internet",
+    },
+    {
+        "name": "all-traffic-cross-account-group",
+        "direction": "ingress",
+        "protocols": ["-1"],
+        "cidr_classes": ["cross_account_group"],
+        "severity": "high",
+        "description": "All traffic allowed from security group {cidr} in another account",
+    },
+    {
+        "name": "all-traffic-egress-world",
+        "direction": "egress",
+        "protocols": ["-1"],
+        "cidr_classes": ["world", "broad"],
+        "action": "allow",
+    },
+    {
+        "name": "smtp-egress-world",
+        "direction": "egress",
+        "protocols": ["tcp"],
+        "ports": [25],
+        "cidr_classes": ["world", "broad"],
+        "severity": "high",
+        "description": "Outbound SMTP (port {ports}) open to internet",
+    },
+]
+
+# JSON 규칙 목록으로 기본 정책을 대체 (형식은 DEFAULT_POLICY_RULES와 동일)
+POLICY_RULES_ENV = "SG_POLICY_RULES"
+
+SEVERITIES = ("critical", "high", "medium", "low")
+DIRECTIONS = ("ingress", "egress")
+PORT_PROTOCOLS = ("tcp", "udp")
+MAX_PORT = 65535
+PROTOCOL_ALIASES = {"6": "tcp", "17": "udp", "1": "icmp", "58": "icmpv6", "all": "-1"}
+
+# 방향별 규칙 목록 키
+PERMISSION_KEYS = {"ingress": "IpPermissions", "egress": "IpPermissionsEgress"}
+
+# CIDR 노출 분류 기준 (INTERNAL_CIDRS/TRUSTED_CIDRS 밖에서 이보다 짧은 prefix는 broad)
+BROAD_PREFIX_IPV4 = int(os.getenv("BROAD_PREFIX_IPV4", "16"))
+BROAD_PREFIX_IPV6 = int(os.getenv("BROAD_PREFIX_IPV6", "48"))
+PRIVATE_CIDRS = ["10.0.0.0/8", "172.16.0.0/12", "192.168.0.0/16", "100.64.0.0/10", "fc00::/7"]
+
+# prefix list 엔트리 캐시 ((ID, 버전) -> 분류별 CIDR 목록) 및 참조 SG 이름 캐시 (warm 컨테이너 동안 재사용)
+PREFIX_LIST_BATCH_SIZE = 100
+FILTER_VALUES_MAX = 200
+_prefix_list_entry_cache: Dict[Tuple[str, int], Dict[str, Tuple[str, ...]]] = {}
+_referenced_group_cache: Dict[str, str] = {}
+
+# 자동 조치 방식 ("delete": 보안 그룹 삭제 / "revoke": 문제 규칙만 회수)
+REMEDIATION_MODES = ("delete", "revoke")
 
 # 예외 처리용 태그 키
 EXCEPTION_TAG_KEY = "SGCheckerException"  # 이 태그가 있으면 검사 제외
 
+# EKS 노드 식별용 인스턴스 태그
+EKS_CLUSTER_TAG_KEY = "eks:cluster-name"
+
+
+def normalize_protocol(protocol) -> str:
+    """IpProtocol 값을 규칙 비교용 이름으로 정규화 ("6" -> "tcp", "all" -> "-1")"""
+    protocol = str(protocol).lower()
+    return PROTOCOL_ALIASES.get(protocol, protocol)
+
 
-def is_world_cidr(cidr: str) -> bool:
-    """0.0.0.0/0 또는 ::/0인지 확인"""
+class CidrIndex:
+    """
+    내부/신뢰 대역 radix(이진 트라이) 인덱스
+    주소 체계별로 네트워크 주소 비트를 따라 노드를 만들고 대역 끝 노드에 분류를 기록합니다.
+    조회는 CIDR의 prefix 길이만큼만 비트를 따라가며 가장 구체적인 대역의 분류를 반환합니다.
+    """
+    
+    def __init__(self):
+        # 노드: [0 비트 자식, 1 비트 자식, 분류]
+        self.roots = {4: [None, None, None], 6: [None, None, None]}
+        self.size = 0
+    
+    def add(self, cidr: str, label: str) -> None:
+        net = ip_network(cidr, strict=False)
+        node = self.roots[net.version]
+        bits = int(net.network_address)
+        for depth in range(net.prefixlen):
+            bit = (bits >> (net.max_prefixlen - 1 - depth)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, None]
+            node = node[bit]
+        node[2] = label
+        self.size += 1
+    
+    def lookup(self, net) -> Optional[str]:
+        """net 전체를 포함하는 가장 구체적인 대역의 분류 (없으면 None)"""
+        node = self.roots[net.version]
+        label = node[2]
+        bits = int(net.network_address)
+        for depth in range(net.prefixlen):
+            node = node[(bits >> (net.max_prefixlen - 1 - depth)) & 1]
+            if node is None:
+                break
+            if node[2] is not None:
+                label = node[2]
+        return label
+
+
+def _env_cidrs(name: str) -> List[str]:
+    """쉼표로 구분된 CIDR 환경 변수 목록"""
+    return [value.strip() for value in os.getenv(name, "").split(",") if value.strip()]
+
+
+@lru_cache(maxsize=None)
+def get_cidr_index() -> CidrIndex:
+    """사설/VPC 대역(internal)과 신뢰 대역(trusted) 인덱스를 컨테이너당 한 번 생성"""
+    index = CidrIndex()
+    for label, cidrs in (
+        ("internal", PRIVATE_CIDRS + _env_cidrs("INTERNAL_CIDRS")),
+        ("trusted", _env_cidrs("TRUSTED_CIDRS")),
+    ):
+        for cidr in cidrs:
+            try:
+                index.add(cidr, label)
+            except ValueError:
+                logger.warning(f"Ignoring invalid {label} CIDR: {cidr}")
+    logger.info(f"Built CIDR index: {index.size} ranges")
+    return index
+
+
+@lru_cache(maxsize=4096)
+def classify_cidr(cidr: str) -> Optional[str]:
+    """
+    CIDR 노출 분류 (잘못된 값은 None)
+      world   : 0.0.0.0/0, ::/0
+      internal: 사설 대역 또는 INTERNAL_CIDRS(VPC 대역)에 포함
+      trusted : TRUSTED_CIDRS(사내 egress, 파트너 대역)에 포함
+      broad   : 그 외 중 prefix 길이가 BROAD_PREFIX_IPV4/IPV6보다 짧은 대역
+      external: 그 외 좁은 외부 대역
+    """
     try:
         net = ip_network(cidr, strict=False)
-        return net.prefixlen == 0
-    except Exception:
-        return False
+    except ValueError:
+        return None
+    if net.prefixlen == 0:
+        return "world"
+    label = get_cidr_index().lookup(net)
+    if label:
+        return label
+    threshold = BROAD_PREFIX_IPV4 if net.version == 4 else BROAD_PREFIX_IPV6
+    return "broad" if net.prefixlen < threshold else "external"
+
+
+def _rule_port_intervals(raw_ports) -> List[Tuple[int, int]]:
+    """규칙의 ports 값을 (from, to) 구간 목록으로 변환"""
+    if raw_ports is None:
+        return [(0, MAX_PORT)]
+    intervals = []
+    for item in raw_ports:
+        start, end = (item, item) if isinstance(item, int) else item
+        if not 0 <= start <= end <= MAX_PORT:
+            raise ValueError(f"Invalid port range in policy rule: {item}")
+        intervals.append((start, end))
+    return intervals
+
+
+def normalize_policy_rule(raw: Dict, order: int) -> Dict:
+    """선언형 규칙 하나를 검증하고 컴파일용 형태로 정규화"""
+    name = raw.get("name") or f"rule-{order}"
+    direction = raw.get("direction", "ingress")
+    directions = DIRECTIONS if direction == "both" else (direction,)
+    if any(d not in DIRECTIONS for d in directions):
+        raise ValueError(f"Invalid direction in policy rule {name}: {direction}")
+    
+    action = raw.get("action")
+    severity = raw.get("severity")
+    if action != "allow" and severity not in SEVERITIES:
+        raise ValueError(f"Invalid severity in policy rule {name}: {severity}")
+    
+    protocols = [p if p == "*" else normalize_protocol(p) for p in raw.get("protocols", ["*"])]
+    portless = [p for p in protocols if p not in PORT_PROTOCOLS and p != "*"]
+    if raw.get("ports") is not None and portless:
+        raise ValueError(f"Ports in policy rule {name} apply only to tcp/udp, not {', '.join(portless)}")
+    
+    description = raw.get("description", "Rule {name} matched")
+    try:
+        description.format(ports="", protocol="", cidr="", name="")
+    except (KeyError, IndexError, ValueError) as e:
+        raise ValueError(f"Invalid description template in policy rule {name}: {e}")
+    
+    return {
+        "name": name,
+        "order": order,
+        "directions": directions,
+        "protocols": protocols,
+        "ports": _rule_port_intervals(raw.get("ports")),
+        "all_ports": raw.get("ports") is None,
+        "cidr_classes": list(raw.get("cidr_classes", ["world"])),
+        "severity": severity,
+        "description": description,
+        "action": action,
+    }
+
+
+class CompiledPolicy:
+    """
+    선언형 규칙을 (방향, 프로토콜, CIDR 분류)별 조회 테이블로 컴파일한 정책
+    tcp/udp는 0-65535를 규칙이 바뀌는 경계로 나눈 구간 테이블(bisect 조회),
+    그 외 프로토콜은 키당 첫 번째 일치 규칙 하나를 저장합니다.
+    포트를 지정한 "*" 규칙은 tcp/udp 구간 테이블에만 등록합니다.
+    """
+    
+    def __init__(self, rules: List[Dict]):
+        self.rules = [normalize_policy_rule(raw, order) for order, raw in enumerate(rules)]
+        port_rules: Dict[Tuple[str, str, str], List[Dict]] = {}
+        self.portless: Dict[Tuple[str, str, str], Dict] = {}
+        
+        for rule in self.rules:
+            for direction in rule["directions"]:
+                for cidr_class in rule["cidr_classes"]:
+                    for protocol in rule["protocols"]:
+                        # "*"는 tcp/udp 구간 테이블과 나머지 프로토콜 와일드카드 양쪽에 등록
+                        if protocol in PORT_PROTOCOLS or protocol == "*":
+                            for port_protocol in (PORT_PROTOCOLS if protocol == "*" else (protocol,)):
+                                port_rules.setdefault((direction, port_protocol, cidr_class), []).append(rule)
+                        if protocol not in PORT_PROTOCOLS and rule["all_ports"]:
+                            self.portless.setdefault((direction, protocol, cidr_class), rule)
+        
+        self.port_tables = {key: self._build_port_table(rules) for key, rules in port_rules.items()}
+    
+    @staticmethod
+    def _build_port_table(rules: List[Dict]) -> Tuple[List[int], List[Optional[Dict]]]:
+        """규칙 목록(우선순위 순)을 경계 시작 포트 목록과 구간별 적용 규칙 목록으로 변환"""
+        bounds = {0, MAX_PORT + 1}
+        for rule in rules:
+            for start, end in rule["ports"]:
+                bounds.update((start, end + 1))
+        bounds = sorted(bounds)
+        
+        starts: List[int] = []
+        winners: List[Optional[Dict]] = []
+        for start in bounds[:-1]:
+            winner = next(
+                (rule for rule in rules if any(lo <= start <= hi for lo, hi in rule["ports"])),
+                None
+            )
+            # 같은 규칙이 이어지는 구간은 하나로 병합
+            if winners and winners[-1] is winner:
+                continue
+            starts.append(start)
+            winners.append(winner)
+        return starts, winners
+    
+    def match(self, direction: str, protocol: str, from_port: Optional[int], to_port: Optional[int],
+              cidr_class: str) -> List[Tuple[str, Dict]]:
+        """권한 하나에 일치하는 (포트 표시, 규칙) 목록 (allow 규칙 구간은 제외)"""
+        if protocol == "-1":
+            rule = self.portless.get((direction, "-1", cidr_class))
+            if rule is not None:
+                return [] if rule["action"] == "allow" else [("all", rule)]
+            # "-1" 규칙이 없으면 tcp/udp 전체 포트 규칙 적용 ("*" 규칙은 구간 테이블에 포함)
+            matches = []
+            for port_protocol in PORT_PROTOCOLS:
+                for match in self.match(direction, port_protocol, None, None, cidr_class):
+                    if match not in matches:
+                        matches.append(match)
+            if matches:
+                return matches
+        
+        if protocol in PORT_PROTOCOLS:
+            table = self.port_tables.get((direction, protocol, cidr_class))
+            if not table:
+                return []
+            if from_port is None or to_port is None or from_port < 0:
+                from_port, to_port = 0, MAX_PORT
+            starts, winners = table
+            matches = []
+            i = bisect_right(starts, from_port) - 1
+            while i < len(starts) and starts[i] <= to_port:
+                rule = winners[i]
+                if rule is not None and rule["action"] != "allow":
+                    end = starts[i + 1] - 1 if i + 1 < len(starts) else MAX_PORT
+                    matches.append((format_port_range(max(starts[i], from_port), min(end, to_port)), rule))
+                i += 1
+            return matches
+        
+        candidates = [
+            rule for rule in (
+                self.portless.get((direction, protocol, cidr_class)),
+                self.portless.get((direction, "*", cidr_class)),
+            ) if rule is not None
+        ]
+        if not candidates:
+            return []
+        rule = min(candidates, key=lambda r: r["order"])
+        return [] if rule["action"] == "allow" else [("all", rule)]
+
+
+@lru_cache(maxsize=None)
+def get_compiled_policy() -> CompiledPolicy:
+    """정책을 컨테이너당 한 번 컴파일 (SG_POLICY_RULES 환경 변수가 있으면 기본 정책 대체)"""
+    raw = os.getenv(POLICY_RULES_ENV, "")
+    rules = json.loads(raw) if raw else DEFAULT_POLICY_RULES
+    policy = CompiledPolicy(rules)
+    logger.info(f"Compiled security group policy: {len(policy.rules)} rules, {len(policy.port_tables)} port tables")
+    return policy
+
+
+def format_port_range(start: int, end: int) -> str:
+    """포트 구간 문자열 (단일 포트는 "22", 범위는 "1024-65535")"""
+    return str(start) if start == end else f"{start}-{end}"
 
 
 def is_exception_security_group(sg: Dict, exception_tag: str) -> bool:
@@ -50,8 +460,149 @@ def is_exception_security_group(sg: Dict, exception_tag: str) -> bool:
     return False
 
 
-def check_vulnerable_ports(sg: Dict, exception_tag: str) -> List[Dict]:
-    """0.0.0.0/0로 열린 취약한 포트 검사"""
+def chunked(items: List[str], size: int) -> Iterator[List[str]]:
+    """목록을 size 크기 묶음으로 분할"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class ReferenceResolver:
+    """
+    규칙이 참조하는 managed prefix list와 보안 그룹 해석기
+    prefix list 버전은 호출마다 한 번 일괄 조회하고, 엔트리는 (ID, 버전) 키로
+    컨테이너 수준 캐시에 보관하여 버전이 바뀐 목록만 다시 가져옵니다.
+    참조 SG 이름은 그룹 ID 키로 캐시하며 일괄 검사에서는 조회한 그룹 목록으로 채웁니다.
+    """
+    
+    def __init__(self):
+        self.prefix_list_versions: Dict[str, Optional[Tuple[int, str]]] = {}
+    
+    def prefetch(self, groups: List[Dict]) -> None:
+        """검사할 그룹 전체가 참조하는 prefix list와 SG를 묶어서 미리 해석"""
+        prefix_list_ids = set()
+        group_ids = set()
+        for sg in groups:
+            if sg.get("GroupId"):
+                _referenced_group_cache[sg["GroupId"]] = sg.get("GroupName", "")
+            for key in PERMISSION_KEYS.values():
+                for perm in sg.get(key, []):
+                    prefix_list_ids.update(p["PrefixListId"] for p in perm.get("PrefixListIds", []) if p.get("PrefixListId"))
+                    group_ids.update(
+                        pair["GroupId"] for pair in perm.get("UserIdGroupPairs", [])
+                        if pair.get("GroupId") and (not pair.get("UserId") or pair.get("UserId") == sg.get("OwnerId"))
+                    )
+        
+        missing_lists = sorted(prefix_list_ids - set(self.prefix_list_versions))
+        if missing_lists:
+            self._load_prefix_lists(missing_lists)
+        missing_groups = sorted(group_ids - set(_referenced_group_cache))
+        if missing_groups:
+            self._load_groups(missing_groups)
+    
+    def _load_prefix_lists(self, prefix_list_ids: List[str]) -> None:
+        """prefix list 버전/소유자 일괄 조회 후 캐시에 없는 (ID, 버전) 엔트리만 조회"""
+        ec2 = get_client("ec2")
+        for chunk in chunked(prefix_list_ids, PREFIX_LIST_BATCH_SIZE):
+            try:
+                for page in ec2.get_paginator("describe_managed_prefix_lists").paginate(PrefixListIds=chunk):
+                    for prefix_list in page.get("PrefixLists", []):
+                        self.prefix_list_versions[prefix_list["PrefixListId"]] = (
+                            prefix_list.get("Version", 0), prefix_list.get("OwnerId", "")
+                        )
+            except ClientError as e:
+                logger.warning(f"Could not describe prefix lists {chunk}: {str(e)}")
+        
+        for prefix_list_id in prefix_list_ids:
+            resolved = self.prefix_list_versions.setdefault(prefix_list_id, None)
+            if resolved is None:
+                continue
+            version, owner_id = resolved
+            # AWS 관리형 목록(서비스 엔드포인트 대역)은 인터넷 노출로 보지 않음
+            if owner_id == "AWS" or (prefix_list_id, version) in _prefix_list_entry_cache:
+                continue
+            try:
+                entries = []
+                paginator = ec2.get_paginator("get_managed_prefix_list_entries")
+                for page in paginator.paginate(PrefixListId=prefix_list_id, TargetVersion=version):
+                    entries.extend(entry["Cidr"] for entry in page.get("Entries", []) if entry.get("Cidr"))
+                _prefix_list_entry_cache[(prefix_list_id, version)] = group_cidrs_by_class(entries)
+            except ClientError as e:
+                logger.warning(f"Could not get entries of prefix list {prefix_list_id}: {str(e)}")
+    
+    def _load_groups(self, group_ids: List[str]) -> None:
+        """참조 SG 이름 일괄 조회 (group-id 필터는 없는 ID가 섞여도 실패하지 않음)"""
+        ec2 = get_client("ec2")
+        for chunk in chunked(group_ids, FILTER_VALUES_MAX):
+            try:
+                for page in ec2.get_paginator("describe_security_groups").paginate(
+                    Filters=[{"Name": "group-id", "Values": chunk}]
+                ):
+                    for sg in page.get("SecurityGroups", []):
+                        _referenced_group_cache[sg["GroupId"]] = sg.get("GroupName", "")
+            except ClientError as e:
+                logger.warning(f"Could not describe referenced security groups: {str(e)}")
+    
+    def prefix_list_cidrs(self, prefix_list_id: str) -> Dict[str, Tuple[str, ...]]:
+        """prefix list의 분류별 CIDR 목록 (미해석/AWS 관리형 목록은 빈 dict)"""
+        if prefix_list_id not in self.prefix_list_versions:
+            self._load_prefix_lists([prefix_list_id])
+        resolved = self.prefix_list_versions.get(prefix_list_id)
+        if resolved is None:
+            return {}
+        return _prefix_list_entry_cache.get((prefix_list_id, resolved[0]), {})
+    
+    def group_name(self, group_id: str) -> Optional[str]:
+        """참조 SG 이름 (캐시에 없으면 None)"""
+        return _referenced_group_cache.get(group_id) or None
+
+
+def group_cidrs_by_class(cidrs: List[str]) -> Dict[str, Tuple[str, ...]]:
+    """CIDR 목록을 분류별로 묶음 (잘못된 값은 제외)"""
+    grouped: Dict[str, List[str]] = {}
+    for cidr in cidrs:
+        cidr_class = classify_cidr(cidr)
+        if cidr_class is not None:
+            grouped.setdefault(cidr_class, []).append(cidr)
+    return {cidr_class: tuple(values) for cidr_class, values in grouped.items()}
+
+
+def iter_permission_sources(perm: Dict, owner_id: Optional[str],
+                            resolver: ReferenceResolver) -> Iterator[Tuple[Optional[str], Tuple[str, ...], Optional[str]]]:
+    """
+    권한의 소스/대상을 (분류, 표시 값 목록, 출처) 형태로 순회
+    IPv4/IPv6 CIDR, prefix list 엔트리, 참조 SG를 같은 분류 체계로 다루며
+    prefix list는 미리 분류해 둔 묶음 단위로 반환합니다.
+    """
+    for ip_range in perm.get("IpRanges", []):
+        if ip_range.get("CidrIp"):
+            yield classify_cidr(ip_range["CidrIp"]), (ip_range["CidrIp"],), None
+    for ipv6_range in perm.get("Ipv6Ranges", []):
+        if ipv6_range.get("CidrIpv6"):
+            yield classify_cidr(ipv6_range["CidrIpv6"]), (ipv6_range["CidrIpv6"],), None
+    for prefix_list in perm.get("PrefixListIds", []):
+        prefix_list_id = prefix_list.get("PrefixListId")
+        if prefix_list_id:
+            for cidr_class, cidrs in resolver.prefix_list_cidrs(prefix_list_id).items():
+                yield cidr_class, cidrs, prefix_list_id
+    for pair in perm.get("UserIdGroupPairs", []):
+        group_id = pair.get("GroupId")
+        if not group_id:
+            continue
+        user_id = pair.get("UserId")
+        if user_id and owner_id and user_id != owner_id:
+            yield "cross_account_group", (f"{user_id}/{group_id}",), group_id
+        else:
+            name = resolver.group_name(group_id)
+            yield "group", (f"{group_id} ({name})" if name else group_id,), group_id
+
+
+def check_vulnerable_ports(sg: Dict, exception_tag: str, policy: Optional[CompiledPolicy] = None,
+                           resolver: Optional[ReferenceResolver] = None) -> List[Dict]:
+    """
+    컴파일된 정책으로 인바운드/아웃바운드 규칙 검사
+    권한마다 CIDR 분류별 일치 결과를 한 번만 계산하여 모든 주소 체계,
+    prefix list 엔트리, 참조 SG에 재사용합니다.
+    """
     findings = []
     
     # 예외 처리 대상은 검사 제외
@@ -59,154 +610,204 @@ def check_vulnerable_ports(sg: Dict, exception_tag: str) -> List[Dict]:
         logger.info(f"Skipping exception security group: {sg.get('GroupId')} ({sg.get('GroupName')})")
         return findings
     
-    # 인바운드 규칙 검사
-    for perm in sg.get("IpPermissions", []):
-        proto = perm.get("IpProtocol", "-1")
-        from_port = perm.get("FromPort")
-        to_port = perm.get("ToPort")
-        
-        # IPv4 CIDR 검사
-        for ip_range in perm.get("IpRanges", []):
-            cidr = ip_range.get("CidrIp")
-            if cidr and is_world_cidr(cidr):
-                # 모든 포트/프로토콜
-                if proto == "-1" or (from_port is None and to_port is None):
-                    findings.append({
-                        "group_id": sg.get("GroupId"),
-                        "group_name": sg.get("GroupName"),
-                        "direction": "ingress",
-                        "protocol": proto,
-                        "ports": "all",
-                        "cidr": cidr,
-                        "severity": "critical",
-                        "description": "All ports and protocols exposed to internet"
-                    })
-                # 포트 범위
-                elif from_port is not None and to_port is not None:
-                    # 범위 내의 각 포트 확인
-                    for port in range(from_port, to_port + 1):
-                        # HTTPS는 제외
-                        if port in ALLOWED_PORTS:
-                            continue
-                        
-                        # SSH/RDP는 critical
-                        if port in BLOCKED_PORTS:
-                            findings.append({
-                                "group_id": sg.get("GroupId"),
-                                "group_name": sg.get("GroupName"),
-                                "direction": "ingress",
-                                "protocol": proto,
-                                "ports": str(port),
-                                "cidr": cidr,
-                                "severity": "critical",
-                                "description": f"{BLOCKED_PORTS[port]}",
-                                "action": "block"
-                            })
-                        else:
-                            # 기타 포트는 high
-                            findings.append({
-                                "group_id": sg.get("GroupId"),
-                                "group_name": sg.get("GroupName"),
-                                "direction": "ingress",
-                                "protocol": proto,
-                                "ports": str(port),
-                                "cidr": cidr,
-                                "severity": "high",
-                                "description": f"Port {port} exposed to internet"
-                            })
-        
-        # IPv6 CIDR 검사
-        for ipv6_range in perm.get("Ipv6Ranges", []):
-            cidr = ipv6_range.get("CidrIpv6")
-            if cidr and is_world_cidr(cidr):
-                if proto == "-1" or (from_port is None and to_port is None):
-                    findings.append({
-                        "group_id": sg.get("GroupId"),
-                        "group_name": sg.get("GroupName"),
-                        "direction": "ingress",
-                        "protocol": proto,
-                        "ports": "all",
-                        "cidr": cidr,
-                        "severity": "critical",
-                        "description": "All ports and protocols exposed to internet (IPv6)"
-                    })
-                elif from_port is not None and to_port is not None:
-                    for port in range(from_port, to_port + 1):
-                        if port in ALLOWED_PORTS:
-                            continue
-                        if port in BLOCKED_PORTS:
-                            findings.append({
-                                "group_id": sg.get("GroupId"),
-                                "group_name": sg.get("GroupName"),
-                                "direction": "ingress",
-                                "protocol": proto,
-                                "ports": str(port),
-                                "cidr": cidr,
-                                "severity": "critical",
-                                "description": f"{BLOCKED_PORTS[port]} (IPv6)",
-                                "action": "block"
-                            })
+    policy = policy or get_compiled_policy()
+    if resolver is None:
+        resolver = ReferenceResolver()
+        resolver.prefetch([sg])
+    group_id = sg.get("GroupId")
+    group_name = sg.get("GroupName")
+    
+    for direction, key in PERMISSION_KEYS.items():
+        for perm in sg.get(key, []):
+            raw_protocol = perm.get("IpProtocol", "-1")
+            protocol = normalize_protocol(raw_protocol)
+            from_port = perm.get("FromPort")
+            to_port = perm.get("ToPort")
+            matches_by_class: Dict[str, List[Tuple[str, Dict]]] = {}
+            
+            for cidr_class, cidrs, source in iter_permission_sources(perm, sg.get("OwnerId"), resolver):
+                if cidr_class is None:
+                    continue
+                matches = matches_by_class.get(cidr_class)
+                if matches is None:
+                    matches = matches_by_class[cidr_class] = policy.match(
+                        direction, protocol, from_port, to_port, cidr_class
+                    )
+                if not matches:
+                    continue
+                for cidr in cidrs:
+                    for ports, rule in matches:
+                        finding = {
+                            "group_id": group_id,
+                            "group_name": group_name,
+                            "direction": direction,
+                            "protocol": raw_protocol,
+                            "ports": ports,
+                            "cidr": cidr,
+                            "severity": rule["severity"],
+                            "description": rule["description"].format(
+                                ports=ports, protocol=raw_protocol, cidr=cidr, name=rule["name"]
+                            ),
+                            "rule": rule["name"],
+                        }
+                        if source:
+                            finding["source"] = source
+                        if rule["action"]:
+                            finding["action"] = rule["action"]
+                        findings.append(finding)
     
     return findings
 
 
-def is_security_group_in_use(sg_id: str) -> Tuple[bool, List[str]]:
-    """보안 그룹이 사용 중인지 확인"""
-    try:
-        instances = ec2.describe_instances(
-            Filters=[
-                {'Name': 'instance.group-id', 'Values': [sg_id]},
-                {'Name': 'instance-state-name', 'Values': ['running', 'stopped', 'pending', 'stopping']}
-            ]
-        )
-        
-        instance_ids = []
-        for reservation in instances.get('Reservations', []):
+def _index_instances(add):
+    """EC2 인스턴스 (EKS 노드는 클러스터 이름과 함께 표시)"""
+    paginator = get_client("ec2").get_paginator("describe_instances")
+    for page in paginator.paginate(
+        Filters=[{'Name': 'instance-state-name', 'Values': ['running', 'stopped', 'pending', 'stopping']}]
+    ):
+        for reservation in page.get('Reservations', []):
             for instance in reservation.get('Instances', []):
-                instance_ids.append(instance.get('InstanceId'))
-        
-        enis = ec2.describe_network_interfaces(
-            Filters=[{'Name': 'group-id', 'Values': [sg_id]}]
-        )
-        eni_ids = [eni.get('NetworkInterfaceId') for eni in enis.get('NetworkInterfaces', [])]
-        
-        rds = boto3.client('rds')
-        rds_resources = []
+                instance_id = instance.get('InstanceId')
+                cluster = next(
+                    (t.get('Value') for t in instance.get('Tags', []) if t.get('Key') == EKS_CLUSTER_TAG_KEY),
+                    None
+                )
+                resource = f"EKS-Node:{cluster}/{instance_id}" if cluster else f"EC2:{instance_id}"
+                for group in instance.get('SecurityGroups', []):
+                    add(group.get('GroupId'), resource)
+
+
+def _index_network_interfaces(add):
+    """ENI (Lambda VPC ENI 포함)"""
+    paginator = get_client("ec2").get_paginator("describe_network_interfaces")
+    for page in paginator.paginate():
+        for eni in page.get('NetworkInterfaces', []):
+            prefix = "Lambda-ENI" if eni.get('InterfaceType') == 'lambda' else "ENI"
+            for group in eni.get('Groups', []):
+                add(group.get('GroupId'), f"{prefix}:{eni.get('NetworkInterfaceId')}")
+
+
+def _index_rds(add):
+    """RDS 인스턴스 및 클러스터"""
+    rds = get_client('rds')
+    for page in rds.get_paginator("describe_db_instances").paginate():
+        for db in page.get('DBInstances', []):
+            for vpc_sg in db.get('VpcSecurityGroups', []):
+                add(vpc_sg.get('VpcSecurityGroupId'), f"RDS:{db.get('DBInstanceIdentifier')}")
+    
+    for page in rds.get_paginator("describe_db_clusters").paginate():
+        for cluster in page.get('DBClusters', []):
+            for vpc_sg in cluster.get('VpcSecurityGroups', []):
+                add(vpc_sg.get('VpcSecurityGroupId'), f"RDS-Cluster:{cluster.get('DBClusterIdentifier')}")
+
+
+def _index_lambda_functions(add):
+    """VPC에 연결된 Lambda 함수"""
+    lambda_client = get_client('lambda')
+    for page in lambda_client.get_paginator("list_functions").paginate():
+        for function in page.get('Functions', []):
+            for sg_id in function.get('VpcConfig', {}).get('SecurityGroupIds', []):
+                add(sg_id, f"Lambda:{function.get('FunctionName')}")
+
+
+def _index_load_balancers(add):
+    """ALB/NLB 및 Classic ELB"""
+    elbv2 = get_client('elbv2')
+    for page in elbv2.get_paginator("describe_load_balancers").paginate():
+        for lb in page.get('LoadBalancers', []):
+            for sg_id in lb.get('SecurityGroups', []):
+                add(sg_id, f"ELB:{lb.get('LoadBalancerName')}")
+    
+    elb = get_client('elb')
+    for page in elb.get_paginator("describe_load_balancers").paginate():
+        for lb in page.get('LoadBalancerDescriptions', []):
+            for sg_id in lb.get('SecurityGroups', []):
+                add(sg_id, f"ELB-Classic:{lb.get('LoadBalancerName')}")
+
+
+# 실패 시 경고만 남기는 선택적 리소스 조회
+_OPTIONAL_USAGE_INDEXERS = {
+    "RDS": _index_rds,
+    "Lambda": _index_lambda_functions,
+    "ELB": _index_load_balancers,
+}
+
+
+def build_security_group_usage_index() -> Dict[str, List[str]]:
+    """
+    계정 전체 리소스를 종류별로 한 번씩 페이징 조회하여 SG ID -> 사용 리소스 목록 인덱스 생성
+    API 호출 수는 보안 그룹 수가 아니라 페이지 수에 비례합니다.
+    """
+    index: Dict[str, List[str]] = {}
+    
+    def add(sg_id: str, resource: str):
+        if sg_id:
+            index.setdefault(sg_id, []).append(resource)
+    
+    # EC2/ENI 조회 실패는 호출자에게 전달 (사용 여부를 판단할 수 없음)
+    _index_instances(add)
+    _index_network_interfaces(add)
+    
+    for name, indexer in _OPTIONAL_USAGE_INDEXERS.items():
         try:
-            db_instances = rds.describe_db_instances()
-            for db in db_instances.get('DBInstances', []):
-                for vpc_sg in db.get('VpcSecurityGroups', []):
-                    if vpc_sg.get('VpcSecurityGroupId') == sg_id:
-                        rds_resources.append(f"RDS:{db.get('DBInstanceIdentifier')}")
-            
-            db_clusters = rds.describe_db_clusters()
-            for cluster in db_clusters.get('DBClusters', []):
-                for vpc_sg in cluster.get('VpcSecurityGroups', []):
-                    if vpc_sg == sg_id:
-                        rds_resources.append(f"RDS-Cluster:{cluster.get('DBClusterIdentifier')}")
+            indexer(add)
         except Exception as e:
-            logger.warning(f"Could not check RDS: {str(e)}")
-        
-        in_use = len(instance_ids) > 0 or len(eni_ids) > 0 or len(rds_resources) > 0
-        resources = []
-        if instance_ids:
-            resources.extend([f"EC2:{iid}" for iid in instance_ids])
-        if eni_ids:
-            resources.extend([f"ENI:{eid}" for eid in eni_ids])
-        if rds_resources:
-            resources.extend(rds_resources)
-        
-        return in_use, resources
+            logger.warning(f"Could not check {name}: {str(e)}")
     
+    return index
+
+
+def get_security_group_usage_index() -> Dict[str, List[str]]:
+    """
+    일괄 검사용 SG 사용 리소스 인덱스 생성 (검사마다 새로 생성, 호출 간 캐시하지 않음)
+    단일 이벤트는 그룹 단위 ENI 조회를 사용하므로 warm 컨테이너에 보관할 필요가 없습니다.
+    """
+    started = time.monotonic()
+    index = build_security_group_usage_index()
+    logger.info(
+        f"Built security group usage index: {len(index)} groups in use ({time.monotonic() - started:.2f}s)"
+    )
+    return index
+
+
+def find_security_group_network_interfaces(sg_id: str) -> List[str]:
+    """
+    group-id 필터로 보안 그룹이 연결된 ENI만 조회 (단일 이벤트용)
+    VPC의 EC2/RDS/Lambda/ELB 등은 모두 ENI를 통해 보안 그룹을 사용하므로 ENI 유무로 사용 여부를 판단합니다.
+    """
+    resources = []
+    paginator = get_client("ec2").get_paginator("describe_network_interfaces")
+    for page in paginator.paginate(Filters=[{'Name': 'group-id', 'Values': [sg_id]}]):
+        for eni in page.get('NetworkInterfaces', []):
+            instance_id = eni.get('Attachment', {}).get('InstanceId')
+            if instance_id:
+                resources.append(f"EC2:{instance_id}")
+            else:
+                prefix = "Lambda-ENI" if eni.get('InterfaceType') == 'lambda' else "ENI"
+                resources.append(f"{prefix}:{eni.get('NetworkInterfaceId')}")
+    return resources
+
+
+def is_security_group_in_use(sg_id: str, usage_index: Optional[Dict[str, List[str]]] = None) -> Tuple[bool, List[str]]:
+    """
+    보안 그룹이 사용 중인지 확인
+    일괄 검사는 미리 생성한 사용 리소스 인덱스를, 단일 이벤트는 그룹 단위 ENI 조회를 사용합니다.
+    """
+    try:
+        if usage_index is not None:
+            resources = usage_index.get(sg_id, [])
+        else:
+            resources = find_security_group_network_interfaces(sg_id)
+        return len(resources) > 0, list(resources)
     except Exception as e:
         logger.error(f"Error checking security group usage: {str(e)}")
         return True, ["Unknown - error checking"]
 
 
-def delete_security_group(sg_id: str, sg_name: str) -> Dict:
+def delete_security_group(sg_id: str, sg_name: str, usage_index: Optional[Dict[str, List[str]]] = None) -> Dict:
     """보안 그룹 삭제 (사용 중이 아닐 때만)"""
     try:
-        in_use, resources = is_security_group_in_use(sg_id)
+        in_use, resources = is_security_group_in_use(sg_id, usage_index)
         
         if in_use:
             return {
@@ -223,7 +824,7 @@ def delete_security_group(sg_id: str, sg_name: str) -> Dict:
                 "message": "Default security groups cannot be deleted"
             }
         
-        ec2.delete_security_group(GroupId=sg_id)
+        get_client("ec2").delete_security_group(GroupId=sg_id)
         logger.warning(f"DELETED security group: {sg_id} ({sg_name})")
         
         return {
@@ -233,7 +834,7 @@ def delete_security_group(sg_id: str, sg_name: str) -> Dict:
             "message": f"Successfully deleted {sg_id} ({sg_name})"
         }
     
-    except ec2.exceptions.ClientError as e:
+    except ClientError as e:
         error_code = e.response.get('Error', {}).get('Code', '')
         if error_code == 'DependencyViolation':
             return {
@@ -255,6 +856,139 @@ def delete_security_group(sg_id: str, sg_name: str) -> Dict:
         }
 
 
+class SecurityGroupRuleCache:
+    """
+    SG 규칙(SecurityGroupRuleId) 조회 캐시 (호출 동안 재사용)
+    group-id 필터에 여러 그룹을 묶어 페이징 조회합니다.
+    조회에 실패한 청크의 그룹은 errors에 기록하고 나머지 그룹은 계속 조회합니다.
+    """
+    
+    def __init__(self):
+        self.rules: Dict[str, List[Dict]] = {}
+        self.errors: Dict[str, ClientError] = {}
+    
+    def prefetch(self, group_ids: List[str]) -> None:
+        missing = sorted(set(group_ids) - set(self.rules) - set(self.errors))
+        paginator = get_client("ec2").get_paginator("describe_security_group_rules")
+        for chunk in chunked(missing, FILTER_VALUES_MAX):
+            for group_id in chunk:
+                self.rules[group_id] = []
+            try:
+                for page in paginator.paginate(Filters=[{"Name": "group-id", "Values": chunk}]):
+                    for rule in page.get("SecurityGroupRules", []):
+                        self.rules.setdefault(rule.get("GroupId"), []).append(rule)
+            except ClientError as e:
+                logger.error(f"Could not describe rules of {len(chunk)} security groups: {str(e)}")
+                for group_id in chunk:
+                    self.rules.pop(group_id, None)
+                    self.errors[group_id] = e
+    
+    def get(self, group_id: str) -> List[Dict]:
+        if group_id not in self.rules and group_id not in self.errors:
+            self.prefetch([group_id])
+        return self.rules.get(group_id, [])
+
+
+def rule_target(rule: Dict) -> Optional[str]:
+    """SG 규칙의 대상 (CIDR, prefix list ID 또는 참조 SG ID)"""
+    return (
+        rule.get("CidrIpv4") or rule.get("CidrIpv6") or rule.get("PrefixListId")
+        or rule.get("ReferencedGroupInfo", {}).get("GroupId")
+    )
+
+
+def rule_matches_finding(rule: Dict, finding: Dict) -> bool:
+    """SG 규칙이 finding의 방향/대상/프로토콜/포트 구간을 허용하는 규칙인지 확인"""
+    if bool(rule.get("IsEgress")) != (finding["direction"] == "egress"):
+        return False
+    if rule_target(rule) != (finding.get("source") or finding["cidr"]):
+        return False
+    if normalize_protocol(rule.get("IpProtocol", "-1")) != normalize_protocol(finding["protocol"]):
+        return False
+    if finding["ports"] == "all" or rule.get("FromPort", -1) == -1:
+        return True
+    start, _, end = finding["ports"].partition("-")
+    return rule["FromPort"] <= int(start) and int(end or start) <= rule["ToPort"]
+
+
+def revoked_rule_entry(rule: Dict) -> Dict:
+    """회수한 규칙 기록 (ip_permission은 authorize_security_group_ingress/egress로 그대로 복원 가능)"""
+    permission = {"IpProtocol": rule.get("IpProtocol")}
+    if rule.get("FromPort", -1) != -1 or rule.get("ToPort", -1) != -1:
+        permission["FromPort"] = rule.get("FromPort")
+        permission["ToPort"] = rule.get("ToPort")
+    description = {"Description": rule["Description"]} if rule.get("Description") else {}
+    if rule.get("CidrIpv4"):
+        permission["IpRanges"] = [{"CidrIp": rule["CidrIpv4"], **description}]
+    elif rule.get("CidrIpv6"):
+        permission["Ipv6Ranges"] = [{"CidrIpv6": rule["CidrIpv6"], **description}]
+    elif rule.get("PrefixListId"):
+        permission["PrefixListIds"] = [{"PrefixListId": rule["PrefixListId"], **description}]
+    elif rule.get("ReferencedGroupInfo"):
+        referenced = rule["ReferencedGroupInfo"]
+        pair = {key: referenced[key] for key in ("GroupId", "UserId", "VpcId", "VpcPeeringConnectionId") if referenced.get(key)}
+        pair.update(description)
+        permission["UserIdGroupPairs"] = [pair]
+    return {
+        "security_group_rule_id": rule.get("SecurityGroupRuleId"),
+        "direction": "egress" if rule.get("IsEgress") else "ingress",
+        "ip_permission": permission,
+    }
+
+
+def revoke_offending_rules(sg: Dict, findings: List[Dict], rule_cache: SecurityGroupRuleCache) -> Tuple[List[Dict], List[Dict]]:
+    """
+    finding에 해당하는 SG 규칙만 방향별 한 번의 API 호출로 회수 (사용 리소스 조회 없음)
+    반환: (회수한 규칙 목록, 실패 목록)
+    """
+    sg_id = sg.get("GroupId")
+    rules = rule_cache.get(sg_id)
+    if sg_id in rule_cache.errors:
+        error = rule_cache.errors[sg_id]
+        return [], [{
+            "security_group_id": sg_id,
+            "reason": error.response.get("Error", {}).get("Code", "client_error"),
+            "message": str(error),
+        }]
+    
+    offending: Dict[str, Dict[str, Dict]] = {"ingress": {}, "egress": {}}
+    for rule in rules:
+        if any(rule_matches_finding(rule, finding) for finding in findings):
+            direction = "egress" if rule.get("IsEgress") else "ingress"
+            offending[direction][rule["SecurityGroupRuleId"]] = rule
+    
+    ec2 = get_client("ec2")
+    revoked = []
+    failed = []
+    for direction, rules in offending.items():
+        if not rules:
+            continue
+        revoke = ec2.revoke_security_group_egress if direction == "egress" else ec2.revoke_security_group_ingress
+        try:
+            response = revoke(GroupId=sg_id, SecurityGroupRuleIds=list(rules))
+        except ClientError as e:
+            failed.append({
+                "security_group_id": sg_id,
+                "direction": direction,
+                "security_group_rule_ids": list(rules),
+                "reason": e.response.get("Error", {}).get("Code", "client_error"),
+                "message": str(e),
+            })
+            continue
+        if not response.get("Return", True):
+            failed.append({
+                "security_group_id": sg_id,
+                "direction": direction,
+                "security_group_rule_ids": list(rules),
+                "reason": "revoke_returned_false",
+            })
+            continue
+        revoked.extend(revoked_rule_entry(rule) for rule in rules.values())
+        logger.warning(f"REVOKED {len(rules)} {direction} rules from {sg_id}: {', '.join(rules)}")
+    
+    return revoked, failed
+
+
 def filter_by_tag(sg: Dict, tag_key: str, tag_value: str) -> bool:
     """태그로 필터링"""
     if not tag_key:
@@ -269,7 +1003,7 @@ def filter_by_tag(sg: Dict, tag_key: str, tag_value: str) -> bool:
 
 def paginate_security_groups(filters=None) -> List[Dict]:
     """보안 그룹 페이징 조회"""
-    paginator = ec2.get_paginator("describe_security_groups")
+    paginator = get_client("ec2").get_paginator("describe_security_groups")
     groups = []
     for page in paginator.paginate(Filters=filters or []):
         groups.extend(page.get("SecurityGroups", []))
@@ -301,7 +1035,7 @@ def extract_security_group_id_from_event(event: Dict) -> str:
         if group_name:
             # 이름으로 SG 조회하여 ID 반환
             try:
-                sgs = ec2.describe_security_groups(
+                sgs = get_client("ec2").describe_security_groups(
                     Filters=[{'Name': 'group-name', 'Values': [group_name]}]
                 )
                 if sgs.get("SecurityGroups"):
@@ -315,14 +1049,152 @@ def extract_security_group_id_from_event(event: Dict) -> str:
         return None
 
 
+def remediation_targets(findings: List[Dict], delete_only_critical: bool) -> List[Dict]:
+    """자동 조치 대상 finding (delete_only_critical이면 critical만)"""
+    if delete_only_critical:
+        return [f for f in findings if f.get("severity") == "critical"]
+    return findings
+
+
+def evaluate_security_group(sg: Dict, exception_tag: str, auto_delete: bool, delete_only_critical: bool,
+                            resolver: Optional[ReferenceResolver] = None, remediation_mode: str = "delete",
+                            findings: Optional[List[Dict]] = None,
+                            rule_cache: Optional[SecurityGroupRuleCache] = None,
+                            usage_index: Optional[Dict[str, List[str]]] = None) -> Dict:
+    """보안 그룹 하나에 대한 취약 포트 검사 및 (옵션) 자동 삭제/규칙 회수"""
+    if findings is None:
+        findings = check_vulnerable_ports(sg, exception_tag, resolver=resolver)
+    deleted_groups = []
+    failed_deletions = []
+    revoked_rules = []
+    failed_revocations = []
+    
+    # 자동 조치 옵션
+    if auto_delete and findings:
+        sg_id = sg.get("GroupId")
+        sg_name = sg.get("GroupName")
+        targets = remediation_targets(findings, delete_only_critical)
+        
+        # Critical만 조치 옵션
+        if not targets:
+            logger.info(f"No critical findings for {sg_id}, skipping remediation")
+        elif remediation_mode == "revoke":
+            # 문제 규칙만 회수 (그룹 삭제가 아니므로 사용 리소스 조회 불필요)
+            revoked_rules, failed_revocations = revoke_offending_rules(sg, targets, rule_cache or SecurityGroupRuleCache())
+        else:
+            # 보안 그룹 삭제 시도
+            result = delete_security_group(sg_id, sg_name, usage_index)
+            if result.get("success"):
+                deleted_groups.append(result)
+            else:
+                failed_deletions.append(result)
+    
+    return {
+        "security_group_id": sg.get("GroupId"),
+        "security_group_name": sg.get("GroupName"),
+        "findings_count": len(findings),
+        "findings": findings,
+        "auto_delete_enabled": auto_delete,
+        "remediation_mode": remediation_mode,
+        "deleted_groups": deleted_groups,
+        "failed_deletions": failed_deletions,
+        "revoked_rules": revoked_rules,
+        "failed_revocations": failed_revocations,
+        "summary": {
+            "critical": len([f for f in findings if f.get("severity") == "critical"]),
+            "high": len([f for f in findings if f.get("severity") == "high"]),
+        }
+    }
+
+
+def is_scheduled_scan_event(event: Dict) -> bool:
+    """EventBridge 스케줄 이벤트 또는 수동 scan 요청인지 확인"""
+    return event.get("mode") == "scan" or event.get("detail-type") == "Scheduled Event"
+
+
+def handle_scheduled_scan(exception_tag: str, auto_delete: bool, delete_only_critical: bool,
+                          remediation_mode: str = "delete") -> Dict:
+    """
+    계정 전체 보안 그룹 일괄 검사
+    보안 그룹과 사용 리소스를 각각 한 번씩 페이징 조회한 뒤 메모리에서 평가합니다.
+    """
+    target_tag_key = os.getenv("TARGET_TAG_KEY", "")
+    target_tag_value = os.getenv("TARGET_TAG_VALUE", "")
+    
+    groups = [
+        sg for sg in paginate_security_groups()
+        if filter_by_tag(sg, target_tag_key, target_tag_value)
+    ]
+    logger.info(f"Scanning {len(groups)} security groups")
+    
+    # 삭제가 필요할 때만 사용 리소스 인덱스를 생성 (이후 그룹별 조회는 인덱스 사용)
+    usage_index = None
+    if auto_delete and remediation_mode == "delete":
+        usage_index = get_security_group_usage_index()
+    
+    # 전체 그룹이 참조하는 prefix list/SG를 한 번에 해석 (그룹별 중복 조회 없음)
+    resolver = ReferenceResolver()
+    resolver.prefetch(groups)
+    evaluations = [(sg, check_vulnerable_ports(sg, exception_tag, resolver=resolver)) for sg in groups]
+    
+    # 규칙 회수 대상 그룹의 SG 규칙 ID를 묶어서 조회
+    rule_cache = SecurityGroupRuleCache()
+    if auto_delete and remediation_mode == "revoke":
+        rule_cache.prefetch([
+            sg.get("GroupId") for sg, findings in evaluations if remediation_targets(findings, delete_only_critical)
+        ])
+    
+    results = []
+    for sg, findings in evaluations:
+        result = evaluate_security_group(
+            sg, exception_tag, auto_delete, delete_only_critical, resolver, remediation_mode, findings, rule_cache,
+            usage_index
+        )
+        if result["findings_count"] or result["failed_deletions"] or result["failed_revocations"]:
+            results.append(result)
+    
+    summary = {
+        "scanned": len(groups),
+        "vulnerable": len(results),
+        "critical": sum(r["summary"]["critical"] for r in results),
+        "high": sum(r["summary"]["high"] for r in results),
+        "deleted": sum(len(r["deleted_groups"]) for r in results),
+        "failed_deletions": sum(len(r["failed_deletions"]) for r in results),
+        "revoked_rules": sum(len(r["revoked_rules"]) for r in results),
+        "failed_revocations": sum(len(r["failed_revocations"]) for r in results),
+    }
+    
+    logger.info("Security Group Scan Summary: %s", LazyJson(summary))
+    if summary["critical"] > 0:
+        logger.warning(f"CRITICAL: Found {summary['critical']} critical vulnerabilities across {summary['vulnerable']} security groups!")
+    
+    return {
+        "statusCode": 200,
+        "body": json.dumps({
+            "mode": "scan",
+            "auto_delete_enabled": auto_delete,
+            "remediation_mode": remediation_mode,
+            "summary": summary,
+            "results": results,
+        }, ensure_ascii=False, default=str),
+    }
+
+
 def lambda_handler(event, context):
     try:
-        logger.info("Event: %s", json.dumps(event))
+        log_event("Event", event)
         
         # 환경 변수
         auto_delete = os.getenv("AUTO_DELETE", "false").lower() == "true"
         delete_only_critical = os.getenv("DELETE_ONLY_CRITICAL", "true").lower() == "true"
         exception_tag = os.getenv("EXCEPTION_TAG_KEY", EXCEPTION_TAG_KEY)
+        remediation_mode = os.getenv("REMEDIATION_MODE", "delete").lower()
+        if remediation_mode not in REMEDIATION_MODES:
+            raise ValueError(f"Invalid REMEDIATION_MODE: {remediation_mode}")
+        
+        # 정기 스케줄: 계정 전체 일괄 검사
+        if is_scheduled_scan_event(event):
+            return handle_scheduled_scan(exception_tag, auto_delete, delete_only_critical, remediation_mode)
         
         # CloudTrail 이벤트에서 변경된 SG ID 추출
         changed_sg_id = extract_security_group_id_from_event(event)
@@ -333,7 +1205,7 @@ def lambda_handler(event, context):
                 "statusCode": 200,
                 "body": json.dumps({
                     "message": "No security group ID found in event",
-                    "event": event
+                    "event": event_summary(event)
                 })
             }
         
@@ -341,9 +1213,9 @@ def lambda_handler(event, context):
         
         # 변경된 보안 그룹만 조회
         try:
-            response = ec2.describe_security_groups(GroupIds=[changed_sg_id])
+            response = get_client("ec2").describe_security_groups(GroupIds=[changed_sg_id])
             sgs = response.get("SecurityGroups", [])
-        except ec2.exceptions.ClientError as e:
+        except ClientError as e:
             logger.error(f"Error describing security group {changed_sg_id}: {str(e)}")
             return {
                 "statusCode": 200,
@@ -363,55 +1235,13 @@ def lambda_handler(event, context):
             }
         
         sg = sgs[0]
-        all_findings = []
-        deleted_groups = []
-        failed_deletions = []
-        
-        # 취약 포트 검사
-        findings = check_vulnerable_ports(sg, exception_tag)
-        all_findings.extend(findings)
-        
-        # 자동 삭제 옵션
-        if auto_delete and findings:
-            sg_id = sg.get("GroupId")
-            sg_name = sg.get("GroupName")
-            
-            # Critical만 삭제 옵션
-            if delete_only_critical:
-                critical_findings = [f for f in findings if f.get("severity") == "critical"]
-                if not critical_findings:
-                    logger.info(f"No critical findings for {sg_id}, skipping deletion")
-                else:
-                    # 보안 그룹 삭제 시도
-                    result = delete_security_group(sg_id, sg_name)
-                    if result.get("success"):
-                        deleted_groups.append(result)
-                    else:
-                        failed_deletions.append(result)
-            else:
-                # 모든 취약점에 대해 삭제
-                result = delete_security_group(sg_id, sg_name)
-                if result.get("success"):
-                    deleted_groups.append(result)
-                else:
-                    failed_deletions.append(result)
         
-        # 결과 정리
-        result = {
-            "security_group_id": changed_sg_id,
-            "security_group_name": sg.get("GroupName"),
-            "findings_count": len(all_findings),
-            "findings": all_findings,
-            "auto_delete_enabled": auto_delete,
-            "deleted_groups": deleted_groups,
-            "failed_deletions": failed_deletions,
-            "summary": {
-                "critical": len([f for f in all_findings if f.get("severity") == "critical"]),
-                "high": len([f for f in all_findings if f.get("severity") == "high"]),
-            }
-        }
+        # 취약 포트 검사 및 자동 삭제/규칙 회수
+        result = evaluate_security_group(sg, exception_tag, auto_delete, delete_only_critical,
+                                         remediation_mode=remediation_mode)
+        deleted_groups = result["deleted_groups"]
         
-        logger.info("Security Group Check Results: %s", json.dumps(result, ensure_ascii=False, default=str))
+        logger.info("Security Group Check Results: %s", LazyJson(result))
         
         if result["summary"]["critical"] > 0:
             logger.warning(f"CRITICAL: Found {result['summary']['critical']} critical vulnerabilities in {changed_sg_id}!")
@@ -45,12 +45,20 @@ variable "lambda_memory_size" {
 
 variable "lambda_timeout" {
     type = number
-    default = 10
+    default = 60
+    description = "Lambda timeout in seconds (scheduled scans page through every security group)"
 }
 
 variable "schedule_expression" {
     type = string
     default = "cron(0 0 * * ? *)"
+    description = "Schedule for the account-wide security group scan"
+}
+
+variable "enable_scheduled_scan" {
+    type = bool
+    default = true
+    description = "Enable the scheduled account-wide security group scan"
 }
 
 variable "auto_delete" {
@@ -65,6 +73,17 @@ variable "delete_only_critical" {
     description = "Only delete security groups with critical severity findings"
 }
 
+variable "remediation_mode" {
+    type = string
+    default = "delete"
+    description = "How auto_delete remediates findings: delete removes the whole security group, revoke removes only the offending rules by security group rule ID"
+
+    validation {
+        condition = contains(["delete", "revoke"], var.remediation_mode)
+        error_message = "remediation_mode must be 'delete' or 'revoke'"
+    }
+}
+
 variable "target_tag_key" {
     type = string
     default = ""
@@ -81,4 +100,52 @@ variable "exception_tag_key" {
     type = string
     default = "SGCheckerException"
     description = "Tag key to mark security groups as exceptions (e.g., bastion hosts). Groups with this tag will be excluded from checks."
-}
\ No newline at end of file
+}
+
+variable "policy_rules" {
+    type = any
+    default = []
+    description = "Declarative rule list (name, direction, protocols, ports, cidr_classes, severity, description, action) that replaces the built-in security group policy. Empty uses the built-in rules."
+}
+
+variable "internal_cidrs" {
+    type = list(string)
+    default = []
+    description = "VPC CIDRs classified as internal in addition to the private (RFC 1918, CGNAT, ULA) ranges"
+}
+
+variable "trusted_cidrs" {
+    type = list(string)
+    default = []
+    description = "Trusted external CIDRs such as corporate egress and partner networks; rules limited to these ranges are not reported"
+}
+
+variable "broad_prefix_ipv4" {
+    type = number
+    default = 16
+    description = "Untrusted IPv4 ranges with a prefix shorter than this are classified as broad and treated like 0.0.0.0/0"
+}
+
+variable "broad_prefix_ipv6" {
+    type = number
+    default = 48
+    description = "Untrusted IPv6 ranges with a prefix shorter than this are classified as broad and treated like ::/0"
+}
+
+variable "log_level" {
+    type = string
+    default = "INFO"
+    description = "Lambda log level (DEBUG, INFO, WARNING, ERROR)"
+}
+
+variable "log_max_chars" {
+    type = number
+    default = 2048
+    description = "Maximum length of JSON written in a single log line; longer values are truncated"
+}
+
+variable "log_sample_rate" {
+    type = number
+    default = 1
+    description = "Fraction of invocations whose event summary is logged (0-1); error logs are always written"
+}
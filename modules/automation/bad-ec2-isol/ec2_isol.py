@@ -1,15 +1,183 @@
 import json
 import os
+import random
 import logging
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
 import boto3
+from botocore.config import Config
 
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
 
 QUARANTINE_SG_ID = os.environ.get('QUARANTINE_SECURITY_GROUP_ID')
+SNAPSHOT_ON_QUARANTINE = os.environ.get('SNAPSHOT_ON_QUARANTINE', 'true').lower() == 'true'
+QUARANTINE_TAG_KEY = 'Quarantine'
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', '10'))
+FILTER_VALUES_MAX = 200
 
-ec2 = boto3.client('ec2')
-iam = boto3.client('iam')
+# boto3 클라이언트 설정 (연결 풀, 적응형 재시도, 타임아웃)
+BOTO_CONFIG = Config(
+    max_pool_connections=20,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    connect_timeout=3,
+    read_timeout=10,
+)
+
+@lru_cache(maxsize=None)
+def get_client(service):
+    """
+    boto3 클라이언트를 처음 사용할 때 생성하고 컨테이너 수명 동안 재사용합니다.
+    """
+    return boto3.client(service, config=BOTO_CONFIG)
+
+# 구조화 로그 설정 (허용 목록 필드만, 크기 제한, 샘플링)
+LOG_MAX_CHARS = int(os.environ.get('LOG_MAX_CHARS', '2048'))
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '1.0'))
+LOG_EVENT_FIELDS = ('id', 'source', 'detail-type', 'time', 'account', 'region', 'mode')
+LOG_DETAIL_FIELDS = ('id', 'type', 'severity')
+
+class LazyJson:
+    """
+    로그 레코드가 실제로 출력될 때만 JSON으로 직렬화하고 LOG_MAX_CHARS 길이로 자릅니다.
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        text = json.dumps(self.value, ensure_ascii=False, default=str)
+        if len(text) <= LOG_MAX_CHARS:
+            return text
+        return f"{text[:LOG_MAX_CHARS]}...(truncated {len(text) - LOG_MAX_CHARS} chars)"
+
+def event_summary(event):
+    """
+    이벤트에서 허용 목록 필드만 추린 요약 (SQS 배치는 메시지 수만 기록)
+    """
+    summary = {key: event[key] for key in LOG_EVENT_FIELDS if key in event}
+    detail = event.get('detail')
+    if isinstance(detail, dict):
+        summary['detail'] = {key: detail[key] for key in LOG_DETAIL_FIELDS if key in detail}
+    if 'Records' in event:
+        summary['records'] = len(event['Records'])
+    return summary
+
+def log_event(message, event):
+    """
+    LOG_SAMPLE_RATE 비율로 이벤트 요약을 INFO 로그로 남깁니다.
+    """
+    if LOG_SAMPLE_RATE < 1.0 and random.random() >= LOG_SAMPLE_RATE:
+        return
+    logger.info("%s: %s", message, LazyJson(event_summary(event)))
+
+# 중복 finding 처리 방지 (컨테이너 내 LRU + 선택적 DynamoDB 영속 계층)
+IDEMPOTENCY_TABLE_NAME = os.environ.get('IDEMPOTENCY_TABLE_NAME', '')
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '86400'))
+IDEMPOTENCY_CACHE_SIZE = 1024
+
+class LocalIdempotencyStore:
+    """
+    DynamoDB 테이블 대신 사용하는 메모리 저장소 (로컬 실행/테이블 미설정 시).
+    """
+    def __init__(self):
+        self.items = {}
+    
+    def get(self, key):
+        expires_at = self.items.get(key)
+        return expires_at is not None and expires_at > time.time()
+    
+    def put(self, key, expires_at):
+        self.items[key] = expires_at
+
+class DynamoDBIdempotencyStore:
+    """
+    idempotency_key(S) 파티션 키와 expires_at(N) TTL 속성을 가진 DynamoDB 테이블.
+    """
+    def __init__(self, table_name):
+        self.table_name = table_name
+    
+    def get(self, key):
+        item = get_client('dynamodb').get_item(
+            TableName=self.table_name,
+            Key={'idempotency_key': {'S': key}},
+            ConsistentRead=True
+        ).get('Item')
+        return bool(item) and int(item['expires_at']['N']) > time.time()
+    
+    def put(self, key, expires_at):
+        get_client('dynamodb').put_item(
+            TableName=self.table_name,
+            Item={
+                'idempotency_key': {'S': key},
+                'expires_at': {'N': str(int(expires_at))}
+            }
+        )
+
+class IdempotencyCache:
+    """
+    처리 완료한 (finding ID, 대상) 키를 기록합니다.
+    LRU를 먼저 확인하고, 없으면 영속 저장소를 조회합니다.
+    """
+    def __init__(self, store, max_size=IDEMPOTENCY_CACHE_SIZE, ttl_seconds=IDEMPOTENCY_TTL_SECONDS):
+        self.store = store
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.lru = OrderedDict()
+    
+    def _remember(self, key, expires_at):
+        self.lru[key] = expires_at
+        self.lru.move_to_end(key)
+        while len(self.lru) > self.max_size:
+            self.lru.popitem(last=False)
+    
+    def seen(self, key):
+        expires_at = self.lru.get(key)
+        if expires_at is not None:
+            if expires_at > time.time():
+                self.lru.move_to_end(key)
+                return True
+            del self.lru[key]
+        
+        try:
+            if self.store.get(key):
+                self._remember(key, time.time() + self.ttl_seconds)
+                return True
+        except Exception as e:
+            # 저장소 장애 시에는 중복 처리보다 조치 누락을 피함
+            logger.warning(f"Idempotency store lookup failed for {key}: {str(e)}")
+        return False
+    
+    def mark(self, key):
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, expires_at)
+        try:
+            self.store.put(key, expires_at)
+        except Exception as e:
+            logger.warning(f"Idempotency store write failed for {key}: {str(e)}")
+
+idempotency = IdempotencyCache(
+    DynamoDBIdempotencyStore(IDEMPOTENCY_TABLE_NAME) if IDEMPOTENCY_TABLE_NAME else LocalIdempotencyStore()
+)
+
+def idempotency_key(finding_id, target):
+    """
+    finding ID와 조치 대상으로 멱등성 키를 만듭니다. finding ID가 없으면 None.
+    """
+    if not finding_id or finding_id == 'unknown':
+        return None
+    return f"{finding_id}:{target}"
+
+def is_duplicate(finding_id, target):
+    """
+    이미 처리한 (finding ID, 대상)인지 확인합니다.
+    """
+    key = idempotency_key(finding_id, target)
+    return bool(key) and idempotency.seen(key)
 
 def extract_instance_id(event):
     """
@@ -47,14 +215,317 @@ def extract_instance_id(event):
     
     return None
 
+def isolate_network(instance_id):
+    """
+    인스턴스의 보안 그룹을 격리용 보안 그룹으로 교체합니다.
+    """
+    get_client('ec2').modify_instance_attribute(
+        InstanceId=instance_id,
+        Groups=[QUARANTINE_SG_ID]
+    )
+    logger.info(f"Successfully updated security group for instance: {instance_id}")
+    return {'security_group_id': QUARANTINE_SG_ID}
+
+def find_instance_profile_associations(instance_ids):
+    """
+    여러 인스턴스의 IAM 인스턴스 프로파일 연결을 한 번에 조회합니다 (instance_id -> association_id).
+    """
+    associations = {}
+    paginator = get_client('ec2').get_paginator('describe_iam_instance_profile_associations')
+    for i in range(0, len(instance_ids), FILTER_VALUES_MAX):
+        for page in paginator.paginate(
+            Filters=[
+                {
+                    'Name': 'instance-id',
+                    'Values': instance_ids[i:i + FILTER_VALUES_MAX]
+                },
+                {
+                    'Name': 'state',
+                    'Values': ['associating', 'associated']
+                }
+            ]
+        ):
+            for association in page.get('IamInstanceProfileAssociations', []):
+                associations[association['InstanceId']] = association['AssociationId']
+    return associations
+
+def disassociate_instance_profile(instance_id, association_id):
+    """
+    IAM 인스턴스 프로파일 연결을 해제합니다.
+    """
+    if not association_id:
+        logger.info(f"No IAM instance profile association found for instance: {instance_id}")
+        return {'association_id': None}
+    
+    logger.info(f"Disassociating IAM instance profile: {association_id} from instance: {instance_id}")
+    get_client('ec2').disassociate_iam_instance_profile(
+        AssociationId=association_id
+    )
+    logger.info(f"Successfully disassociated IAM instance profile from instance: {instance_id}")
+    return {'association_id': association_id}
+
+def detach_instance_profile(instance_id):
+    """
+    인스턴스에 연결된 IAM 인스턴스 프로파일을 분리합니다.
+    """
+    association_id = find_instance_profile_associations([instance_id]).get(instance_id)
+    return disassociate_instance_profile(instance_id, association_id)
+
+def snapshot_volumes(instance_id, finding):
+    """
+    포렌식용으로 인스턴스의 모든 EBS 볼륨 스냅샷을 생성합니다 (CreateSnapshots 단일 호출).
+    """
+    response = get_client('ec2').create_snapshots(
+        InstanceSpecification={'InstanceId': instance_id},
+        Description=f"Quarantine forensic snapshot for {instance_id} ({finding.get('type', 'unknown')})",
+        TagSpecifications=[{
+            'ResourceType': 'snapshot',
+            'Tags': [
+                {'Key': QUARANTINE_TAG_KEY, 'Value': 'true'},
+                {'Key': 'QuarantinedInstanceId', 'Value': instance_id},
+                {'Key': 'GuardDutyFindingId', 'Value': finding.get('id', 'unknown')}
+            ]
+        }],
+        CopyTagsFromSource='volume'
+    )
+    snapshot_ids = [snapshot['SnapshotId'] for snapshot in response.get('Snapshots', [])]
+    logger.info(f"Created snapshots {snapshot_ids} for instance: {instance_id}")
+    return {'snapshot_ids': snapshot_ids}
+
+def tag_instances(instance_ids, finding, isolated=True):
+    """
+    인스턴스들에 격리 결과 태그를 추가합니다 (CreateTags 단일 호출).
+    네트워크 격리 결과를 확인한 뒤 호출하며, 격리에 실패한 인스턴스는 Quarantine=failed로 표시합니다.
+    finding id가 없으면 GuardDutyFindingId 태그는 생략합니다.
+    """
+    tags = [
+        {'Key': QUARANTINE_TAG_KEY, 'Value': 'true' if isolated else 'failed'},
+        {'Key': 'QuarantinedAt' if isolated else 'QuarantineFailedAt', 'Value': datetime.now(timezone.utc).isoformat()},
+        {'Key': 'GuardDutyFindingType', 'Value': finding.get('type', 'unknown')[:256]}
+    ]
+    if finding.get('id'):
+        tags.append({'Key': 'GuardDutyFindingId', 'Value': finding['id']})
+    get_client('ec2').create_tags(Resources=instance_ids, Tags=tags)
+    logger.info(f"Tagged instances {instance_ids} as {'quarantined' if isolated else 'quarantine failed'}")
+    return {'tags': [tag['Key'] for tag in tags]}
+
+def run_step(name, func, *args):
+    """
+    격리 단계를 실행하고 소요 시간과 결과를 기록합니다.
+    """
+    started = time.perf_counter()
+    try:
+        result = func(*args)
+        status = 'success'
+    except Exception as e:
+        logger.warning(f"Quarantine step '{name}' failed: {str(e)}")
+        result = {'error': str(e)}
+        status = 'failed'
+    return {
+        'step': name,
+        'status': status,
+        'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+        **result
+    }
+
+def extract_finding(event):
+    """
+    이벤트에서 GuardDuty Finding 정보(id, type)를 추출합니다.
+    """
+    finding = event.get('detail') or event
+    return {
+        'id': finding.get('id') or finding.get('Id') or 'unknown',
+        'type': finding.get('type') or finding.get('Type') or 'unknown'
+    }
+
+def quarantine_instance(instance_id, finding):
+    """
+    서로 독립적인 격리 단계를 병렬로 실행하고, 네트워크 격리 결과가 나온 뒤 태그를 기록합니다.
+    """
+    steps = [
+        ('isolate_network', isolate_network, instance_id),
+        ('detach_instance_profile', detach_instance_profile, instance_id),
+    ]
+    if SNAPSHOT_ON_QUARANTINE:
+        steps.append(('snapshot_volumes', snapshot_volumes, instance_id, finding))
+    
+    # 스레드마다 클라이언트를 중복 생성하지 않도록 미리 생성
+    get_client('ec2')
+    
+    with ThreadPoolExecutor(max_workers=len(steps)) as executor:
+        futures = [executor.submit(run_step, *step) for step in steps]
+        # 격리되지 않은 인스턴스가 격리된 것으로 보이지 않도록 결과에 맞춰 태그
+        isolated = futures[0].result()['status'] == 'success'
+        tag = executor.submit(run_step, 'tag_instance', tag_instances, [instance_id], finding, isolated)
+        return [future.result() for future in futures] + [tag.result()]
+
+def extract_batch(event):
+    """
+    SQS 배치 이벤트에서 인스턴스별 finding과 메시지 ID를 모읍니다 (인스턴스 ID 기준 중복 제거).
+    """
+    instances = {}
+    for record in event.get('Records', []):
+        message_id = record.get('messageId')
+        try:
+            body = json.loads(record.get('body') or '{}')
+        except ValueError:
+            logger.warning(f"Skipping message {message_id}: body is not valid JSON")
+            continue
+        
+        instance_id = extract_instance_id(body)
+        if not instance_id:
+            logger.warning(f"Skipping message {message_id}: instance ID not found")
+            continue
+        
+        entry = instances.setdefault(instance_id, {'findings': [], 'message_ids': []})
+        entry['findings'].append(extract_finding(body))
+        entry['message_ids'].append(message_id)
+    return instances
+
+def quarantine_instances(instances):
+    """
+    여러 인스턴스를 한 번에 격리합니다.
+    조회/태그는 인스턴스를 묶어 한 번에 호출하고, 배치 API가 없는 단계만 인스턴스별로 병렬 실행합니다.
+    """
+    instance_ids = list(instances)
+    results = {
+        instance_id: {
+            'instance_id': instance_id,
+            'finding_ids': [f['id'] for f in entry['findings']],
+            'steps': []
+        }
+        for instance_id, entry in instances.items()
+    }
+    
+    # finding 유형별로 인스턴스를 묶음 (태그 호출 단위)
+    by_type = {}
+    for instance_id, entry in instances.items():
+        by_type.setdefault(entry['findings'][0]['type'], []).append(instance_id)
+    
+    get_client('ec2')
+    with ThreadPoolExecutor(max_workers=max(1, min(BATCH_MAX_WORKERS, len(instance_ids)))) as executor:
+        network = {
+            instance_id: executor.submit(run_step, 'isolate_network', isolate_network, instance_id)
+            for instance_id in instance_ids
+        }
+        snapshots = {
+            instance_id: executor.submit(run_step, 'snapshot_volumes', snapshot_volumes, instance_id, instances[instance_id]['findings'][0])
+            for instance_id in instance_ids
+        } if SNAPSHOT_ON_QUARANTINE else {}
+        lookup = executor.submit(
+            run_step, 'find_instance_profiles',
+            lambda: {'associations': find_instance_profile_associations(instance_ids)}
+        )
+        
+        # 프로파일 연결 조회 결과로 인스턴스별 연결 해제
+        lookup_result = lookup.result()
+        if lookup_result['status'] == 'success':
+            associations = lookup_result['associations']
+            detach = {
+                instance_id: executor.submit(
+                    run_step, 'detach_instance_profile', disassociate_instance_profile,
+                    instance_id, associations.get(instance_id)
+                )
+                for instance_id in instance_ids
+            }
+        else:
+            detach = {}
+        
+        # 네트워크 격리 결과가 나온 뒤 finding 유형/격리 성공 여부별로 태그 호출을 묶음
+        isolated = {instance_id: network[instance_id].result()['status'] == 'success' for instance_id in instance_ids}
+        tagging = []
+        for finding_type, ids in by_type.items():
+            finding_ids = {f['id'] for instance_id in ids for f in instances[instance_id]['findings']}
+            finding = {'type': finding_type, 'id': finding_ids.pop() if len(finding_ids) == 1 else None}
+            for outcome in (True, False):
+                group = [instance_id for instance_id in ids if isolated[instance_id] == outcome]
+                if group:
+                    tagging.append((group, executor.submit(run_step, 'tag_instance', tag_instances, group, finding, outcome)))
+        
+        # 네트워크 격리 결과를 항상 먼저 기록 (조회 실패는 연결 해제 단계 실패로 기록)
+        for instance_id in instance_ids:
+            results[instance_id]['steps'].append(network[instance_id].result())
+            if instance_id in detach:
+                results[instance_id]['steps'].append(detach[instance_id].result())
+            else:
+                results[instance_id]['steps'].append({**lookup_result, 'step': 'detach_instance_profile'})
+            if instance_id in snapshots:
+                results[instance_id]['steps'].append(snapshots[instance_id].result())
+        for ids, future in tagging:
+            step = future.result()
+            for instance_id in ids:
+                results[instance_id]['steps'].append(step)
+    
+    for result in results.values():
+        result['quarantined'] = any(
+            step['step'] == 'isolate_network' and step['status'] == 'success' for step in result['steps']
+        )
+    return list(results.values())
+
+def handle_batch(event):
+    """
+    SQS 배치로 전달된 GuardDuty finding들을 한 번에 처리합니다.
+    네트워크 격리에 실패한 인스턴스의 메시지만 batchItemFailures로 반환하여 재시도합니다.
+    """
+    instances = extract_batch(event)
+    logger.info(f"Batch quarantine: {len(event.get('Records', []))} messages, {len(instances)} unique instances")
+    
+    # 모든 finding이 이미 처리된 인스턴스는 제외
+    duplicates = [
+        instance_id for instance_id, entry in instances.items()
+        if all(is_duplicate(f['id'], instance_id) for f in entry['findings'])
+    ]
+    for instance_id in duplicates:
+        del instances[instance_id]
+    if duplicates:
+        logger.info(f"Skipping {len(duplicates)} already quarantined instances: {duplicates}")
+    
+    if not instances:
+        return {'batchItemFailures': [], 'duplicates': duplicates, 'results': []}
+    
+    if not QUARANTINE_SG_ID:
+        logger.error("QUARANTINE_SECURITY_GROUP_ID environment variable is not set")
+        raise RuntimeError('QUARANTINE_SECURITY_GROUP_ID environment variable is not set')
+    
+    started = time.perf_counter()
+    results = quarantine_instances(instances)
+    duration_ms = round((time.perf_counter() - started) * 1000, 1)
+    
+    failures = [
+        {'itemIdentifier': message_id}
+        for result in results if not result['quarantined']
+        for message_id in instances[result['instance_id']]['message_ids']
+    ]
+    for result in results:
+        if result['quarantined']:
+            for finding_id in result['finding_ids']:
+                key = idempotency_key(finding_id, result['instance_id'])
+                if key:
+                    idempotency.mark(key)
+    logger.info(
+        f"Batch quarantine finished in {duration_ms} ms: "
+        f"{sum(r['quarantined'] for r in results)}/{len(results)} instances quarantined"
+    )
+    return {
+        'batchItemFailures': failures,
+        'duration_ms': duration_ms,
+        'duplicates': duplicates,
+        'results': results
+    }
+
 def lambda_handler(event, context):
+    # SQS 배치 소스: 예외는 그대로 전파하여 배치 전체를 재시도
+    if event.get('Records'):
+        log_event("Received batch event", event)
+        return handle_batch(event)
+    
     try:
-        logger.info(f"Received event: {json.dumps(event)}")
+        log_event("Received event", event)
         
         instance_id = extract_instance_id(event)
         
         if not instance_id:
-            logger.error(f"Instance ID not found in event. Event structure: {json.dumps(event, default=str)}")
+            logger.error("Instance ID not found in event. Event structure: %s", LazyJson(event))
             return {
                 'statusCode': 400,
                 'body': json.dumps({'error': 'Instance ID not found in event'})
@@ -67,41 +538,50 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'QUARANTINE_SECURITY_GROUP_ID environment variable is not set'})
             }
         
+        finding = extract_finding(event)
+        key = idempotency_key(finding['id'], instance_id)
+        if key and idempotency.seen(key):
+            logger.info(f"Duplicate finding {finding['id']} for instance {instance_id}, already quarantined")
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': 'Duplicate finding, instance already quarantined',
+                    'instance_id': instance_id,
+                    'finding_id': finding['id'],
+                    'duplicate': True
+                })
+            }
+        
         logger.info(f"Quarantining instance: {instance_id} with security group: {QUARANTINE_SG_ID}")
-        ec2.modify_instance_attribute(
-            InstanceId=instance_id,
-            Groups=[QUARANTINE_SG_ID]
-        )
-        logger.info(f"Successfully updated security group for instance: {instance_id}")
+        started = time.perf_counter()
+        steps = quarantine_instance(instance_id, finding)
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
         
-        try:
-            associations = ec2.describe_iam_instance_profile_associations(
-                Filters=[
-                    {
-                        'Name': 'instance-id',
-                        'Values': [instance_id]
-                    }
-                ]
-            )
-            
-            if associations['IamInstanceProfileAssociations']:
-                association_id = associations['IamInstanceProfileAssociations'][0]['AssociationId']
-                logger.info(f"Disassociating IAM instance profile: {association_id} from instance: {instance_id}")
-                iam.disassociate_iam_instance_profile(
-                    AssociationId=association_id
-                )
-                logger.info(f"Successfully disassociated IAM instance profile from instance: {instance_id}")
-            else:
-                logger.info(f"No IAM instance profile association found for instance: {instance_id}")
-        except Exception as e:
-            logger.warning(f"Failed to disassociate IAM instance profile for instance {instance_id}: {str(e)}")
+        # 네트워크 격리가 실패하면 격리 실패로 처리
+        network = next(step for step in steps if step['step'] == 'isolate_network')
+        if network['status'] != 'success':
+            logger.error(f"Failed to quarantine instance {instance_id}: {network.get('error')}")
+            return {
+                'statusCode': 500,
+                'body': json.dumps({
+                    'error': f"Failed to isolate instance: {network.get('error')}",
+                    'instance_id': instance_id,
+                    'duration_ms': duration_ms,
+                    'steps': steps
+                })
+            }
+        
+        if key:
+            idempotency.mark(key)
         
-        logger.info(f"Successfully quarantined instance: {instance_id}")
+        logger.info(f"Successfully quarantined instance: {instance_id} ({duration_ms} ms)")
         return {
             'statusCode': 200,
             'body': json.dumps({
                 'message': 'EC2 instance successfully quarantined',
-                'instance_id': instance_id
+                'instance_id': instance_id,
+                'duration_ms': duration_ms,
+                'steps': steps
             })
         }
         
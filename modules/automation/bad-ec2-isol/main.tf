@@ -55,11 +55,68 @@ resource "aws_security_group_rule" "bad-ec2-isol-sg-rule" {
 
 
 resource "aws_cloudwatch_event_target" "bad-ec2-isol-target" {
+  count     = var.enable_batch_queue ? 0 : 1
   rule      = aws_cloudwatch_event_rule.bad-ec2-isol-rule.name
   arn       = aws_lambda_function.bad-ec2-isol-lambda.arn
   target_id = "lambda"
 }
 
+# Finding 급증 시 SQS로 모아 배치 단위로 격리
+resource "aws_sqs_queue" "bad-ec2-isol-queue" {
+  count                      = var.enable_batch_queue ? 1 : 0
+  name                       = "${var.lambda_function_name}-queue"
+  visibility_timeout_seconds = var.lambda_timeout * 6
+  message_retention_seconds  = 86400
+  sqs_managed_sse_enabled    = true
+
+  tags = merge(
+    var.tags,
+    {
+      Name = "${var.project_name}-bad-ec2-isol-queue"
+    }
+  )
+}
+
+resource "aws_sqs_queue_policy" "bad-ec2-isol-queue-policy" {
+  count     = var.enable_batch_queue ? 1 : 0
+  queue_url = aws_sqs_queue.bad-ec2-isol-queue[0].id
+  policy = jsonencode({
+    "Version": "2012-10-17",
+    "Statement": [
+        {
+            "Sid": "AllowEventBridgeSendMessage",
+            "Effect": "Allow",
+            "Principal": {
+                "Service": "events.amazonaws.com"
+            },
+            "Action": "sqs:SendMessage",
+            "Resource": aws_sqs_queue.bad-ec2-isol-queue[0].arn,
+            "Condition": {
+                "ArnEquals": {
+                    "aws:SourceArn": aws_cloudwatch_event_rule.bad-ec2-isol-rule.arn
+                }
+            }
+        }
+    ]
+})
+}
+
+resource "aws_cloudwatch_event_target" "bad-ec2-isol-queue-target" {
+  count     = var.enable_batch_queue ? 1 : 0
+  rule      = aws_cloudwatch_event_rule.bad-ec2-isol-rule.name
+  arn       = aws_sqs_queue.bad-ec2-isol-queue[0].arn
+  target_id = "sqs"
+}
+
+resource "aws_lambda_event_source_mapping" "bad-ec2-isol-queue-mapping" {
+  count                              = var.enable_batch_queue ? 1 : 0
+  event_source_arn                   = aws_sqs_queue.bad-ec2-isol-queue[0].arn
+  function_name                      = aws_lambda_function.bad-ec2-isol-lambda.arn
+  batch_size                         = var.batch_size
+  maximum_batching_window_in_seconds = var.batch_window_seconds
+  function_response_types            = ["ReportBatchItemFailures"]
+}
+
 resource "aws_lambda_permission" "allow_eventbridge" {
   statement_id  = "AllowExecutionFromEventBridge"
   action        = "lambda:InvokeFunction"
@@ -94,7 +151,7 @@ resource "aws_iam_role_policy" "bad-ec2-isol-lambda-policy" {
   role = aws_iam_role.bad-ec2-isol-lambda-role.id
   policy = jsonencode({
     "Version": "2012-10-17",
-    "Statement": [
+    "Statement": concat([
         {
             "Sid": "AllowLambdaLogging",
             "Effect": "Allow",
@@ -117,19 +174,83 @@ resource "aws_iam_role_policy" "bad-ec2-isol-lambda-policy" {
                 "arn:aws:ec2:*:*:security-group/*"
             ]
         },
+        {
+            "Sid": "AllowEC2ForensicActions",
+            "Effect": "Allow",
+            "Action": [
+                "ec2:CreateSnapshots",
+                "ec2:CreateTags"
+            ],
+            "Resource": [
+                "arn:aws:ec2:*:*:instance/*",
+                "arn:aws:ec2:*:*:volume/*",
+                "arn:aws:ec2:*::snapshot/*"
+            ]
+        },
         {
             "Sid": "AllowIAMProfileDisassociation",
             "Effect": "Allow",
             "Action": [
                 "ec2:DescribeIamInstanceProfileAssociations",
+                "ec2:DisassociateIamInstanceProfile",
                 "iam:DisassociateIamInstanceProfile"
             ],
             "Resource": "*"
         }
-    ]
+    ], var.enable_batch_queue ? [
+        {
+            "Sid": "AllowSQSBatchSource",
+            "Effect": "Allow",
+            "Action": [
+                "sqs:ReceiveMessage",
+                "sqs:DeleteMessage",
+                "sqs:GetQueueAttributes"
+            ],
+            "Resource": aws_sqs_queue.bad-ec2-isol-queue[0].arn
+        }
+    ] : [], var.enable_idempotency_table ? [
+        {
+            "Sid": "AllowIdempotencyTable",
+            "Effect": "Allow",
+            "Action": [
+                "dynamodb:GetItem",
+                "dynamodb:PutItem"
+            ],
+            "Resource": aws_dynamodb_table.bad-ec2-isol-idempotency[0].arn
+        }
+    ] : [])
 })
 }
 
+# 중복 finding 처리 방지용 멱등성 테이블 (expires_at TTL)
+resource "aws_dynamodb_table" "bad-ec2-isol-idempotency" {
+  count        = var.enable_idempotency_table ? 1 : 0
+  name         = "${var.lambda_function_name}-idempotency"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "idempotency_key"
+
+  attribute {
+    name = "idempotency_key"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  server_side_encryption {
+    enabled = true
+  }
+
+  tags = merge(
+    var.tags,
+    {
+      Name = "${var.project_name}-bad-ec2-isol-idempotency"
+    }
+  )
+}
+
 data "archive_file" "lambda_zip" {
   type        = "zip"
   source_file = "${path.module}/ec2_isol.py"
@@ -149,6 +270,13 @@ resource "aws_lambda_function" "bad-ec2-isol-lambda" {
   environment {
     variables = {
       QUARANTINE_SECURITY_GROUP_ID = aws_security_group.bad-ec2-isol-sg.id
+      SNAPSHOT_ON_QUARANTINE       = var.snapshot_on_quarantine ? "true" : "false"
+      BATCH_MAX_WORKERS            = tostring(var.batch_max_workers)
+      IDEMPOTENCY_TABLE_NAME       = var.enable_idempotency_table ? aws_dynamodb_table.bad-ec2-isol-idempotency[0].name : ""
+      IDEMPOTENCY_TTL_SECONDS      = tostring(var.idempotency_ttl_seconds)
+      LOG_LEVEL                    = var.log_level
+      LOG_MAX_CHARS                = tostring(var.log_max_chars)
+      LOG_SAMPLE_RATE              = tostring(var.log_sample_rate)
     }
   }
 
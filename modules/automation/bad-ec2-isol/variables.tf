@@ -56,3 +56,62 @@ variable "security_group_name" {
   default = "bad-ec2-isol-sg"
 }
 
+variable "snapshot_on_quarantine" {
+  description = "격리 시 포렌식용 EBS 스냅샷 생성 여부"
+  type        = bool
+  default     = true
+}
+
+variable "enable_batch_queue" {
+  description = "GuardDuty finding을 SQS로 모아 배치 단위로 격리 (false면 EventBridge가 Lambda를 직접 호출)"
+  type        = bool
+  default     = false
+}
+
+variable "batch_size" {
+  description = "SQS 배치당 최대 메시지 수"
+  type        = number
+  default     = 50
+}
+
+variable "batch_window_seconds" {
+  description = "배치를 모으는 최대 대기 시간 (초)"
+  type        = number
+  default     = 5
+}
+
+variable "batch_max_workers" {
+  description = "배치 격리 시 인스턴스별 API 호출 동시 실행 수"
+  type        = number
+  default     = 10
+}
+
+variable "enable_idempotency_table" {
+  description = "중복 GuardDuty finding 기록용 DynamoDB 테이블 사용 (false면 컨테이너 내 캐시만 사용)"
+  type        = bool
+  default     = false
+}
+
+variable "idempotency_ttl_seconds" {
+  description = "처리한 finding을 중복으로 간주하는 기간 (초)"
+  type        = number
+  default     = 86400
+}
+
+variable "log_level" {
+  description = "Lambda 로그 레벨 (DEBUG, INFO, WARNING, ERROR)"
+  type        = string
+  default     = "INFO"
+}
+
+variable "log_max_chars" {
+  description = "로그 한 줄에 기록할 JSON 최대 길이 (초과분은 잘라냄)"
+  type        = number
+  default     = 2048
+}
+
+variable "log_sample_rate" {
+  description = "수신 이벤트 요약을 기록할 호출 비율 (0~1, 오류 로그는 항상 기록)"
+  type        = number
+  default     = 1
+}
@@ -1,6 +1,6 @@
 resource "aws_cloudwatch_event_rule" "ec2-monitoring-repair-rule" {
   name = "ec2-monitoring-repair-rule"
-  event_pattern = jsoncode({
+  event_pattern = jsonencode({
     "source": ["aws.ec2"],
     "detail-type": ["AWS API Call via CloudTrail"],
     "detail": {
@@ -20,11 +20,73 @@ resource "aws_cloudwatch_event_rule" "ec2-monitoring-repair-rule" {
 }
 
 resource "aws_cloudwatch_event_target" "ec2-monitoring-repair-target" {
+  count     = var.enable_batch_queue ? 0 : 1
   rule      = aws_cloudwatch_event_rule.ec2-monitoring-repair-rule.name
   arn       = aws_lambda_function.monitoring-repair-lambda.arn
   target_id = "lambda"
 }
 
+# UnmonitorInstances 이벤트 급증 시 SQS로 모아 배치 단위로 재활성화
+resource "aws_sqs_queue" "ec2-monitoring-repair-dlq" {
+  count                     = var.enable_batch_queue ? 1 : 0
+  name                      = "${var.lambda_function_name}-dlq"
+  message_retention_seconds = 1209600
+  sqs_managed_sse_enabled   = true
+}
+
+resource "aws_sqs_queue" "ec2-monitoring-repair-queue" {
+  count                      = var.enable_batch_queue ? 1 : 0
+  name                       = "${var.lambda_function_name}-queue"
+  visibility_timeout_seconds = var.lambda_timeout * 6
+  message_retention_seconds  = 86400
+  sqs_managed_sse_enabled    = true
+  # 계속 실패하는 메시지는 무한 재시도하지 않고 DLQ로 이동
+  redrive_policy = jsonencode({
+    deadLetterTargetArn = aws_sqs_queue.ec2-monitoring-repair-dlq[0].arn
+    maxReceiveCount     = var.max_receive_count
+  })
+}
+
+resource "aws_sqs_queue_policy" "ec2-monitoring-repair-queue-policy" {
+  count     = var.enable_batch_queue ? 1 : 0
+  queue_url = aws_sqs_queue.ec2-monitoring-repair-queue[0].id
+  policy = jsonencode({
+    "Version": "2012-10-17",
+    "Statement": [
+      {
+        "Sid": "AllowEventBridgeSendMessage",
+        "Effect": "Allow",
+        "Principal": {
+          "Service": "events.amazonaws.com"
+        },
+        "Action": "sqs:SendMessage",
+        "Resource": aws_sqs_queue.ec2-monitoring-repair-queue[0].arn,
+        "Condition": {
+          "ArnEquals": {
+            "aws:SourceArn": aws_cloudwatch_event_rule.ec2-monitoring-repair-rule.arn
+          }
+        }
+      }
+    ]
+  })
+}
+
+resource "aws_cloudwatch_event_target" "ec2-monitoring-repair-queue-target" {
+  count     = var.enable_batch_queue ? 1 : 0
+  rule      = aws_cloudwatch_event_rule.ec2-monitoring-repair-rule.name
+  arn       = aws_sqs_queue.ec2-monitoring-repair-queue[0].arn
+  target_id = "sqs"
+}
+
+resource "aws_lambda_event_source_mapping" "ec2-monitoring-repair-queue-mapping" {
+  count                              = var.enable_batch_queue ? 1 : 0
+  event_source_arn                   = aws_sqs_queue.ec2-monitoring-repair-queue[0].arn
+  function_name                      = aws_lambda_function.monitoring-repair-lambda.arn
+  batch_size                         = var.batch_size
+  maximum_batching_window_in_seconds = var.batch_window_seconds
+  function_response_types            = ["ReportBatchItemFailures"]
+}
+
 resource "aws_lambda_permission" "allow_eventbridge" {
   statement_id  = "AllowExecutionFromEventBridge"
   action        = "lambda:InvokeFunction"
@@ -33,6 +95,54 @@ resource "aws_lambda_permission" "allow_eventbridge" {
   source_arn    = aws_cloudwatch_event_rule.ec2-monitoring-repair-rule.arn
 }
 
+# 모니터링 drift 재조정 스케줄 (전체 인스턴스)
+resource "aws_cloudwatch_event_rule" "ec2-monitoring-reconcile-rule" {
+  count               = var.enable_reconcile ? 1 : 0
+  name                = "ec2-monitoring-reconcile-rule"
+  schedule_expression = var.reconcile_schedule
+}
+
+resource "aws_cloudwatch_event_target" "ec2-monitoring-reconcile-target" {
+  count     = var.enable_reconcile ? 1 : 0
+  rule      = aws_cloudwatch_event_rule.ec2-monitoring-reconcile-rule[0].name
+  arn       = aws_lambda_function.monitoring-repair-lambda.arn
+  target_id = "lambda"
+  input     = jsonencode({ mode = "reconcile" })
+}
+
+resource "aws_lambda_permission" "allow_eventbridge_reconcile" {
+  count         = var.enable_reconcile ? 1 : 0
+  statement_id  = "AllowExecutionFromEventBridgeReconcile"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.monitoring-repair-lambda.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.ec2-monitoring-reconcile-rule[0].arn
+}
+
+# 모니터링 drift 재조정 스케줄 (최근 시작된 인스턴스만)
+resource "aws_cloudwatch_event_rule" "ec2-monitoring-incremental-reconcile-rule" {
+  count               = var.enable_incremental_reconcile ? 1 : 0
+  name                = "ec2-monitoring-incremental-reconcile-rule"
+  schedule_expression = var.incremental_reconcile_schedule
+}
+
+resource "aws_cloudwatch_event_target" "ec2-monitoring-incremental-reconcile-target" {
+  count     = var.enable_incremental_reconcile ? 1 : 0
+  rule      = aws_cloudwatch_event_rule.ec2-monitoring-incremental-reconcile-rule[0].name
+  arn       = aws_lambda_function.monitoring-repair-lambda.arn
+  target_id = "lambda"
+  input     = jsonencode({ mode = "reconcile", incremental = true })
+}
+
+resource "aws_lambda_permission" "allow_eventbridge_incremental_reconcile" {
+  count         = var.enable_incremental_reconcile ? 1 : 0
+  statement_id  = "AllowExecutionFromEventBridgeIncrementalReconcile"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.monitoring-repair-lambda.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.ec2-monitoring-incremental-reconcile-rule[0].arn
+}
+
 resource "aws_iam_role" "monitoring-repair-lambda-role" {
   name = "monitoring-repair-lambda-role"
   assume_role_policy = jsonencode({
@@ -52,7 +162,7 @@ resource "aws_iam_role_policy" "monitoring-repair-lambda-policy" {
   role = aws_iam_role.monitoring-repair-lambda-role.id
   policy = jsonencode({
     "Version": "2012-10-17",
-    "Statement": [
+    "Statement": concat([
       {
         "Effect": "Allow",
         "Action": [
@@ -66,8 +176,24 @@ resource "aws_iam_role_policy" "monitoring-repair-lambda-policy" {
         "Effect": "Allow",
         "Action": "ec2:MonitorInstances",
         "Resource": "*"
+      },
+      {
+        "Effect": "Allow",
+        "Action": "ec2:DescribeInstances",
+        "Resource": "*"
       }
-    ]
+    ], var.enable_batch_queue ? [
+      {
+        "Sid": "AllowSQSBatchSource",
+        "Effect": "Allow",
+        "Action": [
+          "sqs:ReceiveMessage",
+          "sqs:DeleteMessage",
+          "sqs:GetQueueAttributes"
+        ],
+        "Resource": aws_sqs_queue.ec2-monitoring-repair-queue[0].arn
+      }
+    ] : [])
   })
 }
 
@@ -95,5 +221,11 @@ resource "aws_lambda_function" "monitoring-repair-lambda" {
   # 메모리, 타임아웃 설정
   memory_size = var.lambda_memory_size
   timeout     = var.lambda_timeout
+
+  environment {
+    variables = {
+      RECONCILE_LOOKBACK_MINUTES = tostring(var.reconcile_lookback_minutes)
+    }
+  }
 }
 
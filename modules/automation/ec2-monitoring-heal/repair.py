@@ -1,18 +1,241 @@
 import boto3
 import json
+import os
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
-ec2_client = boto3.client('ec2')
+# boto3 클라이언트 설정 (연결 풀, 적응형 재시도, 타임아웃)
+BOTO_CONFIG = Config(
+    max_pool_connections=20,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    connect_timeout=3,
+    read_timeout=10,
+)
+
+@lru_cache(maxsize=None)
+def get_client(service):
+    """
+    boto3 클라이언트를 처음 사용할 때 생성하고 컨테이너 수명 동안 재사용합니다.
+    """
+    return boto3.client(service, config=BOTO_CONFIG)
+
+MONITOR_BATCH_SIZE = 100  # MonitorInstances 호출당 인스턴스 수
+FILTER_VALUES_MAX = 200  # describe_instances 필터 값 최대 개수
+UNMONITORED_STATES = ['disabled', 'disabling']
+REPAIRABLE_INSTANCE_STATES = ['pending', 'running', 'stopping', 'stopped']
+RECONCILE_PAGE_SIZE = 1000
+RECONCILE_LOOKBACK_MINUTES = int(os.environ.get('RECONCILE_LOOKBACK_MINUTES', '30'))
+MAX_REPORTED_FAILURES = 100
+# 청크 안의 일부 인스턴스 때문에 MonitorInstances 전체가 실패하는 오류 (인스턴스별로 재시도)
+INSTANCE_ERROR_CODES = {
+    'InvalidInstanceID.NotFound', 'InvalidInstanceID.Malformed', 'IncorrectInstanceState', 'InvalidState'
+}
+
+def chunked(values, size):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+def extract_instance_ids(event):
+    """
+    CloudTrail UnmonitorInstances 이벤트에서 인스턴스 ID 추출
+    """
+    items = event['detail']['requestParameters']['instancesSet']['items']
+    return [item['instanceId'] for item in items]
+
+def extract_batch(event):
+    """
+    SQS 배치의 각 메시지(EventBridge 이벤트)에서 인스턴스 ID를 모읍니다.
+    반환값: {인스턴스 ID: [메시지 ID, ...]} (인스턴스 ID 기준 중복 제거)
+    """
+    instances = {}
+    for record in event.get('Records', []):
+        message_id = record.get('messageId')
+        try:
+            instance_ids = extract_instance_ids(json.loads(record.get('body') or '{}'))
+        except (ValueError, KeyError, TypeError):
+            print(f"Skipping message {message_id}: invalid event structure")
+            continue
+        for instance_id in instance_ids:
+            instances.setdefault(instance_id, []).append(message_id)
+    return instances
+
+def iter_unmonitored_instances(filters, page_size=None):
+    """
+    상세 모니터링이 꺼진 인스턴스를 페이지 단위로 조회 (monitoring-state 서버 측 필터)
+    """
+    paginator = get_client('ec2').get_paginator('describe_instances')
+    filters = filters + [
+        {'Name': 'monitoring-state', 'Values': UNMONITORED_STATES},
+        {'Name': 'instance-state-name', 'Values': REPAIRABLE_INSTANCE_STATES}
+    ]
+    pagination = {'PageSize': page_size} if page_size else {}
+    for page in paginator.paginate(Filters=filters, PaginationConfig=pagination):
+        for reservation in page.get('Reservations', []):
+            for instance in reservation.get('Instances', []):
+                yield instance
+
+def enable_monitoring(instance_ids):
+    """
+    MonitorInstances를 MONITOR_BATCH_SIZE 단위로 호출
+    MonitorInstances는 호출 단위로 성공/실패하므로, 조회 이후 종료되는 등 인스턴스 오류로 청크가 실패하면
+    인스턴스별로 다시 호출하여 문제 인스턴스만 제외합니다.
+    반환값: (활성화된 인스턴스 ID 목록, 실패한 인스턴스 ID 목록, 더 이상 대상이 아닌 인스턴스 ID 목록)
+    """
+    enabled, failed, dropped = [], [], []
+    for chunk in chunked(instance_ids, MONITOR_BATCH_SIZE):
+        try:
+            get_client('ec2').monitor_instances(InstanceIds=chunk)
+            enabled.extend(chunk)
+            continue
+        except ClientError as e:
+            if e.response['Error']['Code'] not in INSTANCE_ERROR_CODES:
+                print(f"MonitorInstances failed for {len(chunk)} instances: {e}")
+                failed.extend(chunk)
+                continue
+            print(f"MonitorInstances failed for {len(chunk)} instances, retrying per instance: {e}")
+        except Exception as e:
+            print(f"MonitorInstances failed for {len(chunk)} instances: {e}")
+            failed.extend(chunk)
+            continue
+        
+        for instance_id in chunk:
+            try:
+                get_client('ec2').monitor_instances(InstanceIds=[instance_id])
+                enabled.append(instance_id)
+            except ClientError as e:
+                if e.response['Error']['Code'] in INSTANCE_ERROR_CODES:
+                    # 종료되었거나 모니터링할 수 없는 상태: 재시도해도 성공하지 않음
+                    print(f"Skipping {instance_id}: {e}")
+                    dropped.append(instance_id)
+                else:
+                    print(f"MonitorInstances failed for {instance_id}: {e}")
+                    failed.append(instance_id)
+    return enabled, failed, dropped
+
+def repair_monitoring(instance_ids):
+    """
+    중복을 제거하고, 이미 모니터링 중이거나 종료된 인스턴스는 제외한 뒤 모니터링을 재활성화합니다.
+    """
+    instance_ids = list(dict.fromkeys(instance_ids))
+    unmonitored = []
+    for chunk in chunked(instance_ids, FILTER_VALUES_MAX):
+        unmonitored.extend(
+            instance['InstanceId']
+            for instance in iter_unmonitored_instances([{'Name': 'instance-id', 'Values': chunk}])
+        )
+    
+    enabled, failed, dropped = enable_monitoring(unmonitored)
+    candidates = set(unmonitored) - set(dropped)
+    return {
+        'requested': len(instance_ids),
+        'skipped': [i for i in instance_ids if i not in candidates],
+        'enabled': enabled,
+        'failed': failed
+    }
+
+def handle_batch(event):
+    """
+    SQS 배치로 모인 UnmonitorInstances 이벤트를 한 번에 처리합니다.
+    재활성화에 실패한 인스턴스가 포함된 메시지만 batchItemFailures로 반환하여 재시도합니다.
+    """
+    instances = extract_batch(event)
+    print(f"Coalesced {len(event.get('Records', []))} messages into {len(instances)} unique instances")
+    
+    result = repair_monitoring(list(instances))
+    failed_messages = dict.fromkeys(
+        message_id for instance_id in result['failed'] for message_id in instances[instance_id]
+    )
+    print(f"Monitoring re-enabled for {len(result['enabled'])} instances, "
+          f"{len(result['skipped'])} skipped, {len(result['failed'])} failed")
+    return {
+        'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failed_messages],
+        'result': result
+    }
+
+def launch_time_filter(since, until):
+    """
+    since~until 기간의 날짜별 launch-time 와일드카드 필터 (예: 2024-05-01T*)
+    """
+    days = []
+    day = since.date()
+    while day <= until.date():
+        days.append(f"{day.isoformat()}T*")
+        day += timedelta(days=1)
+    return {'Name': 'launch-time', 'Values': days}
+
+def reconcile(incremental=False, now=None):
+    """
+    모니터링이 꺼진 인스턴스를 전체(또는 최근 시작된 인스턴스만) 조회하여 일괄 재활성화합니다.
+    페이지를 읽는 대로 MONITOR_BATCH_SIZE 단위로 처리하므로 메모리 사용량은 한 페이지 수준입니다.
+    incremental이면 RECONCILE_LOOKBACK_MINUTES 이내에 시작된 인스턴스만 확인합니다.
+    """
+    now = now or datetime.now(timezone.utc)
+    filters = []
+    since = None
+    if incremental:
+        since = now - timedelta(minutes=RECONCILE_LOOKBACK_MINUTES)
+        filters.append(launch_time_filter(since, now))
+    
+    found, enabled_count, dropped_count, failed = 0, 0, 0, []
+    batch = []
+    
+    def flush():
+        nonlocal enabled_count, dropped_count
+        enabled, batch_failed, dropped = enable_monitoring(batch)
+        enabled_count += len(enabled)
+        dropped_count += len(dropped)
+        failed.extend(batch_failed[:MAX_REPORTED_FAILURES - len(failed)])
+        batch.clear()
+    
+    for instance in iter_unmonitored_instances(filters, page_size=RECONCILE_PAGE_SIZE):
+        if since and instance['LaunchTime'] < since:
+            continue
+        found += 1
+        batch.append(instance['InstanceId'])
+        if len(batch) >= MONITOR_BATCH_SIZE:
+            flush()
+    if batch:
+        flush()
+    
+    print(f"Reconcile ({'incremental since ' + since.isoformat() if since else 'full'}): "
+          f"{found} unmonitored instances, {enabled_count} re-enabled, {dropped_count} gone, "
+          f"{found - enabled_count - dropped_count} failed")
+    return {
+        'mode': 'incremental' if incremental else 'full',
+        'since': since.isoformat() if since else None,
+        'unmonitored': found,
+        'enabled': enabled_count,
+        'dropped': dropped_count,
+        'failed': failed
+    }
+
+def handle_reconcile(event):
+    """
+    스케줄 실행: EventBridge 이벤트 시간을 기준으로 drift 재조정
+    """
+    now = None
+    if event.get('time'):
+        now = datetime.fromisoformat(event['time'].replace('Z', '+00:00'))
+    result = reconcile(incremental=bool(event.get('incremental')), now=now)
+    return {
+        'statusCode': 500 if result['failed'] else 200,
+        'body': json.dumps({'message': 'EC2 monitoring reconcile completed', **result})
+    }
 
 def lambda_handler(event, context):
+    # SQS 배치 소스: 예외는 그대로 전파하여 배치 전체를 재시도
+    if event.get('Records'):
+        return handle_batch(event)
+    
+    # 스케줄 실행: 모니터링 drift 재조정
+    if event.get('mode') == 'reconcile':
+        return handle_reconcile(event)
+    
     try:
         # 1. 이벤트에서 EC2 인스턴스 ID 추출
-        instance_ids = []
-        
-
-        items = event['detail']['requestParameters']['instancesSet']['items']
-        
-        for item in items:
-            instance_ids.append(item['instanceId'])
+        instance_ids = extract_instance_ids(event)
             
         if not instance_ids:
             return {
@@ -20,14 +243,17 @@ def lambda_handler(event, context):
                 'body': 'No instance IDs found.'
             }
         
-        # 2. EC2 모니터링 재활성화 (MonitorInstances API 호출)
-        response = ec2_client.monitor_instances(
-            InstanceIds=instance_ids
-        )
+        # 2. EC2 모니터링 재활성화 (이미 모니터링 중인 인스턴스 제외 후 MonitorInstances 호출)
+        result = repair_monitoring(instance_ids)
+        if result['failed']:
+            return {
+                'statusCode': 500,
+                'body': json.dumps({'error': 'Failed to re-enable EC2 monitoring', **result})
+            }
             
         return {
             'statusCode': 200,
-            'body': json.dumps({'message': 'EC2 monitoring re-enabled successfully', 'instance_ids': instance_ids})
+            'body': json.dumps({'message': 'EC2 monitoring re-enabled successfully', 'instance_ids': result['enabled'], 'skipped': result['skipped']})
         }
 
     except KeyError as e:
@@ -39,4 +265,4 @@ def lambda_handler(event, context):
         return {
             'statusCode': 500,
             'body': json.dumps({'error': str(e)})
-        }
\ No newline at end of file
+        }
@@ -29,7 +29,7 @@ variable "lambda_memory_size" {
 
 variable "lambda_timeout" {
   type        = number
-  default     = 10
+  default     = 60
 }
 
 variable "event_rule_name" {
@@ -47,3 +47,56 @@ variable "iam_policy_name" {
   default     = "monitoring-repair-lambda-policy"
 }
 
+variable "enable_batch_queue" {
+  description = "UnmonitorInstances 이벤트를 SQS로 모아 배치 단위로 처리 (false면 EventBridge가 Lambda를 직접 호출)"
+  type        = bool
+  default     = false
+}
+
+variable "batch_size" {
+  description = "SQS 배치당 최대 메시지 수"
+  type        = number
+  default     = 100
+}
+
+variable "batch_window_seconds" {
+  description = "배치를 모으는 최대 대기 시간 (초)"
+  type        = number
+  default     = 10
+}
+
+variable "enable_reconcile" {
+  description = "모니터링이 꺼진 인스턴스를 주기적으로 전체 조회하여 재활성화"
+  type        = bool
+  default     = true
+}
+
+variable "reconcile_schedule" {
+  description = "전체 재조정 주기 (EventBridge schedule expression)"
+  type        = string
+  default     = "rate(1 day)"
+}
+
+variable "enable_incremental_reconcile" {
+  description = "최근 시작된 인스턴스만 짧은 주기로 재조정"
+  type        = bool
+  default     = false
+}
+
+variable "incremental_reconcile_schedule" {
+  description = "증분 재조정 주기 (EventBridge schedule expression)"
+  type        = string
+  default     = "rate(15 minutes)"
+}
+
+variable "reconcile_lookback_minutes" {
+  description = "증분 재조정 시 확인할 인스턴스 시작 시간 범위 (분). 증분 주기보다 길게 설정"
+  type        = number
+  default     = 30
+}
+
+variable "max_receive_count" {
+  description = "배치 큐 메시지를 DLQ로 보내기 전 최대 수신 횟수"
+  type        = number
+  default     = 5
+}
@@ -1,22 +1,246 @@
+import bisect
 import boto3
 import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
-# AWS 클라이언트 초기화
-backup_client = boto3.client('backup')
-rds_client = boto3.client('rds')
-s3_client = boto3.client('s3')
-
 import os
 
+# boto3 클라이언트 설정 (연결 풀, 적응형 재시도, 타임아웃)
+BOTO_CONFIG = Config(
+    max_pool_connections=20,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    connect_timeout=3,
+    read_timeout=10,
+)
+
+
+@lru_cache(maxsize=None)
+def get_client(service):
+    """
+    boto3 클라이언트를 처음 사용할 때 생성하고 컨테이너 수명 동안 재사용합니다.
+    """
+    return boto3.client(service, config=BOTO_CONFIG)
+
+
+# 이벤트 로그 설정 (허용 목록 필드만, 크기 제한, 샘플링)
+LOG_MAX_CHARS = int(os.environ.get('LOG_MAX_CHARS', '2048'))
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '1.0'))
+LOG_EVENT_FIELDS = ('id', 'source', 'detail-type', 'time', 'account', 'region', 'mode')
+LOG_DETAIL_FIELDS = ('backupJobId', 'backupVaultName', 'state', 'resourceType', 'recoveryPointArn')
+
+
+class LazyJson:
+    """
+    출력될 때만 JSON으로 직렬화하고 LOG_MAX_CHARS 길이로 자릅니다.
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        text = json.dumps(self.value, default=str)
+        if len(text) <= LOG_MAX_CHARS:
+            return text
+        return f"{text[:LOG_MAX_CHARS]}...(truncated {len(text) - LOG_MAX_CHARS} chars)"
+
+
+def event_summary(event):
+    """
+    이벤트에서 허용 목록 필드만 추린 요약
+    """
+    summary = {key: event[key] for key in LOG_EVENT_FIELDS if key in event}
+    detail = event.get('detail')
+    if isinstance(detail, dict):
+        summary['detail'] = {key: detail[key] for key in LOG_DETAIL_FIELDS if key in detail}
+    return summary
+
+
+def log_event(message, event):
+    """
+    LOG_SAMPLE_RATE 비율로 이벤트 요약을 출력합니다.
+    """
+    if LOG_SAMPLE_RATE < 1.0 and random.random() >= LOG_SAMPLE_RATE:
+        return
+    print(f"{message}: {LazyJson(event_summary(event))}")
+
+
 # 환경 변수에서 설정 읽기
 BACKUP_VAULT_NAME = os.environ.get('BACKUP_VAULT_NAME')
 AURORA_CLUSTER_ID = os.environ.get('AURORA_CLUSTER_ID')
 S3_BUCKET_NAME = os.environ.get('S3_BUCKET_NAME')
+# S3 export 암호화 KMS 키 (StartExportTask 필수 파라미터이므로 없으면 로드 시 실패)
+AURORA_EXPORT_KMS_KEY_ARN = os.environ.get('AURORA_EXPORT_KMS_KEY_ARN', '')
+if not AURORA_EXPORT_KMS_KEY_ARN:
+    raise RuntimeError("AURORA_EXPORT_KMS_KEY_ARN is not set; StartExportTask requires a KMS key")
 WARM_STORAGE_DAYS = int(os.environ.get('WARM_STORAGE_DAYS', '30'))
 ONE_YEAR_DAYS = 365  # 1년 = 365일
 SEVEN_YEARS_DAYS = 2555  # 7년 = 2555일
+MAX_REPORTED_FAILURES = 100  # 응답에 포함할 최대 실패 건수
+
+# 보존 기간 정리(삭제) 실행 설정
+DELETE_MAX_WORKERS = int(os.environ.get('DELETE_MAX_WORKERS', '4'))
+DELETE_RATE_PER_SECOND = float(os.environ.get('DELETE_RATE_PER_SECOND', '5'))
+DELETE_MAX_ATTEMPTS = 6
+DELETE_BACKOFF_BASE_SECONDS = 0.5
+DELETE_BACKOFF_MAX_SECONDS = 20
+THROTTLING_ERROR_CODES = {'ThrottlingException', 'TooManyRequestsException', 'LimitExceededException'}
+CLEANUP_TIME_BUFFER_MS = int(os.environ.get('CLEANUP_TIME_BUFFER_MS', '30000'))  # 타임아웃 전 중단 여유 시간
+CHECKPOINT_INTERVAL = 50  # 처리 건수마다 체크포인트 저장
+MAX_CHECKPOINT_FAILED_ARNS = 1000
+# 삭제 실패(delete_failed) Recovery Point 재시도 간격 (시도마다 두 배, 최대값까지)
+FAILED_RETRY_BASE_SECONDS = int(os.environ.get('FAILED_RETRY_BASE_SECONDS', str(24 * 3600)))
+FAILED_RETRY_MAX_SECONDS = 30 * 24 * 3600
+
+# 실행 간 상태(체크포인트) 저장용 DynamoDB 테이블 (미설정 시 컨테이너 메모리)
+STATE_TABLE_NAME = os.environ.get('STATE_TABLE_NAME', '')
+CLEANUP_CHECKPOINT_KEY = 'cleanup'
+
+
+class LocalStateStore:
+    """
+    DynamoDB 테이블 대신 사용하는 메모리 저장소 (로컬 실행/테이블 미설정 시).
+    """
+    def __init__(self):
+        self.items = {}
+    
+    def get(self, key):
+        return self.items.get(key)
+    
+    def put(self, key, value):
+        self.items[key] = value
+    
+    def update(self, key, mutate):
+        value = self.items.setdefault(key, {})
+        mutate(value)
+        return value
+
+
+class DynamoDBStateStore:
+    """
+    state_key(S) 파티션 키와 JSON 문자열 state(S) 속성을 가진 DynamoDB 테이블.
+    """
+    def __init__(self, table_name):
+        self.table_name = table_name
+    
+    def get(self, key):
+        item = get_client('dynamodb').get_item(
+            TableName=self.table_name,
+            Key={'state_key': {'S': key}},
+            ConsistentRead=True
+        ).get('Item')
+        return json.loads(item['state']['S']) if item else None
+    
+    def put(self, key, value):
+        get_client('dynamodb').put_item(
+            TableName=self.table_name,
+            Item={
+                'state_key': {'S': key},
+                'state': {'S': json.dumps(value)},
+                'updated_at': {'N': str(int(time.time()))}
+            }
+        )
+    
+    def update(self, key, mutate, max_attempts=5):
+        """
+        읽기 -> mutate(value) -> version 조건부 쓰기 (동시 실행 간 갱신 유실 방지)
+        """
+        for attempt in range(max_attempts):
+            item = get_client('dynamodb').get_item(
+                TableName=self.table_name,
+                Key={'state_key': {'S': key}},
+                ConsistentRead=True
+            ).get('Item') or {}
+            value = json.loads(item['state']['S']) if item else {}
+            version = int(item['version']['N']) if 'version' in item else 0
+            mutate(value)
+            try:
+                get_client('dynamodb').put_item(
+                    TableName=self.table_name,
+                    Item={
+                        'state_key': {'S': key},
+                        'state': {'S': json.dumps(value)},
+                        'version': {'N': str(version + 1)},
+                        'updated_at': {'N': str(int(time.time()))}
+                    },
+                    ConditionExpression='attribute_not_exists(#v) OR #v = :v',
+                    ExpressionAttributeNames={'#v': 'version'},
+                    ExpressionAttributeValues={':v': {'N': str(version)}}
+                )
+                return value
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'ConditionalCheckFailedException' or attempt == max_attempts - 1:
+                    raise
+
+
+state_store = DynamoDBStateStore(STATE_TABLE_NAME) if STATE_TABLE_NAME else LocalStateStore()
+
+# 클러스터별 automated 스냅샷 인덱스 (생성 시간 정렬, 컨테이너 수명 동안 증분 갱신)
+SNAPSHOT_INDEX_TTL_SECONDS = int(os.environ.get('SNAPSHOT_INDEX_TTL_SECONDS', '900'))
+_snapshot_indexes = {}
+
+# Export task 추적 (완료 폴링 백오프, 메트릭, 검증 후 조기 삭제)
+EXPORTS_STATE_KEY = 'exports'
+EXPORT_POLL_BASE_SECONDS = int(os.environ.get('EXPORT_POLL_BASE_SECONDS', '300'))
+EXPORT_POLL_MAX_SECONDS = 3600
+EXPORT_POLL_BATCH_SIZE = 50
+EARLY_DELETE_AFTER_EXPORT = os.environ.get('EARLY_DELETE_AFTER_EXPORT', 'false').lower() == 'true'
+MAX_ELIGIBLE_RECOVERY_POINTS = 1000
+METRICS_NAMESPACE = 'GoToDeep'
+
+# 과거 warm 백업 backfill (생성 시간 구간 단위 커서, RDS 동시 export 제한 준수)
+BACKFILL_STATE_KEY = 'backfill'
+BACKFILL_MAX_CONCURRENT_EXPORTS = int(os.environ.get('BACKFILL_MAX_CONCURRENT_EXPORTS', '5'))
+BACKFILL_WINDOW_DAYS = int(os.environ.get('BACKFILL_WINDOW_DAYS', '7'))
+BACKFILL_TIME_BUFFER_MS = 15000
+RUNNING_EXPORT_STATUSES = ['starting', 'in_progress', 'canceling']
+# 이 오류만 다음 실행에서 같은 지점부터 재시도하고, 그 외 오류는 실패로 기록한 뒤 건너뜀
+BACKFILL_RETRYABLE_ERROR_CODES = THROTTLING_ERROR_CODES | {
+    'Throttling', 'RequestLimitExceeded', 'ExportTaskLimitReachedFault'
+}
+MAX_BACKFILL_FAILED = 1000
+
+# export 계획 (예상 크기/시간/비용, 테이블 subset, 증분 전략)
+EXPORT_ONLY = [name.strip() for name in os.environ.get('EXPORT_ONLY', '').split(',') if name.strip()]
+EXPORT_STRATEGY = os.environ.get('EXPORT_STRATEGY', 'always')  # always | incremental
+EXPORT_MIN_INTERVAL_DAYS = int(os.environ.get('EXPORT_MIN_INTERVAL_DAYS', '7'))
+EXPORT_MIN_CHANGE_PERCENT = float(os.environ.get('EXPORT_MIN_CHANGE_PERCENT', '5'))
+EXPORT_PRICE_PER_GB = float(os.environ.get('EXPORT_PRICE_PER_GB', '0.010'))  # 스냅샷 크기 기준 과금
+DEFAULT_EXPORT_GB_PER_HOUR = 100.0  # 이력이 없을 때의 처리량 가정
+EXPORT_HISTORY_SIZE = 20
+
+
+class TokenBucket:
+    """
+    초당 rate개씩 토큰을 채우는 스레드 안전 토큰 버킷.
+    acquire()는 토큰이 생길 때까지 대기합니다.
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_seconds = (1 - self.tokens) / self.rate
+            time.sleep(wait_seconds)
 
 
 def lambda_handler(event, context):
@@ -24,6 +248,8 @@ def lambda_handler(event, context):
     Aurora DB 백업 관리:
     1. 백업 완료 이벤트 감지 시 즉시 S3 Glacier로 export
     2. 정기 스케줄: 7년 이상 보관된 백업 삭제
+    3. export 폴링 스케줄(mode=poll_exports): 진행 중인 export 완료 확인
+    4. backfill(mode=backfill): 과거 warm 백업을 S3로 export
     """
     try:
         # 환경 변수에서 설정 읽기
@@ -45,9 +271,15 @@ def lambda_handler(event, context):
         if 'source' in event and event.get('source') == 'aws.backup':
             # 백업 완료 이벤트 처리
             return handle_backup_completed_event(event, backup_vault_name, aurora_cluster_id, s3_bucket_name)
+        elif event.get('mode') == 'poll_exports':
+            # 진행 중인 export task 완료 확인
+            return handle_export_poll(backup_vault_name)
+        elif event.get('mode') == 'backfill':
+            # 이벤트 규칙 배포 이전의 warm 백업 export
+            return handle_backfill(event, context, backup_vault_name, aurora_cluster_id, s3_bucket_name)
         else:
             # 정기 스케줄 실행 (7년 이상 된 백업 정리)
-            return handle_scheduled_cleanup(backup_vault_name)
+            return handle_scheduled_cleanup(backup_vault_name, context)
         
     except Exception as e:
         print(f"Lambda execution error: {str(e)}")
@@ -63,7 +295,7 @@ def handle_backup_completed_event(event, backup_vault_name, aurora_cluster_id, s
     """
     백업 완료 이벤트 처리: 백업 완료 즉시 S3 Glacier로 export
     """
-    print(f"Backup completed event received: {json.dumps(event)}")
+    log_event("Backup completed event received", event)
     
     try:
         # EventBridge 이벤트에서 Recovery Point 정보 추출
@@ -84,7 +316,7 @@ def handle_backup_completed_event(event, backup_vault_name, aurora_cluster_id, s
         
         # Recovery Point 정보 조회
         try:
-            recovery_point_response = backup_client.describe_recovery_point(
+            recovery_point_response = get_client('backup').describe_recovery_point(
                 BackupVaultName=backup_vault_name,
                 RecoveryPointArn=recovery_point_arn
             )
@@ -144,111 +376,387 @@ def handle_backup_completed_event(event, backup_vault_name, aurora_cluster_id, s
         }
 
 
-def handle_scheduled_cleanup(backup_vault_name):
+def handle_scheduled_cleanup(backup_vault_name, context=None):
     """
     정기 스케줄 실행: 7년 이상 된 백업 삭제
+    조회 -> 필터 -> 삭제를 스트리밍으로 처리하여 보관소 크기와 무관하게 메모리를 일정하게 유지합니다.
+    삭제는 워커 풀과 토큰 버킷으로 병렬/속도 제한 실행하고, Lambda 타임아웃이 가까워지면
+    체크포인트를 남기고 중단한 뒤 다음 실행에서 이어서 처리합니다.
     """
     print(f"Running scheduled cleanup for vault: {backup_vault_name}")
     
-    seven_years_ago = datetime.now(timezone.utc) - timedelta(days=SEVEN_YEARS_DAYS)
+    checkpoint = load_cleanup_checkpoint(backup_vault_name)
+    if checkpoint['status'] == 'in_progress':
+        print(f"Resuming cleanup from checkpoint: {checkpoint['processed']} processed, "
+              f"{len(checkpoint['failed'])} failed awaiting retry")
     
-    # 백업 목록 조회
-    recovery_points = list_recovery_points(backup_vault_name)
+    seven_years_ago = datetime.now(timezone.utc) - timedelta(days=SEVEN_YEARS_DAYS)
     
-    # 7년 이상 된 백업 삭제
+    # 서버 측 필터(ByCreatedBefore)로 7년 이상 된 백업만 조회
+    recovery_points = iter_recovery_points(backup_vault_name, created_before=seven_years_ago)
     old_backups_to_delete = filter_old_backups(recovery_points, seven_years_ago)
-    print(f"Found {len(old_backups_to_delete)} recovery points older than 7 years to delete")
     
-    delete_results = []
-    for recovery_point in old_backups_to_delete:
+    report = run_deletions(old_backups_to_delete, backup_vault_name, context, checkpoint)
+    
+    total = sum(report['counts'].values())
+    if report['stopped_early']:
+        print(f"Cleanup stopped before Lambda timeout after {total} recovery points; "
+              f"remaining points will be processed in the next run: {report['counts']}")
+    else:
+        print(f"Cleanup processed {total} recovery points older than 7 years: {report['counts']}")
+    
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'message': f'Cleanup completed: {total} deletions',
+            'counts': report['counts'],
+            'failures': report['failures'],
+            'stopped_early': report['stopped_early'],
+            'checkpoint_status': checkpoint['status']
+        })
+    }
+
+
+def load_cleanup_checkpoint(backup_vault_name):
+    """
+    이전 실행의 정리 체크포인트 조회
+    완료된 체크포인트나 다른 Vault의 체크포인트는 새 패스로 시작합니다.
+    삭제에 실패한 ARN은 시도 횟수와 다음 재시도 시각을 유지하여 백오프 후 다시 시도합니다.
+    """
+    checkpoint = state_store.get(CLEANUP_CHECKPOINT_KEY)
+    if not checkpoint or checkpoint.get('vault') != backup_vault_name:
+        checkpoint = {'vault': backup_vault_name, 'failed': {}}
+    # 이전 형식(실패 ARN 목록)은 즉시 재시도 대상으로 변환
+    legacy = checkpoint.pop('failed_arns', None) or []
+    checkpoint.setdefault('failed', {})
+    for arn in legacy:
+        checkpoint['failed'].setdefault(arn, {'attempts': 1, 'retry_at': 0})
+    if checkpoint.get('status') != 'in_progress':
+        checkpoint['processed'] = 0
+    checkpoint.setdefault('status', 'new')
+    return checkpoint
+
+
+def save_cleanup_checkpoint(checkpoint, status):
+    """
+    정리 진행 상황 저장
+    """
+    checkpoint['status'] = status
+    checkpoint['updated_at'] = datetime.now(timezone.utc).isoformat()
+    failed = checkpoint['failed']
+    for arn in list(failed)[:max(0, len(failed) - MAX_CHECKPOINT_FAILED_ARNS)]:
+        del failed[arn]
+    try:
+        state_store.put(CLEANUP_CHECKPOINT_KEY, checkpoint)
+    except ClientError as e:
+        print(f"Error saving cleanup checkpoint: {str(e)}")
+
+
+def record_failed_attempt(failed, recovery_point_arn, now):
+    """
+    삭제 실패 ARN의 시도 횟수를 늘리고 지수 백오프로 다음 재시도 시각 설정
+    (최근 실패가 뒤로 가도록 다시 삽입하여 체크포인트 크기 제한 시 오래된 항목부터 제거)
+    """
+    entry = failed.pop(recovery_point_arn, None) or {'attempts': 0}
+    attempts = entry['attempts'] + 1
+    delay = min(FAILED_RETRY_MAX_SECONDS, FAILED_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    failed[recovery_point_arn] = {'attempts': attempts, 'retry_at': now + delay}
+
+
+def remaining_time_ms(context):
+    """
+    Lambda 남은 실행 시간 (context가 없으면 무제한)
+    """
+    if context is None or not hasattr(context, 'get_remaining_time_in_millis'):
+        return float('inf')
+    return context.get_remaining_time_in_millis()
+
+
+def run_deletions(recovery_points, backup_vault_name, context, checkpoint):
+    """
+    삭제 대상 Recovery Point를 워커 풀로 병렬 삭제
+    동시에 대기하는 작업은 워커 수의 2배로 제한하여 스트리밍 조회의 메모리 특성을 유지합니다.
+    """
+    limiter = TokenBucket(DELETE_RATE_PER_SECOND)
+    failed = checkpoint['failed']
+    now = time.time()
+    counts = {}
+    failures = []
+    stopped_early = False
+    
+    def record(futures):
+        for future in futures:
+            result = future.result()
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+            checkpoint['processed'] += 1
+            if result['status'] == 'delete_failed':
+                record_failed_attempt(failed, result['recovery_point_arn'], time.time())
+            elif result['status'] == 'deleted':
+                failed.pop(result['recovery_point_arn'], None)
+            if result['status'] != 'deleted' and len(failures) < MAX_REPORTED_FAILURES:
+                failures.append(result)
+            if checkpoint['processed'] % CHECKPOINT_INTERVAL == 0:
+                save_cleanup_checkpoint(checkpoint, 'in_progress')
+    
+    # 스레드 간 클라이언트 중복 생성 방지
+    get_client('backup')
+    
+    in_flight = set()
+    with ThreadPoolExecutor(max_workers=DELETE_MAX_WORKERS) as executor:
+        for recovery_point in recovery_points:
+            retry = failed.get(recovery_point['RecoveryPointArn'])
+            if retry and retry['retry_at'] > now:
+                counts['skipped'] = counts.get('skipped', 0) + 1
+                continue
+            if remaining_time_ms(context) < CLEANUP_TIME_BUFFER_MS:
+                stopped_early = True
+                break
+            if len(in_flight) >= DELETE_MAX_WORKERS * 2:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                record(done)
+            in_flight.add(executor.submit(delete_with_backoff, recovery_point, backup_vault_name, limiter))
+        
+        done, _ = wait(in_flight)
+        record(done)
+    
+    save_cleanup_checkpoint(checkpoint, 'in_progress' if stopped_early else 'complete')
+    
+    return {
+        'counts': counts,
+        'failures': failures,
+        'stopped_early': stopped_early
+    }
+
+
+def delete_with_backoff(recovery_point, backup_vault_name, limiter):
+    """
+    속도 제한을 적용해 Recovery Point 삭제
+    스로틀링 오류는 지수 백오프(full jitter)로 재시도합니다.
+    """
+    recovery_point_arn = recovery_point['RecoveryPointArn']
+    
+    for attempt in range(DELETE_MAX_ATTEMPTS):
+        limiter.acquire()
         try:
-            result = delete_recovery_point(recovery_point, backup_vault_name)
-            delete_results.append(result)
+            return delete_recovery_point(recovery_point, backup_vault_name)
+        except ClientError as e:
+            error_code = e.response['Error']['Code']
+            if error_code in THROTTLING_ERROR_CODES and attempt < DELETE_MAX_ATTEMPTS - 1:
+                delay = random.uniform(0, min(DELETE_BACKOFF_MAX_SECONDS, DELETE_BACKOFF_BASE_SECONDS * 2 ** attempt))
+                print(f"Throttled deleting {recovery_point_arn}, retrying in {delay:.2f}s")
+                time.sleep(delay)
+                continue
+            print(f"Error deleting recovery point {recovery_point_arn}: {str(e)}")
+            return {
+                'recovery_point_arn': recovery_point_arn,
+                'status': 'error',
+                'error': str(e)
+            }
         except Exception as e:
-            print(f"Error deleting recovery point {recovery_point['RecoveryPointArn']}: {str(e)}")
-            delete_results.append({
-                'recovery_point_arn': recovery_point['RecoveryPointArn'],
+            print(f"Error deleting recovery point {recovery_point_arn}: {str(e)}")
+            return {
+                'recovery_point_arn': recovery_point_arn,
                 'status': 'error',
                 'error': str(e)
-            })
+            }
+
+
+def handle_backfill(event, context, backup_vault_name, aurora_cluster_id, s3_bucket_name):
+    """
+    backfill 실행: 이벤트 규칙 배포 이전에 생성된 warm 백업을 S3로 export
+    since~until 기간을 BACKFILL_WINDOW_DAYS 구간으로 나누어 오래된 구간부터 처리하고,
+    구간의 모든 대상 export가 시작되면 커서를 다음 구간으로 옮깁니다.
+    RDS 동시 export 제한, Lambda 타임아웃, 또는 같은 클러스터의 export 진행 중(incremental)이면
+    커서를 저장하고 다음 실행에서 이어갑니다.
+    (중단된 구간을 다시 처리해도 export task ID가 같으므로 ExportTaskAlreadyExists로 건너뜀)
+    스로틀링/할당량 외의 오류로 실패한 Recovery Point는 backfill 상태에 기록하고 건너뜁니다.
+    
+    event 옵션: since/until (ISO 8601), restart (true면 커서 초기화)
+    """
+    state = state_store.get(BACKFILL_STATE_KEY)
+    if event.get('restart') or not state or state.get('vault') != backup_vault_name:
+        now = datetime.now(timezone.utc)
+        since = parse_creation_date(event['since']) if event.get('since') else now - timedelta(days=SEVEN_YEARS_DAYS)
+        until = parse_creation_date(event['until']) if event.get('until') else now - timedelta(days=WARM_STORAGE_DAYS)
+        state = {
+            'vault': backup_vault_name,
+            'cursor': since.isoformat(),
+            'until': until.isoformat(),
+            'status': 'in_progress',
+            'counts': {}
+        }
+        print(f"Starting backfill for vault {backup_vault_name}: {state['cursor']} ~ {state['until']}")
+    
+    if state['status'] == 'complete':
+        print(f"Backfill already complete for vault {backup_vault_name} (until {state['until']})")
+        return {
+            'statusCode': 200,
+            'body': json.dumps({'message': 'Backfill already complete', 'backfill': state})
+        }
+    
+    cursor = datetime.fromisoformat(state['cursor'])
+    until = datetime.fromisoformat(state['until'])
+    counts = state['counts']
+    failed = state.setdefault('failed', {})
+    slots = BACKFILL_MAX_CONCURRENT_EXPORTS - count_running_exports()
+    stop_reason = None
+    
+    while cursor < until:
+        if slots <= 0:
+            stop_reason = 'export_limit'
+            break
+        if remaining_time_ms(context) < BACKFILL_TIME_BUFFER_MS:
+            stop_reason = 'timeout'
+            break
+        
+        window_end = min(cursor + timedelta(days=BACKFILL_WINDOW_DAYS), until)
+        recovery_points = iter_recovery_points(backup_vault_name, created_before=window_end,
+                                               created_after=cursor, resource_type='Aurora')
+        window_done = True
+        for recovery_point in filter_warm_backups_to_export(recovery_points, until):
+            if recovery_point.get('Status', 'COMPLETED') != 'COMPLETED':
+                continue
+            if slots <= 0 or remaining_time_ms(context) < BACKFILL_TIME_BUFFER_MS:
+                window_done = False
+                break
+            recovery_point_arn = recovery_point['RecoveryPointArn']
+            if recovery_point_arn in failed:
+                continue
+            try:
+                result = export_recovery_point_to_s3(recovery_point, backup_vault_name,
+                                                     aurora_cluster_id, s3_bucket_name)
+            except ClientError as e:
+                if e.response['Error']['Code'] in BACKFILL_RETRYABLE_ERROR_CODES:
+                    # 동시 export 제한 초과/스로틀링: 커서를 유지하고 다음 실행에서 재시도
+                    print(f"Backfill paused at {recovery_point_arn}: {str(e)}")
+                    window_done = False
+                    slots = 0
+                    break
+                result = record_backfill_failure(failed, recovery_point_arn, e)
+            except Exception as e:
+                result = record_backfill_failure(failed, recovery_point_arn, e)
+            if result['status'] == 'deferred':
+                # 같은 클러스터의 export가 끝난 뒤 다음 실행에서 이 지점부터 재시도
+                print(f"Backfill waiting for in-flight export: {result['plan']['reason']}")
+                window_done = False
+                stop_reason = 'export_in_progress'
+                break
+            counts[result['status']] = counts.get(result['status'], 0) + 1
+            if result['status'] == 'export_started':
+                slots -= 1
+        
+        if not window_done:
+            stop_reason = stop_reason or ('export_limit' if slots <= 0 else 'timeout')
+            break
+        cursor = window_end
+        state['cursor'] = cursor.isoformat()
+        save_backfill_state(state)
+    
+    if cursor >= until:
+        state['status'] = 'complete'
+        print(f"Backfill complete for vault {backup_vault_name}: {counts}")
+    else:
+        print(f"Backfill paused ({stop_reason}) at {state['cursor']}: {counts}")
+    save_backfill_state(state)
     
     return {
         'statusCode': 200,
         'body': json.dumps({
-            'message': f'Cleanup completed: {len(delete_results)} deletions',
-            'deletions': delete_results
+            'message': f"Backfill {state['status']}",
+            'stop_reason': stop_reason,
+            'backfill': state
         })
     }
 
 
-def list_recovery_points(backup_vault_name):
+def record_backfill_failure(failed, recovery_point_arn, error):
     """
-    Backup Vault에서 모든 Recovery Points 조회
+    재시도해도 성공하지 않는 export 실패를 기록 (이후 실행에서는 건너뜀)
     """
-    recovery_points = []
-    next_token = None
-    
-    while True:
-        try:
-            if next_token:
-                response = backup_client.list_recovery_points_by_backup_vault(
-                    BackupVaultName=backup_vault_name,
-                    NextToken=next_token
-                )
-            else:
-                response = backup_client.list_recovery_points_by_backup_vault(
-                    BackupVaultName=backup_vault_name
-                )
-            
-            recovery_points.extend(response.get('RecoveryPoints', []))
-            
-            next_token = response.get('NextToken')
-            if not next_token:
-                break
-                
-        except ClientError as e:
-            print(f"Error listing recovery points: {str(e)}")
-            raise
+    print(f"ERROR: Backfill export failed for {recovery_point_arn}, skipping: {str(error)}")
+    failed[recovery_point_arn] = {'error': str(error), 'failed_at': datetime.now(timezone.utc).isoformat()}
+    return {'recovery_point_arn': recovery_point_arn, 'status': 'export_failed', 'error': str(error)}
+
+
+def save_backfill_state(state):
+    """
+    backfill 커서 저장 (실패 기록은 최근 MAX_BACKFILL_FAILED건만 유지)
+    """
+    failed = state.get('failed', {})
+    for arn in list(failed)[:max(0, len(failed) - MAX_BACKFILL_FAILED)]:
+        del failed[arn]
+    state['updated_at'] = datetime.now(timezone.utc).isoformat()
+    state_store.put(BACKFILL_STATE_KEY, state)
+
+
+def count_running_exports():
+    """
+    계정에서 실행 중인 snapshot export task 수 (RDS 동시 export 제한 확인용)
+    """
+    paginator = get_client('rds').get_paginator('describe_export_tasks')
+    return sum(
+        len(page.get('ExportTasks', []))
+        for page in paginator.paginate(Filters=[{'Name': 'status', 'Values': RUNNING_EXPORT_STATUSES}])
+    )
+
+
+def iter_recovery_points(backup_vault_name, created_before=None, created_after=None, resource_type=None):
+    """
+    Backup Vault의 Recovery Points를 페이지 단위로 스트리밍 조회
+    created_before/created_after/resource_type은 서버 측 필터(ByCreatedBefore/ByCreatedAfter/ByResourceType)로 전달됩니다.
+    """
+    params = {'BackupVaultName': backup_vault_name}
+    if created_before:
+        params['ByCreatedBefore'] = created_before
+    if created_after:
+        params['ByCreatedAfter'] = created_after
+    if resource_type:
+        params['ByResourceType'] = resource_type
     
-    return recovery_points
+    paginator = get_client('backup').get_paginator('list_recovery_points_by_backup_vault')
+    try:
+        for page in paginator.paginate(**params):
+            yield from page.get('RecoveryPoints', [])
+    except ClientError as e:
+        print(f"Error listing recovery points: {str(e)}")
+        raise
+
+
+def parse_creation_date(value):
+    """
+    CreationDate(문자열 또는 datetime)를 datetime으로 변환
+    """
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return value
 
 
 def filter_warm_backups_to_export(recovery_points, cutoff_date):
     """
     Warm storage 기간이 끝난 백업 필터링 (S3로 export 대상)
     """
-    filtered = []
-    
     for rp in recovery_points:
         # StorageClass 확인 (WARM_STORAGE 또는 빈 값)
         storage_class = rp.get('StorageClass', 'WARM_STORAGE')
         
         # CreationDate 확인
-        creation_date_str = rp.get('CreationDate')
-        if not creation_date_str:
+        if not rp.get('CreationDate'):
             continue
-        
-        # 문자열을 datetime으로 변환
-        if isinstance(creation_date_str, str):
-            creation_date = datetime.fromisoformat(creation_date_str.replace('Z', '+00:00'))
-        else:
-            creation_date = creation_date_str
+        creation_date = parse_creation_date(rp['CreationDate'])
         
         # Warm storage 기간이 끝난 백업만 필터링 (WARM_STORAGE 또는 빈 값)
         if (storage_class in ['WARM_STORAGE', ''] and 
             creation_date < cutoff_date):
-            filtered.append(rp)
             print(f"Found warm backup ready for export: {rp['RecoveryPointArn']}, "
                   f"Created: {creation_date}, StorageClass: {storage_class}")
-    
-    return filtered
+            yield rp
 
 
 def export_recovery_point_to_s3(recovery_point, backup_vault_name, aurora_cluster_id, s3_bucket_name):
     """
     Recovery Point를 S3로 export
-    Recovery Point의 메타데이터에서 스냅샷 정보를 추출하고,
-    해당 스냅샷을 S3로 export합니다.
+    Recovery Point ARN(RDS 클러스터 스냅샷)에서 스냅샷을 바로 확인하고,
+    그렇지 않으면 스냅샷 인덱스에서 생성 시간이 가장 가까운 스냅샷을 찾아 S3로 export합니다.
     """
     recovery_point_arn = recovery_point['RecoveryPointArn']
     creation_date = recovery_point.get('CreationDate')
@@ -256,37 +764,14 @@ def export_recovery_point_to_s3(recovery_point, backup_vault_name, aurora_cluste
     print(f"Exporting recovery point {recovery_point_arn} to S3")
     
     try:
-        # Recovery Point의 메타데이터 조회
-        metadata = backup_client.get_recovery_point_restore_metadata(
-            BackupVaultName=backup_vault_name,
-            RecoveryPointArn=recovery_point_arn
-        )
+        # Aurora Recovery Point는 RDS 클러스터 스냅샷이므로 ARN에서 바로 스냅샷을 확인
+        matching_snapshot = snapshot_from_recovery_point(recovery_point)
         
         # Aurora 스냅샷 찾기 (Recovery Point 생성 시간과 가장 가까운 스냅샷)
-        if isinstance(creation_date, str):
-            creation_dt = datetime.fromisoformat(creation_date.replace('Z', '+00:00'))
-        else:
-            creation_dt = creation_date
-        
-        # 클러스터 스냅샷 목록 조회
-        snapshots = rds_client.describe_db_cluster_snapshots(
-            DBClusterIdentifier=aurora_cluster_id,
-            SnapshotType='automated'
-        )
-        
-        # Recovery Point 생성 시간과 가장 가까운 스냅샷 찾기
-        matching_snapshot = None
-        min_time_diff = None
-        
-        for snapshot in snapshots.get('DBClusterSnapshots', []):
-            snapshot_time = snapshot['SnapshotCreateTime']
-            if snapshot_time.tzinfo is None:
-                snapshot_time = snapshot_time.replace(tzinfo=timezone.utc)
-            
-            time_diff = abs((creation_dt - snapshot_time).total_seconds())
-            if min_time_diff is None or time_diff < min_time_diff:
-                min_time_diff = time_diff
-                matching_snapshot = snapshot
+        creation_dt = parse_creation_date(creation_date)
+        cluster_id = cluster_id_from_resource_arn(recovery_point.get('ResourceArn')) or aurora_cluster_id
+        if not matching_snapshot:
+            matching_snapshot = find_nearest_snapshot(cluster_id, creation_dt)
         
         if not matching_snapshot:
             # 스냅샷을 찾을 수 없으면 수동 스냅샷 생성 필요
@@ -301,8 +786,8 @@ def export_recovery_point_to_s3(recovery_point, backup_vault_name, aurora_cluste
         snapshot_id = matching_snapshot['DBClusterSnapshotIdentifier']
         
         # S3 export 경로 생성
-        export_prefix = f"aurora-backups/{aurora_cluster_id}/{creation_dt.strftime('%Y/%m/%d')}"
-        export_id = f"{snapshot_id}-{int(creation_dt.timestamp())}"
+        export_prefix = f"aurora-backups/{cluster_id}/{creation_dt.strftime('%Y/%m/%d')}"
+        export_id = export_task_identifier(snapshot_id, creation_dt)
         
         # IAM Role ARN (Lambda 환경 변수에서 가져오거나 하드코딩)
         # 실제로는 Terraform에서 export role ARN을 환경 변수로 전달해야 함
@@ -316,32 +801,58 @@ def export_recovery_point_to_s3(recovery_point, backup_vault_name, aurora_cluste
                 'message': 'Export role ARN not configured'
             }
         
+        # export 계획: 예상 크기/시간/비용 산정 및 증분 전략에 따른 생략 여부 결정
+        plan = plan_export(matching_snapshot, cluster_id, creation_dt)
+        print(f"Export plan: {json.dumps(plan)}")
+        if plan['decision'] == 'skip':
+            return {
+                'recovery_point_arn': recovery_point_arn,
+                'snapshot_id': snapshot_id,
+                'status': 'skipped_unchanged',
+                'plan': plan
+            }
+        if plan['decision'] == 'defer':
+            return {
+                'recovery_point_arn': recovery_point_arn,
+                'snapshot_id': snapshot_id,
+                'status': 'deferred',
+                'plan': plan
+            }
+        
         # Aurora 스냅샷을 S3로 export
         print(f"Starting export task for snapshot {snapshot_id} to s3://{s3_bucket_name}/{export_prefix}/")
         
-        export_response = rds_client.start_export_task(
-            ExportTaskIdentifier=export_id,
-            SourceArn=snapshot_arn,
-            S3BucketName=s3_bucket_name,
-            IamRoleArn=export_role_arn,
-            KmsKeyId=None,  # 기본 KMS 키 사용
-            S3Prefix=export_prefix
-        )
+        export_params = {
+            'ExportTaskIdentifier': export_id,
+            'SourceArn': snapshot_arn,
+            'S3BucketName': s3_bucket_name,
+            'IamRoleArn': export_role_arn,
+            'KmsKeyId': AURORA_EXPORT_KMS_KEY_ARN,
+            'S3Prefix': export_prefix
+        }
+        if EXPORT_ONLY:
+            export_params['ExportOnly'] = EXPORT_ONLY
+        export_response = get_client('rds').start_export_task(**export_params)
         
-        export_task_arn = export_response['ExportTaskArn']
+        # StartExportTask 응답에는 ARN 필드가 없으므로 export task 식별자를 기록
+        export_task_arn = export_response.get('ExportTaskIdentifier', export_id)
         
         print(f"Export task started: {export_task_arn}")
         
-        # Recovery Point 삭제 (S3로 export 완료 후)
-        # 실제로는 export 완료를 기다려야 하지만, 여기서는 즉시 삭제하지 않음
-        # 별도의 Lambda나 Step Functions로 export 완료를 모니터링해야 함
+        # 완료 여부는 export 폴링 스케줄에서 확인 (검증 전에는 Recovery Point를 삭제하지 않음)
+        try:
+            record_export_task(export_id, export_task_arn, recovery_point, snapshot_arn,
+                               f"s3://{s3_bucket_name}/{export_prefix}/", plan)
+        except ClientError as e:
+            print(f"Error recording export task {export_id}: {str(e)}")
         
         return {
             'recovery_point_arn': recovery_point_arn,
             'snapshot_id': snapshot_id,
             'export_task_arn': export_task_arn,
             's3_path': f"s3://{s3_bucket_name}/{export_prefix}/",
-            'status': 'export_started'
+            'status': 'export_started',
+            'plan': plan
         }
         
     except ClientError as e:
@@ -358,30 +869,401 @@ def export_recovery_point_to_s3(recovery_point, backup_vault_name, aurora_cluste
             raise
 
 
+def snapshot_from_recovery_point(recovery_point):
+    """
+    Recovery Point ARN이 RDS 클러스터 스냅샷 ARN이면 스냅샷 정보를 바로 구성
+    (arn:aws:rds:<region>:<account>:cluster-snapshot:<id>)
+    """
+    recovery_point_arn = recovery_point['RecoveryPointArn']
+    parts = recovery_point_arn.split(':', 6)
+    if len(parts) < 7 or parts[2] != 'rds' or parts[5] != 'cluster-snapshot':
+        return None
+    return {
+        'DBClusterSnapshotArn': recovery_point_arn,
+        'DBClusterSnapshotIdentifier': parts[6]
+    }
+
+
+def cluster_id_from_resource_arn(resource_arn):
+    """
+    Recovery Point의 ResourceArn(arn:aws:rds:...:cluster:<id>)에서 클러스터 ID 추출
+    """
+    if not resource_arn or ':cluster:' not in resource_arn:
+        return None
+    return resource_arn.split(':cluster:', 1)[1]
+
+
+def export_task_identifier(snapshot_id, creation_dt):
+    """
+    Export task ID 생성 (영문자로 시작, 영문자/숫자/하이픈, 최대 60자)
+    """
+    suffix = f"-{int(creation_dt.timestamp())}"
+    base = re.sub(r'[^A-Za-z0-9]+', '-', snapshot_id).strip('-')
+    if not base or not base[0].isalpha():
+        base = f"snap-{base}"
+    return f"{base[:60 - len(suffix)].rstrip('-')}{suffix}"
+
+
+def refresh_snapshot_index(cluster_id, index):
+    """
+    클러스터의 automated 스냅샷을 페이지 단위로 조회하여 인덱스를 증분 갱신
+    새 스냅샷만 정렬 위치에 삽입하고, 만료되어 사라진 스냅샷은 제거합니다.
+    """
+    paginator = get_client('rds').get_paginator('describe_db_cluster_snapshots')
+    current = set()
+    added = 0
+    for page in paginator.paginate(DBClusterIdentifier=cluster_id, SnapshotType='automated'):
+        for snapshot in page.get('DBClusterSnapshots', []):
+            snapshot_arn = snapshot['DBClusterSnapshotArn']
+            current.add(snapshot_arn)
+            if snapshot_arn in index['arns'] or not snapshot.get('SnapshotCreateTime'):
+                continue
+            snapshot_time = snapshot['SnapshotCreateTime']
+            if snapshot_time.tzinfo is None:
+                snapshot_time = snapshot_time.replace(tzinfo=timezone.utc)
+            position = bisect.bisect(index['times'], snapshot_time.timestamp())
+            index['times'].insert(position, snapshot_time.timestamp())
+            index['snapshots'].insert(position, {
+                'DBClusterSnapshotArn': snapshot_arn,
+                'DBClusterSnapshotIdentifier': snapshot['DBClusterSnapshotIdentifier'],
+                'DBClusterIdentifier': snapshot.get('DBClusterIdentifier', cluster_id),
+                'AllocatedStorage': snapshot.get('AllocatedStorage')
+            })
+            index['arns'].add(snapshot_arn)
+            added += 1
+    
+    expired = index['arns'] - current
+    if expired:
+        keep = [i for i, snapshot in enumerate(index['snapshots']) if snapshot['DBClusterSnapshotArn'] in current]
+        index['times'] = [index['times'][i] for i in keep]
+        index['snapshots'] = [index['snapshots'][i] for i in keep]
+        index['arns'] = current
+    
+    index['refreshed_at'] = time.time()
+    print(f"Snapshot index for {cluster_id}: {len(index['snapshots'])} snapshots "
+          f"({added} added, {len(expired)} expired)")
+
+
+def find_nearest_snapshot(cluster_id, target_dt):
+    """
+    생성 시간이 target_dt와 가장 가까운 automated 스냅샷을 이분 탐색으로 찾기
+    인덱스가 오래되었으면 먼저 갱신하고, target_dt가 가장 최근 스냅샷보다 늦으면
+    갱신 간격과 무관하게 한 번 다시 조회합니다 (같은 시각에 대해서는 반복 조회하지 않음).
+    """
+    index = _snapshot_indexes.setdefault(cluster_id, {
+        'times': [], 'snapshots': [], 'arns': set(), 'refreshed_at': 0.0, 'checked_until': 0.0
+    })
+    target = target_dt.timestamp()
+    age = time.time() - index['refreshed_at']
+    missing_latest = not index['times'] or index['times'][-1] < target
+    if age > SNAPSHOT_INDEX_TTL_SECONDS or (missing_latest and target > index['checked_until']):
+        refresh_snapshot_index(cluster_id, index)
+        index['checked_until'] = max(index['checked_until'], target)
+    
+    times = index['times']
+    if not times:
+        return None
+    position = bisect.bisect_left(times, target)
+    candidates = [i for i in (position - 1, position) if 0 <= i < len(times)]
+    nearest = min(candidates, key=lambda i: abs(times[i] - target))
+    return index['snapshots'][nearest]
+
+
+def median(values):
+    """
+    중앙값 (statistics 모듈 import 비용 없이)
+    """
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return ordered[middle] if len(ordered) % 2 else (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def snapshot_allocated_gb(snapshot):
+    """
+    스냅샷 할당 크기(GiB) 조회 (인덱스에 없으면 describe_db_cluster_snapshots 1회)
+    """
+    if snapshot.get('AllocatedStorage') is not None:
+        return snapshot['AllocatedStorage']
+    try:
+        snapshots = get_client('rds').describe_db_cluster_snapshots(
+            DBClusterSnapshotIdentifier=snapshot['DBClusterSnapshotArn']
+        ).get('DBClusterSnapshots', [])
+    except ClientError as e:
+        print(f"Error describing snapshot size: {str(e)}")
+        return None
+    return snapshots[0].get('AllocatedStorage') if snapshots else None
+
+
+def plan_export(snapshot, cluster_id, creation_dt):
+    """
+    export 전 예상 추출 크기/소요 시간/비용 산정
+    최근 완료된 export 이력(같은 ExportOnly 설정)의 추출 비율과 처리량 중앙값을 사용합니다.
+    EXPORT_STRATEGY=incremental이면 마지막 export 이후 EXPORT_MIN_INTERVAL_DAYS가 지나지 않았고
+    할당 크기 변화가 EXPORT_MIN_CHANGE_PERCENT 미만인 경우 export를 생략합니다.
+    """
+    state = state_store.get(EXPORTS_STATE_KEY) or {}
+    allocated_gb = snapshot_allocated_gb(snapshot)
+    history = [h for h in state.get('history', [])
+               if h.get('export_only', []) == EXPORT_ONLY and h.get('allocated_gb')]
+    
+    extract_ratio = median(
+        [h['extracted_gb'] / h['allocated_gb'] for h in history]
+    ) if history else 1.0
+    gb_per_hour = median(
+        [h['extracted_gb'] / (h['duration_seconds'] / 3600) for h in history
+         if h['duration_seconds'] > 0 and h['extracted_gb'] > 0] or [DEFAULT_EXPORT_GB_PER_HOUR]
+    )
+    estimated_gb = allocated_gb * extract_ratio if allocated_gb is not None else None
+    
+    plan = {
+        'cluster_id': cluster_id,
+        'allocated_gb': allocated_gb,
+        'export_only': EXPORT_ONLY,
+        'strategy': EXPORT_STRATEGY,
+        'estimated_gb': round(estimated_gb, 2) if estimated_gb is not None else None,
+        'estimated_seconds': round(estimated_gb / gb_per_hour * 3600) if estimated_gb is not None else None,
+        'estimated_cost_usd': round(allocated_gb * EXPORT_PRICE_PER_GB, 2) if allocated_gb is not None else None,
+        'history_samples': len(history),
+        'decision': 'export',
+        'reason': 'always'
+    }
+    
+    if EXPORT_STRATEGY == 'incremental':
+        last = state.get('clusters', {}).get(cluster_id)
+        pending = [task_id for task_id, record in state.get('in_flight', {}).items()
+                   if (record.get('plan') or {}).get('cluster_id') == cluster_id]
+        if pending:
+            # 진행 중인 export 결과로 판단해야 하므로 생략이 아닌 재시도 대상
+            plan['decision'] = 'defer'
+            plan['reason'] = f'export {pending[0]} in progress'
+        elif not last or not creation_dt or not last.get('recovery_point_created_at'):
+            plan['reason'] = 'no previous export'
+        else:
+            days = abs((creation_dt - datetime.fromisoformat(last['recovery_point_created_at'])).days)
+            change = None
+            if allocated_gb is not None and last.get('allocated_gb'):
+                change = abs(allocated_gb - last['allocated_gb']) / last['allocated_gb'] * 100
+            if days >= EXPORT_MIN_INTERVAL_DAYS:
+                plan['reason'] = f'{days} days since last export'
+            elif change is not None and change >= EXPORT_MIN_CHANGE_PERCENT:
+                plan['reason'] = f'allocated storage changed {change:.1f}%'
+            else:
+                plan['decision'] = 'skip'
+                plan['reason'] = f'unchanged for {days} days'
+    
+    return plan
+
+
+def record_export_task(export_task_id, export_task_arn, recovery_point, snapshot_arn, s3_path, plan):
+    """
+    진행 중인 export task 기록 (클러스터별 마지막 export는 완료 확인 후 기록)
+    """
+    now = time.time()
+    creation_date = parse_creation_date(recovery_point.get('CreationDate'))
+    record = {
+        'export_task_arn': export_task_arn,
+        'recovery_point_arn': recovery_point['RecoveryPointArn'],
+        'recovery_point_created_at': creation_date.isoformat() if creation_date else None,
+        'snapshot_arn': snapshot_arn,
+        's3_path': s3_path,
+        'started_at': now,
+        'poll_interval': EXPORT_POLL_BASE_SECONDS,
+        'next_poll_at': now + EXPORT_POLL_BASE_SECONDS,
+        'plan': plan
+    }
+    
+    def mutate(state):
+        state.setdefault('in_flight', {})[export_task_id] = record
+    
+    state_store.update(EXPORTS_STATE_KEY, mutate)
+
+
+def record_cluster_export(state, record):
+    """
+    완료된 export를 클러스터별 마지막 export 시점/크기로 기록 (더 최신 Recovery Point만 반영)
+    """
+    plan = record.get('plan') or {}
+    if not plan.get('cluster_id'):
+        return
+    created_at = record.get('recovery_point_created_at') or ''
+    last = state.setdefault('clusters', {}).get(plan['cluster_id'])
+    if not last or not created_at or last['recovery_point_created_at'] < created_at:
+        state['clusters'][plan['cluster_id']] = {
+            'recovery_point_created_at': created_at,
+            'allocated_gb': plan.get('allocated_gb')
+        }
+
+
+def describe_export_tasks_batch(export_task_ids):
+    """
+    export task 상태를 export-task-identifier 필터로 묶어서 조회
+    """
+    tasks = {}
+    paginator = get_client('rds').get_paginator('describe_export_tasks')
+    for i in range(0, len(export_task_ids), EXPORT_POLL_BATCH_SIZE):
+        chunk = export_task_ids[i:i + EXPORT_POLL_BATCH_SIZE]
+        for page in paginator.paginate(Filters=[{'Name': 'export-task-identifier', 'Values': chunk}]):
+            for task in page.get('ExportTasks', []):
+                tasks[task['ExportTaskIdentifier']] = task
+    return tasks
+
+
+def emit_metrics(metrics, dimensions):
+    """
+    CloudWatch Embedded Metric Format 로그로 메트릭 기록
+    metrics: {이름: (값, 단위)}
+    """
+    print(json.dumps({
+        '_aws': {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [list(dimensions)],
+                'Metrics': [{'Name': name, 'Unit': unit} for name, (_, unit) in metrics.items()]
+            }]
+        },
+        **dimensions,
+        **{name: value for name, (value, _) in metrics.items()}
+    }))
+
+
+def handle_export_poll(backup_vault_name):
+    """
+    진행 중인 export task 완료 확인
+    폴링 시점이 된 task만 한 번에 조회하고, 아직 진행 중이면 다음 폴링 간격을 두 배로 늘립니다.
+    완료가 확인된 Recovery Point만 조기 삭제 대상이 됩니다.
+    """
+    state = state_store.get(EXPORTS_STATE_KEY) or {}
+    in_flight = state.get('in_flight', {})
+    now = time.time()
+    due = [task_id for task_id, record in in_flight.items() if record['next_poll_at'] <= now]
+    print(f"Polling {len(due)} of {len(in_flight)} in-flight export tasks")
+    
+    tasks = describe_export_tasks_batch(due) if due else {}
+    completed, failed, running, history = [], [], [], []
+    for task_id in due:
+        task = tasks.get(task_id, {})
+        record = in_flight[task_id]
+        status = task.get('Status', 'NOT_FOUND')
+        dimensions = {'BackupVault': backup_vault_name}
+        
+        if status == 'COMPLETE':
+            if task.get('TaskStartTime') and task.get('TaskEndTime'):
+                duration = (task['TaskEndTime'] - task['TaskStartTime']).total_seconds()
+            else:
+                duration = now - record['started_at']
+            exported_bytes = int(task.get('TotalExtractedDataInGB', 0) * 1024 ** 3)
+            print(f"Export task {task_id} completed: {record['s3_path']}, "
+                  f"{duration:.0f}s, {task.get('TotalExtractedDataInGB', 0)} GB")
+            plan = record.get('plan') or {}
+            actual = {
+                'allocated_gb': plan.get('allocated_gb'),
+                'extracted_gb': task.get('TotalExtractedDataInGB', 0),
+                'duration_seconds': duration,
+                'export_only': plan.get('export_only', [])
+            }
+            print(f"Export plan vs actual: {json.dumps({'task': task_id, 'plan': plan, 'actual': actual})}")
+            history.append(actual)
+            emit_metrics({
+                'ExportsCompleted': (1, 'Count'),
+                'ExportDurationSeconds': (duration, 'Seconds'),
+                'ExportedBytes': (exported_bytes, 'Bytes')
+            }, dimensions)
+            completed.append(task_id)
+        elif status in ('FAILED', 'CANCELED', 'NOT_FOUND'):
+            print(f"ERROR: Export task {task_id} {status}: {task.get('FailureCause', 'export task not found')} "
+                  f"(recovery point {record['recovery_point_arn']} kept)")
+            emit_metrics({'ExportsFailed': (1, 'Count')}, dimensions)
+            failed.append(task_id)
+        else:
+            running.append(task_id)
+    
+    def mutate(state):
+        in_flight = state.setdefault('in_flight', {})
+        eligible = state.setdefault('eligible', {})
+        for task_id in completed + failed:
+            record = in_flight.pop(task_id, None)
+            if record and task_id in completed:
+                record_cluster_export(state, record)
+            if record and task_id in completed and EARLY_DELETE_AFTER_EXPORT:
+                eligible[record['recovery_point_arn']] = {
+                    'export_task_arn': record['export_task_arn'],
+                    'recovery_point_created_at': record['recovery_point_created_at'],
+                    'verified_at': now
+                }
+        for task_id in running:
+            record = in_flight.get(task_id)
+            if record:
+                record['poll_interval'] = min(EXPORT_POLL_MAX_SECONDS, record['poll_interval'] * 2)
+                record['next_poll_at'] = now + record['poll_interval']
+        while len(eligible) > MAX_ELIGIBLE_RECOVERY_POINTS:
+            eligible.pop(next(iter(eligible)))
+        state['history'] = (state.get('history', []) + history)[-EXPORT_HISTORY_SIZE:]
+    
+    if due:
+        state = state_store.update(EXPORTS_STATE_KEY, mutate)
+    
+    deleted = delete_verified_recovery_points(backup_vault_name, state.get('eligible', {}))
+    
+    return {
+        'statusCode': 200,
+        'body': json.dumps({
+            'message': 'Export poll completed',
+            'completed': completed,
+            'failed': failed,
+            'running': running,
+            'in_flight': len(state.get('in_flight', {})),
+            'early_deleted': deleted
+        })
+    }
+
+
+def delete_verified_recovery_points(backup_vault_name, eligible):
+    """
+    export 완료가 검증되고 warm storage 기간이 지난 Recovery Point 조기 삭제
+    (EARLY_DELETE_AFTER_EXPORT 활성화 시)
+    """
+    if not EARLY_DELETE_AFTER_EXPORT or not eligible:
+        return []
+    
+    cutoff = datetime.now(timezone.utc) - timedelta(days=WARM_STORAGE_DAYS)
+    done = []
+    for recovery_point_arn, record in eligible.items():
+        created_at = record.get('recovery_point_created_at')
+        if created_at and datetime.fromisoformat(created_at) > cutoff:
+            continue
+        try:
+            result = delete_recovery_point({'RecoveryPointArn': recovery_point_arn}, backup_vault_name)
+        except ClientError as e:
+            print(f"Error deleting exported recovery point {recovery_point_arn}: {str(e)}")
+            continue
+        done.append(result)
+    
+    def mutate(state):
+        eligible = state.setdefault('eligible', {})
+        for result in done:
+            eligible.pop(result['recovery_point_arn'], None)
+    
+    if done:
+        state_store.update(EXPORTS_STATE_KEY, mutate)
+    return [result['recovery_point_arn'] for result in done if result['status'] == 'deleted']
+
+
 def filter_old_backups(recovery_points, cutoff_date):
     """
     7년 이상 된 모든 백업 필터링 (삭제 대상)
     """
-    filtered = []
-    
+    now = datetime.now(timezone.utc)
     for rp in recovery_points:
-        creation_date_str = rp.get('CreationDate')
-        if not creation_date_str:
+        if not rp.get('CreationDate'):
             continue
-        
-        # 문자열을 datetime으로 변환
-        if isinstance(creation_date_str, str):
-            creation_date = datetime.fromisoformat(creation_date_str.replace('Z', '+00:00'))
-        else:
-            creation_date = creation_date_str
+        creation_date = parse_creation_date(rp['CreationDate'])
         
         # 7년 이상 된 백업 필터링
         if creation_date < cutoff_date:
-            filtered.append(rp)
             print(f"Found old backup to delete: {rp['RecoveryPointArn']}, "
-                  f"Created: {creation_date}, Age: {(datetime.now(timezone.utc) - creation_date).days} days")
-    
-    return filtered
+                  f"Created: {creation_date}, Age: {(now - creation_date).days} days")
+            yield rp
 
 
 def delete_recovery_point(recovery_point, backup_vault_name):
@@ -397,7 +1279,7 @@ def delete_recovery_point(recovery_point, backup_vault_name):
     
     try:
         # AWS Backup에서 Recovery Point 삭제
-        backup_client.delete_recovery_point(
+        get_client('backup').delete_recovery_point(
             BackupVaultName=backup_vault_name,
             RecoveryPointArn=recovery_point_arn
         )
@@ -428,7 +1310,7 @@ def start_copy_job_to_s3(recovery_point_arn, backup_vault_name, destination_vaul
     주의: AWS Backup은 S3로 직접 복사 불가, 다른 Backup Vault로만 복사 가능
     """
     try:
-        response = backup_client.start_copy_job(
+        response = get_client('backup').start_copy_job(
             RecoveryPointArn=recovery_point_arn,
             SourceBackupVaultName=backup_vault_name,
             DestinationBackupVaultName=destination_vault_name
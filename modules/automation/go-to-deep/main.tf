@@ -87,6 +87,25 @@ resource "aws_cloudwatch_event_rule" "go_to_deep_cleanup" {
   tags = var.tags
 }
 
+# 진행 중인 export task 완료 확인용 스케줄
+resource "aws_cloudwatch_event_rule" "go_to_deep_export_poll" {
+  name                = "${var.project_name}-go-to-deep-export-poll"
+  description         = "Schedule to verify completion of in-flight Aurora snapshot exports"
+  schedule_expression = var.export_poll_schedule
+
+  tags = var.tags
+}
+
+# 과거 warm 백업 backfill 스케줄 (완료 후에는 커서만 확인하고 종료)
+resource "aws_cloudwatch_event_rule" "go_to_deep_backfill" {
+  count               = var.enable_backfill_schedule ? 1 : 0
+  name                = "${var.project_name}-go-to-deep-backfill"
+  description         = "Schedule to export historical warm recovery points to S3"
+  schedule_expression = var.backfill_schedule
+
+  tags = var.tags
+}
+
 # 백업 완료 이벤트 타겟
 resource "aws_cloudwatch_event_target" "backup_completed" {
   rule      = aws_cloudwatch_event_rule.backup_completed.name
@@ -101,6 +120,14 @@ resource "aws_cloudwatch_event_target" "go_to_deep_cleanup" {
   arn       = aws_lambda_function.go_to_deep.arn
 }
 
+# export 폴링 스케줄 타겟
+resource "aws_cloudwatch_event_target" "go_to_deep_export_poll" {
+  rule      = aws_cloudwatch_event_rule.go_to_deep_export_poll.name
+  target_id = "${var.project_name}-go-to-deep-export-poll"
+  arn       = aws_lambda_function.go_to_deep.arn
+  input     = jsonencode({ mode = "poll_exports" })
+}
+
 resource "aws_lambda_permission" "allow_eventbridge_backup_completed" {
   statement_id  = "AllowExecutionFromEventBridgeBackupCompleted"
   action        = "lambda:InvokeFunction"
@@ -117,6 +144,32 @@ resource "aws_lambda_permission" "allow_eventbridge_cleanup" {
   source_arn    = aws_cloudwatch_event_rule.go_to_deep_cleanup.arn
 }
 
+resource "aws_lambda_permission" "allow_eventbridge_export_poll" {
+  statement_id  = "AllowExecutionFromEventBridgeExportPoll"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.go_to_deep.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.go_to_deep_export_poll.arn
+}
+
+# backfill 스케줄 타겟
+resource "aws_cloudwatch_event_target" "go_to_deep_backfill" {
+  count     = var.enable_backfill_schedule ? 1 : 0
+  rule      = aws_cloudwatch_event_rule.go_to_deep_backfill[0].name
+  target_id = "${var.project_name}-go-to-deep-backfill"
+  arn       = aws_lambda_function.go_to_deep.arn
+  input     = jsonencode({ mode = "backfill" })
+}
+
+resource "aws_lambda_permission" "allow_eventbridge_backfill" {
+  count         = var.enable_backfill_schedule ? 1 : 0
+  statement_id  = "AllowExecutionFromEventBridgeBackfill"
+  action        = "lambda:InvokeFunction"
+  function_name = aws_lambda_function.go_to_deep.function_name
+  principal     = "events.amazonaws.com"
+  source_arn    = aws_cloudwatch_event_rule.go_to_deep_backfill[0].arn
+}
+
 # CloudWatch Log Group 생성 (명시적 생성)
 resource "aws_cloudwatch_log_group" "go_to_deep" {
   name              = "/aws/lambda/${var.project_name}-go-to-deep"
@@ -137,11 +190,25 @@ resource "aws_lambda_function" "go_to_deep" {
 
   environment {
     variables = {
-      BACKUP_VAULT_NAME     = var.backup_vault_name
-      AURORA_CLUSTER_ID     = var.aurora_cluster_id
-      S3_BUCKET_NAME        = aws_s3_bucket.backup_archive.id
-      WARM_STORAGE_DAYS     = var.warm_storage_days
-      AURORA_EXPORT_ROLE_ARN = aws_iam_role.aurora_export_role.arn
+      BACKUP_VAULT_NAME               = var.backup_vault_name
+      AURORA_CLUSTER_ID               = var.aurora_cluster_id
+      S3_BUCKET_NAME                  = aws_s3_bucket.backup_archive.id
+      WARM_STORAGE_DAYS               = var.warm_storage_days
+      AURORA_EXPORT_ROLE_ARN          = aws_iam_role.aurora_export_role.arn
+      AURORA_EXPORT_KMS_KEY_ARN       = var.export_kms_key_arn
+      DELETE_MAX_WORKERS              = tostring(var.delete_max_workers)
+      DELETE_RATE_PER_SECOND          = tostring(var.delete_rate_per_second)
+      STATE_TABLE_NAME                = var.enable_state_table ? aws_dynamodb_table.go_to_deep_state[0].name : ""
+      SNAPSHOT_INDEX_TTL_SECONDS      = tostring(var.snapshot_index_ttl_seconds)
+      EXPORT_POLL_BASE_SECONDS        = tostring(var.export_poll_base_seconds)
+      EARLY_DELETE_AFTER_EXPORT       = var.early_delete_after_export ? "true" : "false"
+      BACKFILL_MAX_CONCURRENT_EXPORTS = tostring(var.backfill_max_concurrent_exports)
+      EXPORT_ONLY                     = join(",", var.export_only)
+      EXPORT_STRATEGY                 = var.export_strategy
+      EXPORT_MIN_INTERVAL_DAYS        = tostring(var.export_min_interval_days)
+      EXPORT_MIN_CHANGE_PERCENT       = tostring(var.export_min_change_percent)
+      LOG_MAX_CHARS                   = tostring(var.log_max_chars)
+      LOG_SAMPLE_RATE                 = tostring(var.log_sample_rate)
     }
   }
 
@@ -214,6 +281,7 @@ resource "aws_iam_role_policy" "go_to_deep" {
           Action = [
             "rds:DescribeDBClusterSnapshots",
             "rds:DescribeDBClusters",
+            "rds:DescribeExportTasks",
             "rds:StartExportTask"
           ]
           Resource = "*"
@@ -238,12 +306,61 @@ resource "aws_iam_role_policy" "go_to_deep" {
             "iam:PassRole"
           ]
           Resource = aws_iam_role.aurora_export_role.arn
+        },
+        {
+          Sid    = "AllowExportKmsKey"
+          Effect = "Allow"
+          Action = [
+            "kms:Encrypt",
+            "kms:Decrypt",
+            "kms:ReEncrypt*",
+            "kms:GenerateDataKey*",
+            "kms:CreateGrant",
+            "kms:DescribeKey",
+            "kms:RetireGrant"
+          ]
+          Resource = var.export_kms_key_arn
         }
-      ]
+      ],
+      var.enable_state_table ? [
+        {
+          Sid    = "AllowStateTable"
+          Effect = "Allow"
+          Action = [
+            "dynamodb:GetItem",
+            "dynamodb:PutItem"
+          ]
+          Resource = aws_dynamodb_table.go_to_deep_state[0].arn
+        }
+      ] : []
     )
   })
 }
 
+# 실행 간 상태(정리 체크포인트 등) 저장용 테이블
+resource "aws_dynamodb_table" "go_to_deep_state" {
+  count        = var.enable_state_table ? 1 : 0
+  name         = "${var.project_name}-go-to-deep-state"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "state_key"
+
+  attribute {
+    name = "state_key"
+    type = "S"
+  }
+
+  server_side_encryption {
+    enabled = true
+  }
+
+  tags = merge(
+    var.tags,
+    {
+      Name = "${var.project_name}-go-to-deep-state"
+    }
+  )
+}
+
 # Aurora Export를 위한 IAM Role (S3에 쓰기 권한)
 resource "aws_iam_role" "aurora_export_role" {
   name = "${var.project_name}-aurora-export-role"
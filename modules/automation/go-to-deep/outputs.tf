@@ -14,6 +14,10 @@ output "event_rule_arn" {
   value = aws_cloudwatch_event_rule.go_to_deep_cleanup.arn
 }
 
+output "export_poll_rule_arn" {
+  value = aws_cloudwatch_event_rule.go_to_deep_export_poll.arn
+}
+
 output "s3_bucket_name" {
   description = "Deep Archive 저장용 S3 버킷 이름"
   value       = aws_s3_bucket.backup_archive.id
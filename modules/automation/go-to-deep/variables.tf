@@ -16,12 +16,122 @@ variable "aurora_cluster_id" {
   type        = string
 }
 
+variable "export_kms_key_arn" {
+  description = "Aurora 스냅샷 S3 export 암호화에 사용할 KMS 키 ARN (StartExportTask 필수)"
+  type        = string
+
+  validation {
+    condition     = length(var.export_kms_key_arn) > 0
+    error_message = "export_kms_key_arn must be set; StartExportTask requires a KMS key."
+  }
+}
+
 variable "warm_storage_days" {
   description = "Warm storage 보관 기간 (일). 이 기간이 지나면 S3로 export"
   type        = number
   default     = 7  # AWS Backup에서 7일 warm storage만 유지
 }
 
+variable "delete_max_workers" {
+  description = "만료 백업 삭제 동시 실행 수"
+  type        = number
+  default     = 4
+}
+
+variable "delete_rate_per_second" {
+  description = "초당 DeleteRecoveryPoint 호출 상한 (AWS Backup API 제한에 맞춰 조정)"
+  type        = number
+  default     = 5
+}
+
+variable "enable_state_table" {
+  description = "정리 체크포인트 저장용 DynamoDB 테이블 사용 (false면 컨테이너 메모리만 사용)"
+  type        = bool
+  default     = true
+}
+
+variable "snapshot_index_ttl_seconds" {
+  description = "Aurora automated 스냅샷 인덱스 재조회 주기 (초)"
+  type        = number
+  default     = 900
+}
+
+variable "export_poll_schedule" {
+  description = "진행 중인 export task 완료 확인 주기 (EventBridge schedule expression)"
+  type        = string
+  default     = "rate(15 minutes)"
+}
+
+variable "export_poll_base_seconds" {
+  description = "export task 첫 폴링까지의 대기 시간 (초). 진행 중이면 폴링마다 두 배로 늘어남"
+  type        = number
+  default     = 300
+}
+
+variable "early_delete_after_export" {
+  description = "S3 export 완료가 검증된 Recovery Point를 warm_storage_days 경과 후 삭제"
+  type        = bool
+  default     = false
+}
+
+variable "enable_backfill_schedule" {
+  description = "과거 warm 백업 backfill을 스케줄로 실행 (수동 실행: {\"mode\": \"backfill\"})"
+  type        = bool
+  default     = false
+}
+
+variable "backfill_schedule" {
+  description = "backfill 실행 주기 (EventBridge schedule expression)"
+  type        = string
+  default     = "rate(1 hour)"
+}
+
+variable "backfill_max_concurrent_exports" {
+  description = "backfill이 유지할 최대 동시 snapshot export 수 (RDS 계정 할당량 이하)"
+  type        = number
+  default     = 5
+}
+
+variable "export_only" {
+  description = "S3로 export할 데이터베이스/스키마/테이블 목록 (빈 목록이면 전체 스냅샷)"
+  type        = list(string)
+  default     = []
+}
+
+variable "export_strategy" {
+  description = "export 전략: always(모든 백업) 또는 incremental(변화가 없으면 생략, 생략된 백업은 S3에 보관되지 않음)"
+  type        = string
+  default     = "always"
+  validation {
+    condition     = contains(["always", "incremental"], var.export_strategy)
+    error_message = "export_strategy must be 'always' or 'incremental'"
+  }
+}
+
+variable "export_min_interval_days" {
+  description = "incremental 전략에서 변화가 없어도 export하는 최소 간격 (일)"
+  type        = number
+  default     = 7
+}
+
+variable "export_min_change_percent" {
+  description = "incremental 전략에서 export를 실행하는 스냅샷 할당 크기 변화율 (%)"
+  type        = number
+  default     = 5
+}
+
+variable "log_max_chars" {
+  description = "로그 한 줄에 기록할 JSON 최대 길이 (초과분은 잘라냄)"
+  type        = number
+  default     = 2048
+}
+
+variable "log_sample_rate" {
+  description = "수신 이벤트 요약을 기록할 호출 비율 (0~1, 오류 로그는 항상 기록)"
+  type        = number
+  default     = 1
+}
+
 variable "tags" {
   type        = map(string)
   default     = {}
@@ -1,11 +1,171 @@
 import json
 import logging
+import os
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
 
 logger = logging.getLogger()
-logger.setLevel(logging.INFO)
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
 
-iam = boto3.client('iam')
+# boto3 클라이언트 설정 (연결 풀, 적응형 재시도, 타임아웃)
+BOTO_CONFIG = Config(
+    max_pool_connections=20,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    connect_timeout=3,
+    read_timeout=10,
+)
+
+@lru_cache(maxsize=None)
+def get_client(service):
+    """
+    boto3 클라이언트를 처음 사용할 때 생성하고 컨테이너 수명 동안 재사용합니다.
+    """
+    return boto3.client(service, config=BOTO_CONFIG)
+
+# 구조화 로그 설정 (허용 목록 필드만, 크기 제한, 샘플링)
+LOG_MAX_CHARS = int(os.environ.get('LOG_MAX_CHARS', '2048'))
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '1.0'))
+LOG_EVENT_FIELDS = ('id', 'source', 'detail-type', 'time', 'account', 'region', 'mode')
+LOG_DETAIL_FIELDS = ('id', 'type', 'severity', 'eventName', 'eventSource', 'eventID')
+
+class LazyJson:
+    """
+    로그 레코드가 실제로 출력될 때만 JSON으로 직렬화하고 LOG_MAX_CHARS 길이로 자릅니다.
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        text = json.dumps(self.value, ensure_ascii=False, default=str)
+        if len(text) <= LOG_MAX_CHARS:
+            return text
+        return f"{text[:LOG_MAX_CHARS]}...(truncated {len(text) - LOG_MAX_CHARS} chars)"
+
+def event_summary(event):
+    """
+    이벤트에서 허용 목록 필드만 추린 요약 (SQS 배치는 메시지 수만 기록)
+    """
+    summary = {key: event[key] for key in LOG_EVENT_FIELDS if key in event}
+    detail = event.get('detail')
+    if isinstance(detail, dict):
+        summary['detail'] = {key: detail[key] for key in LOG_DETAIL_FIELDS if key in detail}
+    if 'Records' in event:
+        summary['records'] = len(event['Records'])
+    return summary
+
+def log_event(message, event):
+    """
+    LOG_SAMPLE_RATE 비율로 이벤트 요약을 INFO 로그로 남깁니다.
+    """
+    if LOG_SAMPLE_RATE < 1.0 and random.random() >= LOG_SAMPLE_RATE:
+        return
+    logger.info("%s: %s", message, LazyJson(event_summary(event)))
+
+# 중복 finding 처리 방지 (컨테이너 내 LRU + 선택적 DynamoDB 영속 계층)
+IDEMPOTENCY_TABLE_NAME = os.environ.get('IDEMPOTENCY_TABLE_NAME', '')
+IDEMPOTENCY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '86400'))
+IDEMPOTENCY_CACHE_SIZE = 1024
+
+class LocalIdempotencyStore:
+    """
+    DynamoDB 테이블 대신 사용하는 메모리 저장소 (로컬 실행/테이블 미설정 시).
+    """
+    def __init__(self):
+        self.items = {}
+    
+    def get(self, key):
+        expires_at = self.items.get(key)
+        return expires_at is not None and expires_at > time.time()
+    
+    def put(self, key, expires_at):
+        self.items[key] = expires_at
+
+class DynamoDBIdempotencyStore:
+    """
+    idempotency_key(S) 파티션 키와 expires_at(N) TTL 속성을 가진 DynamoDB 테이블.
+    """
+    def __init__(self, table_name):
+        self.table_name = table_name
+    
+    def get(self, key):
+        item = get_client('dynamodb').get_item(
+            TableName=self.table_name,
+            Key={'idempotency_key': {'S': key}},
+            ConsistentRead=True
+        ).get('Item')
+        return bool(item) and int(item['expires_at']['N']) > time.time()
+    
+    def put(self, key, expires_at):
+        get_client('dynamodb').put_item(
+            TableName=self.table_name,
+            Item={
+                'idempotency_key': {'S': key},
+                'expires_at': {'N': str(int(expires_at))}
+            }
+        )
+
+class IdempotencyCache:
+    """
+    처리 완료한 (finding ID, 대상) 키를 기록합니다.
+    LRU를 먼저 확인하고, 없으면 영속 저장소를 조회합니다.
+    """
+    def __init__(self, store, max_size=IDEMPOTENCY_CACHE_SIZE, ttl_seconds=IDEMPOTENCY_TTL_SECONDS):
+        self.store = store
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.lru = OrderedDict()
+    
+    def _remember(self, key, expires_at):
+        self.lru[key] = expires_at
+        self.lru.move_to_end(key)
+        while len(self.lru) > self.max_size:
+            self.lru.popitem(last=False)
+    
+    def seen(self, key):
+        expires_at = self.lru.get(key)
+        if expires_at is not None:
+            if expires_at > time.time():
+                self.lru.move_to_end(key)
+                return True
+            del self.lru[key]
+        
+        try:
+            if self.store.get(key):
+                self._remember(key, time.time() + self.ttl_seconds)
+                return True
+        except Exception as e:
+            # 저장소 장애 시에는 중복 처리보다 조치 누락을 피함
+            logger.warning(f"Idempotency store lookup failed for {key}: {str(e)}")
+        return False
+    
+    def mark(self, key):
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, expires_at)
+        try:
+            self.store.put(key, expires_at)
+        except Exception as e:
+            logger.warning(f"Idempotency store write failed for {key}: {str(e)}")
+
+idempotency = IdempotencyCache(
+    DynamoDBIdempotencyStore(IDEMPOTENCY_TABLE_NAME) if IDEMPOTENCY_TABLE_NAME else LocalIdempotencyStore()
+)
+
+def idempotency_key(finding_id, target):
+    """
+    finding ID와 조치 대상으로 멱등성 키를 만듭니다. finding ID가 없으면 None.
+    """
+    if not finding_id or finding_id == 'unknown':
+        return None
+    return f"{finding_id}:{target}"
 
 # 모든 권한을 거부하는 정책
 DENY_ALL_POLICY = {
@@ -21,135 +181,436 @@ DENY_ALL_POLICY = {
 
 POLICY_NAME = "bad-iam"
 
-def extract_iam_user(event):
-    """
-    GuardDuty 이벤트에서 IAM 사용자 이름을 추출합니다.
-    EventBridge를 통해 전달되는 경우와 직접 GuardDuty Finding인 경우를 모두 처리합니다.
-    """
-    # 경로 1: EventBridge 구조 (detail.resource.accessKeyDetails.userName)
-    detail = event.get('detail', {})
-    if detail:
-        resource = detail.get('resource', {})
-        if resource:
-            access_key_details = resource.get('accessKeyDetails', {})
-            if access_key_details:
-                user_name = access_key_details.get('userName')
-                if user_name:
-                    return user_name
-    
-    # 경로 2: 직접 GuardDuty Finding 구조 (resource.accessKeyDetails.userName)
-    resource = event.get('resource', {})
-    if resource:
-        access_key_details = resource.get('accessKeyDetails', {})
-        if access_key_details:
-            user_name = access_key_details.get('userName')
-            if user_name:
-                return user_name
+# 역할/페더레이션 세션 무효화용 정책 이름 (토큰 발급 시각 기준 거부)
+REVOKE_SESSIONS_POLICY_NAME = "bad-iam-revoke-sessions"
+
+# 사용자/역할 인덱스 캐시 (warm 컨테이너 동안 재사용)
+PRINCIPAL_INDEX_TTL_SECONDS = int(os.environ.get('PRINCIPAL_INDEX_TTL_SECONDS', '900'))
+_principal_index = {'by_id': {}, 'by_name': {}, 'built_at': 0.0}
+
+# 자격 증명 회수 동시 실행 수 (IAM API 제한 고려)
+TEARDOWN_MAX_WORKERS = int(os.environ.get('TEARDOWN_MAX_WORKERS', '8'))
+
+def extract_principal(event):
+    """
+    이벤트에서 대상 IAM 주체 정보를 추출합니다.
+    GuardDuty Finding(accessKeyDetails)과 CloudTrail(userIdentity) 구조를 모두 처리합니다.
+    반환값: {'type', 'name', 'principal_id', 'issuer'} 또는 None
+    """
+    detail = event.get('detail', {}) or {}
+    
+    # 경로 1/2: GuardDuty Finding (EventBridge 또는 직접 전달)
+    for container in (detail, event):
+        access_key_details = (container.get('resource', {}) or {}).get('accessKeyDetails', {})
+        if access_key_details and access_key_details.get('userName'):
+            return {
+                'type': access_key_details.get('userType') or 'IAMUser',
+                'name': access_key_details.get('userName'),
+                'principal_id': access_key_details.get('principalId'),
+                'issuer': None
+            }
     
     # 경로 3: 대소문자 변형 시도 (Resource.AccessKeyDetails.UserName)
-    resource = event.get('Resource', {})
-    if resource:
-        access_key_details = resource.get('AccessKeyDetails', {})
-        if access_key_details:
-            user_name = access_key_details.get('UserName')
-            if user_name:
-                return user_name
+    access_key_details = (event.get('Resource', {}) or {}).get('AccessKeyDetails', {})
+    if access_key_details and access_key_details.get('UserName'):
+        return {
+            'type': access_key_details.get('UserType') or 'IAMUser',
+            'name': access_key_details.get('UserName'),
+            'principal_id': access_key_details.get('PrincipalId'),
+            'issuer': None
+        }
+    
+    # 경로 4: CloudTrail userIdentity (세션 발급 주체 포함)
+    identity = detail.get('userIdentity', {})
+    if identity:
+        issuer = identity.get('sessionContext', {}).get('sessionIssuer', {})
+        return {
+            'type': identity.get('type'),
+            'name': identity.get('userName') or issuer.get('userName'),
+            'principal_id': identity.get('principalId'),
+            'issuer': {'type': issuer.get('type'), 'name': issuer.get('userName')} if issuer else None
+        }
     
     return None
 
-def apply_bad_iam_policy(user_name):
+def build_principal_index():
+    """
+    계정의 IAM 사용자/역할을 한 번씩 페이징 조회하여 고유 ID/이름 -> 주체 인덱스를 생성합니다.
     """
-    IAM 사용자에게 'bad-iam' 정책을 추가하여 모든 권한을 거부합니다.
+    iam = get_client('iam')
+    by_id, by_name = {}, {}
+    for user in paginate(iam, 'list_users', 'Users'):
+        entry = {'type': 'user', 'name': user['UserName'], 'arn': user['Arn'], 'path': user.get('Path', '/')}
+        by_id[user['UserId']] = entry
+        by_name[('user', user['UserName'])] = entry
+    for role in paginate(iam, 'list_roles', 'Roles'):
+        entry = {'type': 'role', 'name': role['RoleName'], 'arn': role['Arn'], 'path': role.get('Path', '/')}
+        by_id[role['RoleId']] = entry
+        by_name[('role', role['RoleName'])] = entry
+    return by_id, by_name
+
+def principal_index_fresh():
+    """
+    인덱스가 생성되어 있고 TTL이 지나지 않았는지 확인합니다.
+    """
+    built_at = _principal_index['built_at']
+    return bool(built_at) and time.monotonic() - built_at < PRINCIPAL_INDEX_TTL_SECONDS
+
+def refresh_principal_index():
     """
+    TTL이 지났을 때 인덱스를 재생성합니다.
+    격리 조치를 늦추지 않도록 조치가 끝난 뒤에만 호출합니다.
+    """
+    if principal_index_fresh():
+        return False
+    by_id, by_name = build_principal_index()
+    _principal_index.update(by_id=by_id, by_name=by_name, built_at=time.monotonic())
+    logger.info(f"Built principal index: {len(by_id)} users and roles")
+    return True
+
+def lookup_principal(kind, name, principal_id):
+    """
+    인덱스에서 주체를 찾습니다. 고유 ID(AIDA.../AROA...) 우선, 없으면 이름으로 조회합니다.
+    """
+    unique_id = (principal_id or '').split(':')[0]
+    return _principal_index['by_id'].get(unique_id) or _principal_index['by_name'].get((kind, name))
+
+def fetch_principal(kind, name):
+    """
+    인덱스에 없는 주체를 GetUser/GetRole로 직접 조회하고 인덱스에 추가합니다.
+    인덱스 생성 이후 만들어진 사용자/역할도 최소 재생성 간격과 무관하게 찾을 수 있습니다.
+    조회 권한 부족 등 다른 오류는 격리를 늦추지 않도록 Finding의 이름으로 조치 대상을 구성합니다.
+    """
+    iam = get_client('iam')
     try:
-        # 사용자 존재 확인
-        iam.get_user(UserName=user_name)
-        logger.info(f"User {user_name} exists, proceeding with policy application")
+        if kind == 'user':
+            item = iam.get_user(UserName=name)['User']
+            unique_id, entry_name = item['UserId'], item['UserName']
+        else:
+            item = iam.get_role(RoleName=name)['Role']
+            unique_id, entry_name = item['RoleId'], item['RoleName']
     except iam.exceptions.NoSuchEntityException:
-        logger.error(f"User {user_name} does not exist")
-        raise
-    except Exception as e:
-        logger.error(f"Error checking user {user_name}: {str(e)}")
-        raise
+        logger.warning(f"IAM {kind} {name} does not exist")
+        return None
+    except ClientError as e:
+        logger.warning(f"Could not look up IAM {kind} {name}, acting on the name from the finding: {str(e)}")
+        # 서비스 연결 역할은 이름 접두사로 구분 (세션 무효화 정책 적용 불가)
+        path = '/aws-service-role/' if kind == 'role' and name.startswith('AWSServiceRoleFor') else '/'
+        return {'type': kind, 'name': name, 'arn': None, 'path': path}
+    entry = {'type': kind, 'name': entry_name, 'arn': item['Arn'], 'path': item.get('Path', '/')}
+    _principal_index['by_id'][unique_id] = entry
+    _principal_index['by_name'][(kind, entry_name)] = entry
+    return entry
+
+def principal_reference(principal):
+    """
+    Finding의 주체 정보만으로 조치 대상 종류/이름을 결정합니다 (IAM 호출 없음).
+    반환값: (kind 'user'|'role', name, session, principal_id) 또는 None
+    """
+    principal_type = principal.get('type')
+    if principal_type == 'IAMUser':
+        return 'user', principal['name'], False, principal.get('principal_id')
+    if principal_type == 'AssumedRole':
+        return 'role', principal['name'], True, principal.get('principal_id')
+    if principal_type == 'FederatedUser':
+        # 페더레이션 세션은 GetFederationToken을 호출한 IAM 사용자 권한을 따름
+        issuer = principal.get('issuer') or {}
+        if issuer.get('type') != 'IAMUser' or not issuer.get('name'):
+            return None
+        return 'user', issuer['name'], True, None
+    return None
+
+def resolve_principal(principal):
+    """
+    추출한 주체 정보를 조치 대상(IAM 사용자 또는 역할)으로 변환합니다.
+    유효한 인덱스가 있으면 사용하고, 없거나 찾지 못하면 GetUser/GetRole 단건 조회로 확인합니다.
+    반환값: {'type': 'user'|'role', 'name', 'arn', 'path', 'session': bool} 또는 None
+    """
+    reference = principal_reference(principal)
+    if not reference:
+        return None
+    kind, name, session, principal_id = reference
     
-    try:
-        # 기존 bad-iam 정책이 있는지 확인하고 삭제 (덮어쓰기)
+    entry = lookup_principal(kind, name, principal_id) if principal_index_fresh() else None
+    if not entry:
+        entry = fetch_principal(kind, name)
+    if not entry or entry['type'] != kind:
+        return None
+    return {**entry, 'session': session}
+
+def session_deny_policy(issued_before):
+    """
+    issued_before 이전에 발급된 임시 자격 증명의 모든 요청을 거부하는 정책.
+    장기 자격 증명(액세스 키) 요청에는 aws:TokenIssueTime이 없으므로 적용되지 않습니다.
+    """
+    return {
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Effect": "Deny",
+                "Action": "*",
+                "Resource": "*",
+                "Condition": {
+                    "DateLessThan": {
+                        "aws:TokenIssueTime": issued_before
+                    }
+                }
+            }
+        ]
+    }
+
+def revoke_sessions(target):
+    """
+    역할 또는 (페더레이션 세션의) 발급 사용자에 세션 무효화 정책을 적용합니다.
+    """
+    iam = get_client('iam')
+    started = time.perf_counter()
+    issued_before = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    document = json.dumps(session_deny_policy(issued_before))
+    
+    if target['type'] == 'role':
+        if target['path'].startswith('/aws-service-role/'):
+            raise ValueError(f"Cannot attach policies to service-linked role {target['name']}")
+        iam.put_role_policy(RoleName=target['name'], PolicyName=REVOKE_SESSIONS_POLICY_NAME, PolicyDocument=document)
+    else:
+        iam.put_user_policy(UserName=target['name'], PolicyName=REVOKE_SESSIONS_POLICY_NAME, PolicyDocument=document)
+    
+    logger.info(f"Revoked sessions issued before {issued_before} for {target['type']} {target['name']}")
+    return {
+        'policy_name': REVOKE_SESSIONS_POLICY_NAME,
+        'issued_before': issued_before,
+        'total_ms': round((time.perf_counter() - started) * 1000, 1)
+    }
+
+def extract_finding_id(event):
+    """
+    GuardDuty 이벤트에서 finding ID를 추출합니다.
+    """
+    finding = event.get('detail') or event
+    return finding.get('id') or finding.get('Id')
+
+def paginate(iam, operation, key, **kwargs):
+    """
+    IAM 목록 API를 페이징 조회합니다.
+    """
+    items = []
+    for page in iam.get_paginator(operation).paginate(**kwargs):
+        items.extend(page.get(key, []))
+    return items
+
+def list_user_credentials(iam, user_name, credential_type):
+    """
+    자격 증명 유형별 회수 대상 목록을 (식별자, 회수 함수) 형태로 반환합니다.
+    """
+    if credential_type == 'managed_policy':
+        return [
+            (p['PolicyArn'], lambda arn=p['PolicyArn']: iam.detach_user_policy(UserName=user_name, PolicyArn=arn))
+            for p in paginate(iam, 'list_attached_user_policies', 'AttachedPolicies', UserName=user_name)
+        ]
+    if credential_type == 'inline_policy':
+        return [
+            (name, lambda name=name: iam.delete_user_policy(UserName=user_name, PolicyName=name))
+            for name in paginate(iam, 'list_user_policies', 'PolicyNames', UserName=user_name)
+            if name != POLICY_NAME
+        ]
+    if credential_type == 'access_key':
+        return [
+            (k['AccessKeyId'], lambda key_id=k['AccessKeyId']: iam.delete_access_key(UserName=user_name, AccessKeyId=key_id))
+            for k in paginate(iam, 'list_access_keys', 'AccessKeyMetadata', UserName=user_name)
+        ]
+    if credential_type == 'login_profile':
         try:
-            iam.delete_user_policy(
-                UserName=user_name,
-                PolicyName=POLICY_NAME
-            )
-            logger.info(f"Deleted existing '{POLICY_NAME}' policy for user {user_name}")
+            iam.get_login_profile(UserName=user_name)
         except iam.exceptions.NoSuchEntityException:
-            logger.info(f"No existing '{POLICY_NAME}' policy found for user {user_name}")
-        except Exception as e:
-            logger.warning(f"Error deleting existing policy for user {user_name}: {str(e)}")
-        
-        # 새로운 거부 정책 추가
+            return []
+        return [('console', lambda: iam.delete_login_profile(UserName=user_name))]
+    if credential_type == 'ssh_public_key':
+        return [
+            (k['SSHPublicKeyId'], lambda key_id=k['SSHPublicKeyId']: iam.delete_ssh_public_key(UserName=user_name, SSHPublicKeyId=key_id))
+            for k in paginate(iam, 'list_ssh_public_keys', 'SSHPublicKeys', UserName=user_name)
+        ]
+    if credential_type == 'signing_certificate':
+        return [
+            (c['CertificateId'], lambda cert_id=c['CertificateId']: iam.delete_signing_certificate(UserName=user_name, CertificateId=cert_id))
+            for c in paginate(iam, 'list_signing_certificates', 'Certificates', UserName=user_name)
+        ]
+    if credential_type == 'service_specific_credential':
+        # ListServiceSpecificCredentials는 페이징을 지원하지 않음
+        credentials = iam.list_service_specific_credentials(UserName=user_name).get('ServiceSpecificCredentials', [])
+        return [
+            (c['ServiceSpecificCredentialId'], lambda cred_id=c['ServiceSpecificCredentialId']: iam.delete_service_specific_credential(UserName=user_name, ServiceSpecificCredentialId=cred_id))
+            for c in credentials
+        ]
+    if credential_type == 'mfa_device':
+        return [
+            (d['SerialNumber'], lambda serial=d['SerialNumber']: iam.deactivate_mfa_device(UserName=user_name, SerialNumber=serial))
+            for d in paginate(iam, 'list_mfa_devices', 'MFADevices', UserName=user_name)
+        ]
+    raise ValueError(f"Unknown credential type: {credential_type}")
+
+CREDENTIAL_TYPES = [
+    'managed_policy',
+    'inline_policy',
+    'access_key',
+    'login_profile',
+    'ssh_public_key',
+    'signing_certificate',
+    'service_specific_credential',
+    'mfa_device',
+]
+
+def timed(func):
+    """
+    함수를 실행하고 (상태, 소요 시간 ms, 오류)를 반환합니다.
+    """
+    started = time.perf_counter()
+    try:
+        func()
+        return 'revoked', round((time.perf_counter() - started) * 1000, 1), None
+    except Exception as e:
+        return 'failed', round((time.perf_counter() - started) * 1000, 1), str(e)
+
+def apply_bad_iam_policy(user_name):
+    """
+    IAM 사용자에게 'bad-iam' 정책을 추가하여 모든 권한을 거부한 뒤,
+    모든 자격 증명을 병렬로 회수합니다. 자격 증명별 소요 시간 보고서를 반환합니다.
+    """
+    iam = get_client('iam')
+    started = time.perf_counter()
+    
+    # 1. 거부 정책 우선 적용 (같은 이름의 정책은 덮어쓰기됨)
+    try:
         iam.put_user_policy(
             UserName=user_name,
             PolicyName=POLICY_NAME,
             PolicyDocument=json.dumps(DENY_ALL_POLICY)
         )
-        logger.info(f"Successfully applied '{POLICY_NAME}' policy to user {user_name}")
-        
-        # 관리형 정책도 분리 (선택적 - 모든 관리형 정책 제거)
-        try:
-            attached_policies = iam.list_attached_user_policies(UserName=user_name)
-            for policy in attached_policies.get('AttachedPolicies', []):
-                try:
-                    iam.detach_user_policy(
-                        UserName=user_name,
-                        PolicyArn=policy['PolicyArn']
-                    )
-                    logger.info(f"Detached policy {policy['PolicyArn']} from user {user_name}")
-                except Exception as e:
-                    logger.warning(f"Error detaching policy {policy['PolicyArn']} from user {user_name}: {str(e)}")
-        except Exception as e:
-            logger.warning(f"Error listing attached policies for user {user_name}: {str(e)}")
-        
-        # 액세스 키 삭제
-        try:
-            access_keys = iam.list_access_keys(UserName=user_name)
-            for key in access_keys.get('AccessKeyMetadata', []):
-                try:
-                    iam.delete_access_key(
-                        UserName=user_name,
-                        AccessKeyId=key['AccessKeyId']
-                    )
-                    logger.info(f"Deleted access key {key['AccessKeyId']} for user {user_name}")
-                except Exception as e:
-                    logger.warning(f"Error deleting access key {key['AccessKeyId']} for user {user_name}: {str(e)}")
-        except Exception as e:
-            logger.warning(f"Error listing access keys for user {user_name}: {str(e)}")
-        
+    except iam.exceptions.NoSuchEntityException:
+        logger.error(f"User {user_name} does not exist")
+        raise
     except Exception as e:
         logger.error(f"Error applying policy to user {user_name}: {str(e)}")
         raise
+    deny_ms = round((time.perf_counter() - started) * 1000, 1)
+    logger.info(f"Successfully applied '{POLICY_NAME}' policy to user {user_name} ({deny_ms} ms)")
+    
+    report = {
+        'deny_policy_ms': deny_ms,
+        'credentials': [],
+        'errors': []
+    }
+    
+    with ThreadPoolExecutor(max_workers=TEARDOWN_MAX_WORKERS) as executor:
+        # 2. 자격 증명 유형별 목록 병렬 조회
+        listings = {
+            credential_type: executor.submit(list_user_credentials, iam, user_name, credential_type)
+            for credential_type in CREDENTIAL_TYPES
+        }
+        targets = []
+        for credential_type, future in listings.items():
+            try:
+                targets.extend((credential_type, identifier, revoke) for identifier, revoke in future.result())
+            except Exception as e:
+                logger.warning(f"Error listing {credential_type} for user {user_name}: {str(e)}")
+                report['errors'].append({'type': credential_type, 'stage': 'list', 'error': str(e)})
+        
+        # 3. 모든 자격 증명 병렬 회수
+        revocations = [
+            (credential_type, identifier, executor.submit(timed, revoke))
+            for credential_type, identifier, revoke in targets
+        ]
+        for credential_type, identifier, future in revocations:
+            status, duration_ms, error = future.result()
+            entry = {'type': credential_type, 'id': identifier, 'status': status, 'duration_ms': duration_ms}
+            if error:
+                entry['error'] = error
+                logger.warning(f"Error revoking {credential_type} {identifier} for user {user_name}: {error}")
+            else:
+                logger.info(f"Revoked {credential_type} {identifier} for user {user_name}")
+            report['credentials'].append(entry)
+    
+    report['total_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    return report
 
 def lambda_handler(event, context):
     try:
-        logger.info(f"Received event: {json.dumps(event)}")
+        log_event("Received event", event)
         
-        user_name = extract_iam_user(event)
+        principal = extract_principal(event)
         
-        if not user_name:
-            logger.error(f"IAM user name not found in event. Event structure: {json.dumps(event, default=str)}")
+        if not principal or not principal.get('name'):
+            logger.error("IAM principal not found in event. Event structure: %s", LazyJson(event))
             return {
                 'statusCode': 400,
-                'body': json.dumps({'error': 'IAM user name not found in event'})
+                'body': json.dumps({'error': 'IAM principal not found in event'})
             }
         
-        logger.info(f"Applying 'bad-iam' policy to IAM user: {user_name}")
-        apply_bad_iam_policy(user_name)
+        reference = principal_reference(principal)
+        
+        # 중복 Finding은 IAM 조회 없이 Finding의 주체 종류/이름으로 바로 종료
+        finding_id = extract_finding_id(event)
+        key = idempotency_key(finding_id, f"{reference[0]}/{reference[1]}") if reference else None
+        if key and idempotency.seen(key):
+            logger.info(f"Duplicate finding {finding_id} for {reference[0]} {reference[1]}, already restricted")
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': f"Duplicate finding, IAM {reference[0]} already restricted",
+                    'principal_type': principal['type'],
+                    'target_type': reference[0],
+                    'target_name': reference[1],
+                    'finding_id': finding_id,
+                    'duplicate': True
+                })
+            }
+        
+        target = resolve_principal(principal)
+        if not target:
+            logger.error(f"Could not resolve IAM principal: {principal}")
+            return {
+                'statusCode': 400,
+                'body': json.dumps({
+                    'error': 'Could not resolve IAM principal to a user or role in this account',
+                    'principal': principal
+                })
+            }
+        
+        if target['session']:
+            # 역할/페더레이션 세션: 기존 세션 무효화
+            logger.info(f"Revoking {principal['type']} sessions via {target['type']}: {target['name']}")
+            report = revoke_sessions(target)
+            message = 'IAM sessions successfully revoked'
+        else:
+            logger.info(f"Applying 'bad-iam' policy to IAM user: {target['name']}")
+            report = apply_bad_iam_policy(target['name'])
+            message = 'IAM user successfully restricted'
+            logger.info(
+                f"Successfully restricted user: {target['name']} "
+                f"({len(report['credentials'])} credentials revoked in {report['total_ms']} ms)"
+            )
+        # 일부 자격 증명 조회/회수가 실패했다면 재전달 시 다시 처리하도록 기록하지 않음
+        incomplete = report.get('errors') or [c for c in report.get('credentials', []) if c['status'] != 'revoked']
+        if key and not incomplete:
+            idempotency.mark(key)
+        elif incomplete:
+            logger.warning(f"Teardown incomplete for {target['type']} {target['name']}, not marking finding {finding_id} as handled")
+        
+        # 조치가 끝난 뒤 다음 호출용 인덱스 갱신 (실패해도 조치 결과에는 영향 없음)
+        try:
+            refresh_principal_index()
+        except ClientError as e:
+            logger.warning(f"Could not refresh principal index: {str(e)}")
         
-        logger.info(f"Successfully applied 'bad-iam' policy to user: {user_name}")
         return {
             'statusCode': 200,
             'body': json.dumps({
-                'message': 'IAM user successfully restricted',
-                'user_name': user_name,
-                'policy_name': POLICY_NAME
+                'message': message,
+                'principal_type': principal['type'],
+                'target_type': target['type'],
+                'target': target['arn'],
+                'user_name': target['name'] if target['type'] == 'user' else None,
+                'policy_name': REVOKE_SESSIONS_POLICY_NAME if target['session'] else POLICY_NAME,
+                'teardown': report
             })
         }
         
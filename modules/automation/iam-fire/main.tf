@@ -47,7 +47,7 @@ resource "aws_iam_role_policy" "iam-fire-lambda-policy" {
   role = aws_iam_role.iam-fire-lambda-role.id
   policy = jsonencode({
     Version = "2012-10-17"
-    Statement = [
+    Statement = concat([
       {
         Sid    = "AllowLambdaLogging"
         Effect = "Allow"
@@ -65,10 +65,40 @@ resource "aws_iam_role_policy" "iam-fire-lambda-policy" {
           "iam:GetUser",
           "iam:ListUserPolicies",
           "iam:ListAttachedUserPolicies",
-          "iam:ListAccessKeys"
+          "iam:ListAccessKeys",
+          "iam:GetLoginProfile",
+          "iam:ListSSHPublicKeys",
+          "iam:ListSigningCertificates",
+          "iam:ListServiceSpecificCredentials",
+          "iam:ListMFADevices"
         ]
         Resource = "arn:aws:iam::*:user/*"
       },
+      {
+        Sid    = "AllowPrincipalIndex"
+        Effect = "Allow"
+        Action = [
+          "iam:ListUsers",
+          "iam:ListRoles"
+        ]
+        Resource = "*"
+      },
+      {
+        Sid    = "AllowIAMRoleRead"
+        Effect = "Allow"
+        Action = [
+          "iam:GetRole"
+        ]
+        Resource = "arn:aws:iam::*:role/*"
+      },
+      {
+        Sid    = "AllowRoleSessionRevocation"
+        Effect = "Allow"
+        Action = [
+          "iam:PutRolePolicy"
+        ]
+        Resource = "arn:aws:iam::*:role/*"
+      },
       {
         Sid    = "AllowIAMUserPolicyManagement"
         Effect = "Allow"
@@ -86,11 +116,62 @@ resource "aws_iam_role_policy" "iam-fire-lambda-policy" {
           "iam:DeleteAccessKey"
         ]
         Resource = "arn:aws:iam::*:user/*"
+      },
+      {
+        Sid    = "AllowCredentialRevocation"
+        Effect = "Allow"
+        Action = [
+          "iam:DeleteLoginProfile",
+          "iam:DeleteSSHPublicKey",
+          "iam:DeleteSigningCertificate",
+          "iam:DeleteServiceSpecificCredential",
+          "iam:DeactivateMFADevice"
+        ]
+        Resource = "arn:aws:iam::*:user/*"
       }
-    ]
+    ], var.enable_idempotency_table ? [
+      {
+        Sid    = "AllowIdempotencyTable"
+        Effect = "Allow"
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:PutItem"
+        ]
+        Resource = aws_dynamodb_table.iam-fire-idempotency[0].arn
+      }
+    ] : [])
   })
 }
 
+# 중복 finding 처리 방지용 멱등성 테이블 (expires_at TTL)
+resource "aws_dynamodb_table" "iam-fire-idempotency" {
+  count        = var.enable_idempotency_table ? 1 : 0
+  name         = "${var.lambda_function_name}-idempotency"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "idempotency_key"
+
+  attribute {
+    name = "idempotency_key"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  server_side_encryption {
+    enabled = true
+  }
+
+  tags = merge(
+    var.tags,
+    {
+      Name = "${var.project_name}-iam-fire-idempotency"
+    }
+  )
+}
+
 resource "aws_lambda_function" "iam-fire-lambda" {
   function_name = var.lambda_function_name
   role = aws_iam_role.iam-fire-lambda-role.arn
@@ -100,6 +181,18 @@ resource "aws_lambda_function" "iam-fire-lambda" {
   runtime = var.lambda_runtime
   filename = data.archive_file.lambda_zip.output_path
   source_code_hash = data.archive_file.lambda_zip.output_base64sha256
+
+  environment {
+    variables = {
+      IDEMPOTENCY_TABLE_NAME      = var.enable_idempotency_table ? aws_dynamodb_table.iam-fire-idempotency[0].name : ""
+      IDEMPOTENCY_TTL_SECONDS     = tostring(var.idempotency_ttl_seconds)
+      TEARDOWN_MAX_WORKERS        = tostring(var.teardown_max_workers)
+      PRINCIPAL_INDEX_TTL_SECONDS = tostring(var.principal_index_ttl_seconds)
+      LOG_LEVEL                   = var.log_level
+      LOG_MAX_CHARS               = tostring(var.log_max_chars)
+      LOG_SAMPLE_RATE             = tostring(var.log_sample_rate)
+    }
+  }
 }
 
 data "archive_file" "lambda_zip" {
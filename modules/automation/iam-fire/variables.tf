@@ -46,3 +46,45 @@ variable "iam_policy_name" {
   type    = string
   default = "iam-fire-lambda-policy"
 }
+
+variable "enable_idempotency_table" {
+  description = "중복 GuardDuty finding 기록용 DynamoDB 테이블 사용 (false면 컨테이너 내 캐시만 사용)"
+  type        = bool
+  default     = false
+}
+
+variable "idempotency_ttl_seconds" {
+  description = "처리한 finding을 중복으로 간주하는 기간 (초)"
+  type        = number
+  default     = 86400
+}
+
+variable "teardown_max_workers" {
+  description = "자격 증명 회수 API 동시 호출 수"
+  type        = number
+  default     = 8
+}
+
+variable "principal_index_ttl_seconds" {
+  description = "IAM 사용자/역할 인덱스를 warm 컨테이너에서 재사용하는 기간 (초)"
+  type        = number
+  default     = 900
+}
+
+variable "log_level" {
+  description = "Lambda 로그 레벨 (DEBUG, INFO, WARNING, ERROR)"
+  type        = string
+  default     = "INFO"
+}
+
+variable "log_max_chars" {
+  description = "로그 한 줄에 기록할 JSON 최대 길이 (초과분은 잘라냄)"
+  type        = number
+  default     = 2048
+}
+
+variable "log_sample_rate" {
+  description = "수신 이벤트 요약을 기록할 호출 비율 (0~1, 오류 로그는 항상 기록)"
+  type        = number
+  default     = 1
+}
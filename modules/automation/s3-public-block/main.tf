@@ -9,7 +9,11 @@ resource "aws_cloudwatch_event_rule" "s3-public-block-rule" {
         "CreateBucket",
         "PutBucketAcl",
         "PutBucketPolicy",
-        "PutBucketPublicAccessBlock"
+        "PutBucketPublicAccessBlock",
+        "DeleteBucketPublicAccessBlock",
+        "PutObjectAcl",
+        "PutAccountPublicAccessBlock",
+        "DeleteAccountPublicAccessBlock"
       ]
     }
   })
@@ -48,7 +52,7 @@ resource "aws_iam_role_policy" "s3-public-block-lambda-policy" {
   role = aws_iam_role.s3-public-block-lambda-role.id
   policy = jsonencode({
     Version = "2012-10-17"
-    Statement = [
+    Statement = concat([
   {
     Action = [
       "s3:PutBucketPublicAccessBlock",
@@ -57,6 +61,13 @@ resource "aws_iam_role_policy" "s3-public-block-lambda-policy" {
     Effect = "Allow",
     Resource = ["arn:aws:s3:::*"]
   },
+  {
+    Action = [
+      "s3:PutAccountPublicAccessBlock"
+    ],
+    Effect = "Allow",
+    Resource = "*"
+  },
   {
     Action = [
       "logs:CreateLogGroup",
@@ -66,7 +77,15 @@ resource "aws_iam_role_policy" "s3-public-block-lambda-policy" {
     Effect = "Allow",
     Resource = "arn:aws:logs:*:*:*"
   }
-]
+], var.remove_cross_account_policy ? [
+  {
+    Action = [
+      "s3:DeleteBucketPolicy"
+    ],
+    Effect = "Allow",
+    Resource = ["arn:aws:s3:::*"]
+  }
+] : [])
   })
 }
 
@@ -86,4 +105,13 @@ resource "aws_lambda_function" "s3-public-block-lambda" {
 
   memory_size = var.lambda_memory_size
   timeout     = var.lambda_timeout
+
+  environment {
+    variables = {
+      SELF_ROLE_ARN               = aws_iam_role.s3-public-block-lambda-role.arn
+      PAB_CACHE_TTL_SECONDS       = tostring(var.pab_cache_ttl_seconds)
+      TRUSTED_ACCOUNT_IDS         = join(",", var.trusted_account_ids)
+      REMOVE_CROSS_ACCOUNT_POLICY = var.remove_cross_account_policy ? "true" : "false"
+    }
+  }
 }
\ No newline at end of file
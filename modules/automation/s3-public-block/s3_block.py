@@ -1,100 +1,383 @@
 import json
+import os
+import time
+from functools import lru_cache
 import boto3
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
-s3 = boto3.client('s3')
+# boto3 클라이언트 설정 (연결 풀, 적응형 재시도, 타임아웃)
+BOTO_CONFIG = Config(
+    max_pool_connections=20,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    connect_timeout=3,
+    read_timeout=10,
+)
+
+@lru_cache(maxsize=None)
+def get_client(service):
+    """
+    boto3 클라이언트를 처음 사용할 때 생성하고 컨테이너 수명 동안 재사용합니다.
+    """
+    return boto3.client(service, config=BOTO_CONFIG)
+
+PAB_FLAGS = ('BlockPublicAcls', 'IgnorePublicAcls', 'BlockPublicPolicy', 'RestrictPublicBuckets')
+FULL_PAB = {flag: True for flag in PAB_FLAGS}
+
+# 이 Lambda 실행 역할 ARN (자체 API 호출로 발생한 이벤트 무시용)
+SELF_ROLE_ARN = os.environ.get('SELF_ROLE_ARN', '')
+
+# 버킷별 마지막으로 확인한 Public Access Block 상태 캐시 (컨테이너 수명 동안 유지)
+PAB_CACHE_TTL_SECONDS = int(os.environ.get('PAB_CACHE_TTL_SECONDS', '60'))
+_pab_cache = {}
+
+# 버킷 정책/ACL 노출 분석
+EXPOSURE_EVENTS = ("CreateBucket", "PutBucketAcl", "PutBucketPolicy", "PutObjectAcl")
+ACCOUNT_PAB_EVENTS = ("PutAccountPublicAccessBlock", "DeleteAccountPublicAccessBlock")
+PUBLIC_ACL_GROUPS = (
+    "http://acs.amazonaws.com/groups/global/AllUsers",
+    "http://acs.amazonaws.com/groups/global/AuthenticatedUsers",
+)
+PUBLIC_CANNED_ACLS = {"public-read", "public-read-write", "authenticated-read"}
+ACL_GRANT_HEADERS = ("x-amz-grant-read", "x-amz-grant-write", "x-amz-grant-read-acp",
+                     "x-amz-grant-write-acp", "x-amz-grant-full-control")
+# 고정 값이면 와일드카드 Principal이라도 공개로 보지 않는 조건 키
+RESTRICTING_CONDITION_KEYS = {
+    "aws:sourcearn", "aws:sourcevpc", "aws:sourcevpce", "aws:sourceaccount", "aws:sourceowner",
+    "aws:sourceip", "aws:principalorgid", "aws:principalaccount", "aws:principalarn", "aws:userid",
+}
+RESTRICTING_CONDITION_OPERATORS = {
+    "stringequals", "stringequalsignorecase", "stringlike", "arnequals", "arnlike", "ipaddress",
+}
+TRUSTED_ACCOUNT_IDS = {a.strip() for a in os.environ.get('TRUSTED_ACCOUNT_IDS', '').split(',') if a.strip()}
+REMOVE_CROSS_ACCOUNT_POLICY = os.environ.get('REMOVE_CROSS_ACCOUNT_POLICY', 'false').lower() == 'true'
+
+def extract_bucket_name(detail):
+    """
+    다양한 이벤트 타입에 대해 버킷 이름 추출 시도
+    """
+    request_params = detail.get("requestParameters") or {}
+    response_elements = detail.get("responseElements") or {}
+    
+    # 1. requestParameters.bucketName (대부분의 이벤트)
+    if "bucketName" in request_params:
+        return request_params["bucketName"]
+    # 2. requestParameters.bucket (일부 이벤트)
+    if "bucket" in request_params:
+        return request_params["bucket"]
+    # 3. responseElements.bucketName (CreateBucket의 경우)
+    if "bucketName" in response_elements:
+        return response_elements["bucketName"]
+    return None
+
+def flag_enabled(value):
+    return value is True or str(value).lower() == 'true'
+
+def is_fully_blocked(config):
+    return bool(config) and all(flag_enabled(config.get(flag)) for flag in PAB_FLAGS)
+
+def as_list(value):
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+def owner_account_id(detail):
+    return detail.get("recipientAccountId") or (detail.get("userIdentity") or {}).get("accountId")
+
+def is_restricting_condition(condition):
+    """
+    와일드카드 Principal을 특정 계정/VPC/조직/IP로 한정하는 조건인지 확인
+    """
+    for operator, entries in (condition or {}).items():
+        if operator.lower() not in RESTRICTING_CONDITION_OPERATORS or not isinstance(entries, dict):
+            continue
+        for key, values in entries.items():
+            values = [str(v) for v in as_list(values)]
+            if (key.lower() in RESTRICTING_CONDITION_KEYS and values and
+                    not any('*' in v or v in ('0.0.0.0/0', '::/0') for v in values)):
+                return True
+    return False
+
+def principal_account(principal):
+    """
+    AWS Principal(계정 ID 또는 IAM ARN)에서 계정 ID 추출
+    """
+    if principal.isdigit():
+        return principal
+    parts = principal.split(':')
+    return parts[4] if len(parts) > 4 and parts[4] else None
+
+def analyze_policy(policy, owner_account):
+    """
+    버킷 정책의 Allow 문에서 공개/교차 계정 접근 분석
+    반환값: {'public': [문 ID], 'cross_account': [계정 ID]} 또는 분석 불가 시 None
+    """
+    if isinstance(policy, str):
+        try:
+            policy = json.loads(policy)
+        except ValueError:
+            return None
+    if not isinstance(policy, dict) or "Statement" not in policy:
+        return None
+    
+    exposure = {'public': [], 'cross_account': []}
+    for index, statement in enumerate(as_list(policy["Statement"])):
+        if statement.get("Effect") != "Allow":
+            continue
+        sid = statement.get("Sid", str(index))
+        restricted = is_restricting_condition(statement.get("Condition"))
+        
+        if "NotPrincipal" in statement:
+            if not restricted:
+                exposure['public'].append(sid)
+            continue
+        principal = statement.get("Principal")
+        if isinstance(principal, dict):
+            aws_principals = as_list(principal.get("AWS"))
+        else:
+            aws_principals = as_list(principal)
+        for aws_principal in aws_principals:
+            if aws_principal == "*":
+                if not restricted:
+                    exposure['public'].append(sid)
+                continue
+            account = principal_account(str(aws_principal))
+            if account and account != owner_account and account not in TRUSTED_ACCOUNT_IDS:
+                exposure['cross_account'].append(account)
+    return exposure
+
+def analyze_acl(request_params):
+    """
+    ACL(canned ACL, x-amz-grant-* 헤더, AccessControlPolicy)에서 공개/교차 계정 부여 분석
+    반환값: {'public': [부여 내용], 'cross_account': [canonical ID/이메일]} 또는 ACL 정보가 없으면 None
+    """
+    exposure = {'public': [], 'cross_account': []}
+    found = False
+    
+    for canned in as_list(request_params.get("x-amz-acl")):
+        found = True
+        if canned in PUBLIC_CANNED_ACLS:
+            exposure['public'].append(f"x-amz-acl: {canned}")
+    
+    for header in ACL_GRANT_HEADERS:
+        for value in as_list(request_params.get(header)):
+            found = True
+            for grantee in str(value).split(','):
+                grantee = grantee.strip()
+                if any(group in grantee for group in PUBLIC_ACL_GROUPS):
+                    exposure['public'].append(f"{header}: {grantee}")
+                elif grantee.startswith(('id=', 'emailAddress=')):
+                    exposure['cross_account'].append(grantee.split('=', 1)[1].strip('"'))
+    
+    acl_policy = request_params.get("AccessControlPolicy")
+    if isinstance(acl_policy, dict):
+        found = True
+        owner_id = (acl_policy.get("Owner") or {}).get("ID")
+        grants = as_list((acl_policy.get("AccessControlList") or {}).get("Grant"))
+        for grant in grants:
+            grantee = grant.get("Grantee") or {}
+            permission = grant.get("Permission")
+            if grantee.get("URI") in PUBLIC_ACL_GROUPS:
+                exposure['public'].append(f"{grantee['URI'].rsplit('/', 1)[-1]}: {permission}")
+            elif grantee.get("ID") and grantee["ID"] != owner_id:
+                exposure['cross_account'].append(grantee["ID"])
+            elif grantee.get("EmailAddress"):
+                exposure['cross_account'].append(grantee["EmailAddress"])
+    
+    return exposure if found else None
+
+def analyze_exposure(detail):
+    """
+    이벤트 요청 내용(버킷 정책 또는 ACL)만으로 노출 여부 분석 (AWS 호출 없음)
+    """
+    request_params = detail.get("requestParameters") or {}
+    if detail.get("eventName") == "PutBucketPolicy":
+        return analyze_policy(request_params.get("bucketPolicy"), owner_account_id(detail))
+    return analyze_acl(request_params)
+
+def is_self_event(detail):
+    """
+    이 Lambda 역할의 세션이 호출한 API 이벤트인지 확인 (sessionIssuer ARN 비교)
+    """
+    if not SELF_ROLE_ARN:
+        return False
+    identity = detail.get("userIdentity") or {}
+    issuer = (identity.get("sessionContext") or {}).get("sessionIssuer") or {}
+    return issuer.get("arn") == SELF_ROLE_ARN
+
+def classify_event(detail):
+    """
+    AWS 호출 없이 이벤트를 분류합니다.
+    반환값: (동작, 사유, 노출 분석 결과)
+    - ignore: 보호 설정을 약화시킬 수 없는 이벤트
+    - verify: 현재 Public Access Block 상태 확인 후 필요하면 적용 (요청 내용을 분석할 수 없는 경우)
+    - remediate: 보호 설정이 약화되었거나 공개 접근이 부여된 것이 확실하여 바로 적용
+    - cross_account: 신뢰하지 않는 계정에 접근 부여 (PAB로 막을 수 없음)
+    - remediate_account: 계정 수준 Public Access Block 약화
+    """
+    event_name = detail.get("eventName")
+    
+    if detail.get("errorCode"):
+        return 'ignore', f"API call failed ({detail['errorCode']})", None
+    if is_self_event(detail):
+        return 'ignore', 'Event caused by this function', None
+    
+    if event_name in ("PutBucketPublicAccessBlock", "PutAccountPublicAccessBlock"):
+        new_config = (detail.get("requestParameters") or {}).get("PublicAccessBlockConfiguration", {})
+        if is_fully_blocked(new_config):
+            return 'ignore', 'Public Access Block already properly configured', None
+        if event_name == "PutAccountPublicAccessBlock":
+            return 'remediate_account', 'Account Public Access Block weakened', None
+        return 'remediate', 'Public Access Block weakened', None
+    if event_name == "DeleteAccountPublicAccessBlock":
+        return 'remediate_account', 'Account Public Access Block deleted', None
+    if event_name == "DeleteBucketPublicAccessBlock":
+        return 'remediate', 'Public Access Block deleted', None
+    
+    if event_name in EXPOSURE_EVENTS:
+        exposure = analyze_exposure(detail)
+        if exposure is None:
+            return 'verify', f'{event_name} may expose bucket', None
+        if exposure['public']:
+            return 'remediate', f'{event_name} grants public access', exposure
+        if exposure['cross_account']:
+            return 'cross_account', f'{event_name} grants cross-account access', exposure
+        return 'ignore', f'{event_name} does not grant public or cross-account access', exposure
+    return 'verify', f'{event_name} may expose bucket', None
+
+def cache_pab(bucket_name, config):
+    _pab_cache[bucket_name] = (config, time.time() + PAB_CACHE_TTL_SECONDS)
+
+def get_pab(bucket_name):
+    """
+    버킷의 Public Access Block 설정 (TTL 캐시 우선, 없으면 조회)
+    """
+    cached = _pab_cache.get(bucket_name)
+    if cached and cached[1] > time.time():
+        return cached[0]
+    
+    try:
+        config = get_client('s3').get_public_access_block(Bucket=bucket_name).get("PublicAccessBlockConfiguration", {})
+    except ClientError as e:
+        # Public Access Block이 설정되지 않은 경우 빈 설정으로 처리
+        if e.response.get('Error', {}).get('Code', '') != 'NoSuchPublicAccessBlockConfiguration':
+            raise
+        config = {}
+    cache_pab(bucket_name, config)
+    return config
+
+def update_cache_from_event(bucket_name, detail):
+    """
+    성공한 PAB 변경 이벤트의 요청 내용으로 캐시 갱신 (API 호출 없음)
+    """
+    if detail.get("errorCode"):
+        return
+    event_name = detail.get("eventName")
+    if event_name == "PutBucketPublicAccessBlock":
+        new_config = (detail.get("requestParameters") or {}).get("PublicAccessBlockConfiguration", {})
+        cache_pab(bucket_name, {flag: flag_enabled(new_config.get(flag)) for flag in PAB_FLAGS})
+    elif event_name == "DeleteBucketPublicAccessBlock":
+        cache_pab(bucket_name, {})
+
+def remediate_account(detail):
+    """
+    계정 수준 Public Access Block 적용 (s3control 1회 호출)
+    """
+    account_id = owner_account_id(detail)
+    get_client('s3control').put_public_access_block(
+        AccountId=account_id,
+        PublicAccessBlockConfiguration=FULL_PAB
+    )
+    return account_id
 
 def lambda_handler(event, context):
     try:
         detail = event["detail"]
         event_name = detail.get("eventName")
         
-        # 다양한 이벤트 타입에 대해 버킷 이름 추출 시도
-        bucket_name = None
-        request_params = detail.get("requestParameters", {})
-        response_elements = detail.get("responseElements", {})
+        action, reason, exposure = classify_event(detail)
         
-        # 1. requestParameters.bucketName (대부분의 이벤트)
-        if "bucketName" in request_params:
-            bucket_name = request_params["bucketName"]
-        # 2. requestParameters.bucket (일부 이벤트)
-        elif "bucket" in request_params:
-            bucket_name = request_params["bucket"]
-        # 3. responseElements.bucketName (CreateBucket의 경우)
-        elif "bucketName" in response_elements:
-            bucket_name = response_elements["bucketName"]
+        # 계정 수준 Public Access Block 이벤트 (버킷 이름 없음)
+        if event_name in ACCOUNT_PAB_EVENTS:
+            if action == 'ignore':
+                return {
+                    'statusCode': 200,
+                    'body': json.dumps({'message': f'{reason}, skipping', 'event': event_name})
+                }
+            account_id = remediate_account(detail)
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': 'Account Public Access Block configured successfully',
+                    'account_id': account_id,
+                    'event': event_name,
+                    'reason': reason
+                })
+            }
         
+        bucket_name = extract_bucket_name(detail)
         if not bucket_name:
             return {
                 'statusCode': 400,
                 'body': json.dumps({'error': 'Bucket name not found in event'})
             }
         
-        # PutBucketPublicAccessBlock 이벤트인 경우, 현재 설정 확인
-        if event_name == "PutBucketPublicAccessBlock":
-            # 이벤트에서 변경하려는 설정 확인
-            new_config = request_params.get("PublicAccessBlockConfiguration", {})
-            block_public_acls = new_config.get("BlockPublicAcls", False)
-            ignore_public_acls = new_config.get("IgnorePublicAcls", False)
-            block_public_policy = new_config.get("BlockPublicPolicy", False)
-            restrict_public_buckets = new_config.get("RestrictPublicBuckets", False)
-            
-            # 이미 모든 설정이 True인 경우 무한 루프 방지를 위해 스킵
-            if block_public_acls and ignore_public_acls and block_public_policy and restrict_public_buckets:
-                return {
-                    'statusCode': 200,
-                    'body': json.dumps({
-                        'message': 'Public Access Block already properly configured, skipping',
-                        'bucket': bucket_name,
-                        'event': event_name
-                    })
-                }
-            
-            # 현재 버킷의 실제 설정 확인
-            try:
-                current_config = s3.get_public_access_block(Bucket=bucket_name)
-                current_pab = current_config.get("PublicAccessBlockConfiguration", {})
-                
-                # 이미 모든 설정이 True인 경우 스킵
-                if (current_pab.get("BlockPublicAcls") and 
-                    current_pab.get("IgnorePublicAcls") and 
-                    current_pab.get("BlockPublicPolicy") and 
-                    current_pab.get("RestrictPublicBuckets")):
-                    return {
-                        'statusCode': 200,
-                        'body': json.dumps({
-                            'message': 'Public Access Block already properly configured, skipping',
-                            'bucket': bucket_name,
-                            'event': event_name
-                        })
-                    }
-            except ClientError as e:
-                # Public Access Block이 설정되지 않은 경우 또는 다른 오류
-                error_code = e.response.get('Error', {}).get('Code', '')
-                if error_code == 'NoSuchPublicAccessBlockConfiguration':
-                    # Public Access Block이 설정되지 않은 경우 계속 진행
-                    pass
-                else:
-                    # 다른 오류인 경우 다시 발생시킴
-                    raise
+        update_cache_from_event(bucket_name, detail)
+        
+        # 보호 설정을 약화시킬 수 없는 이벤트는 AWS 호출 없이 스킵
+        if action == 'ignore':
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': f'{reason}, skipping',
+                    'bucket': bucket_name,
+                    'event': event_name
+                })
+            }
+        
+        # 교차 계정 접근은 PAB로 막을 수 없으므로 보고 (설정 시 버킷 정책 제거)
+        if action == 'cross_account':
+            policy_removed = False
+            if REMOVE_CROSS_ACCOUNT_POLICY and event_name == "PutBucketPolicy":
+                get_client('s3').delete_bucket_policy(Bucket=bucket_name)
+                policy_removed = True
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': f'{reason}' + (', bucket policy removed' if policy_removed else ''),
+                    'bucket': bucket_name,
+                    'event': event_name,
+                    'cross_account': sorted(set(exposure['cross_account'])),
+                    'policy_removed': policy_removed
+                })
+            }
+        
+        # 현재 버킷의 실제 설정 확인 (캐시 우선)
+        if action == 'verify' and is_fully_blocked(get_pab(bucket_name)):
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': 'Public Access Block already properly configured, skipping',
+                    'bucket': bucket_name,
+                    'event': event_name
+                })
+            }
         
         # Public Access Block 설정 적용
-        s3.put_public_access_block(
+        get_client('s3').put_public_access_block(
             Bucket=bucket_name,
-            PublicAccessBlockConfiguration={
-                'BlockPublicAcls': True,
-                'IgnorePublicAcls': True,
-                'BlockPublicPolicy': True,
-                'RestrictPublicBuckets': True
-            }
+            PublicAccessBlockConfiguration=FULL_PAB
         )
+        cache_pab(bucket_name, FULL_PAB)
         
         return {
             'statusCode': 200,
             'body': json.dumps({
                 'message': 'Public Access Block configured successfully',
                 'bucket': bucket_name,
-                'event': event_name
+                'event': event_name,
+                'reason': reason,
+                'public': exposure['public'] if exposure else []
             })
         }
         
@@ -48,3 +48,20 @@ variable "iam_policy_name" {
   default = "s3-public-block-lambda-policy"
 }
 
+variable "pab_cache_ttl_seconds" {
+  description = "버킷별 Public Access Block 상태 캐시 유지 시간 (초)"
+  type        = number
+  default     = 60
+}
+
+variable "trusted_account_ids" {
+  description = "버킷 정책/ACL에서 교차 계정 접근으로 보지 않을 계정 ID 목록"
+  type        = list(string)
+  default     = []
+}
+
+variable "remove_cross_account_policy" {
+  description = "신뢰하지 않는 계정에 접근을 부여한 버킷 정책을 제거 (false면 보고만 함)"
+  type        = bool
+  default     = false
+}
@@ -0,0 +1,371 @@
+"""
+automation Lambda 핸들러 콜드 스타트 벤치마크
+
+각 핸들러를 새 인터프리터에서 import 하여 아래 항목을 측정하고,
+저장된 baseline 대비 회귀 여부를 보고합니다.
+  - import 시간 (-X importtime 기준 상위 모듈 breakdown 포함)
+  - 메모리 최고점 (ru_maxrss)
+  - 첫 호출 / 두 번째 호출 지연 시간
+
+AWS 호출은 botocore before-call 이벤트(Stubber와 동일한 방식)로 가로채
+미리 정의한 응답을 반환하므로 네트워크 없이 실행됩니다.
+
+사용 예:
+  python scripts/bench_cold_start.py                      # 측정 + baseline 비교
+  python scripts/bench_cold_start.py --update-baseline    # baseline 갱신
+  python scripts/bench_cold_start.py --only sg_checker --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AUTOMATION_DIR = os.path.join(REPO_ROOT, "modules", "automation")
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "scripts", "cold_start_baseline.json")
+
+IMPORT_MARKER = "# bench: handler import start"
+
+# 핸들러별 소스 파일, 샘플 이벤트, 환경 변수, 스텁 응답
+HANDLERS = {
+    "sg_checker": {
+        "path": "SG-checker/sg_checker.py",
+        "env": {"AUTO_DELETE": "false"},
+        "event": {
+            "source": "aws.ec2",
+            "detail-type": "AWS API Call via CloudTrail",
+            "detail": {
+                "eventSource": "ec2.amazonaws.com",
+                "eventName": "AuthorizeSecurityGroupIngress",
+                "requestParameters": {"groupId": "sg-0123456789abcdef0"},
+            },
+        },
+        "responses": {
+            "DescribeSecurityGroups": {
+                "SecurityGroups": [{
+                    "GroupId": "sg-0123456789abcdef0",
+                    "GroupName": "bench",
+                    "IpPermissions": [{
+                        "IpProtocol": "tcp",
+                        "FromPort": 0,
+                        "ToPort": 65535,
+                        "IpRanges": [{"CidrIp": "0.0.0.0/0"}],
+                    }],
+                }],
+            },
+        },
+    },
+    "ec2_isol": {
+        "path": "bad-ec2-isol/ec2_isol.py",
+        "env": {"QUARANTINE_SECURITY_GROUP_ID": "sg-0quarantine000000"},
+        "event": {
+            "source": "aws.guardduty",
+            "detail-type": "GuardDuty Finding",
+            "detail": {
+                "id": "bench-finding",
+                "type": "CryptoCurrency:EC2/BitcoinTool.B",
+                "resource": {"instanceDetails": {"instanceId": "i-0123456789abcdef0"}},
+            },
+        },
+        "responses": {
+            "DescribeIamInstanceProfileAssociations": {
+                "IamInstanceProfileAssociations": [{
+                    "AssociationId": "iip-assoc-0123456789abcdef0",
+                    "InstanceId": "i-0123456789abcdef0",
+                }],
+            },
+        },
+    },
+    "iam_fire": {
+        "path": "iam-fire/iam_fire.py",
+        "env": {},
+        "event": {
+            "source": "aws.guardduty",
+            "detail-type": "GuardDuty Finding",
+            "detail": {
+                "id": "bench-finding",
+                "resource": {"accessKeyDetails": {
+                    "userName": "bench-user", "userType": "IAMUser", "principalId": "AIDABENCH",
+                }},
+            },
+        },
+        "responses": {
+            "GetUser": {"User": {
+                "UserName": "bench-user", "UserId": "AIDABENCH", "Path": "/",
+                "Arn": "arn:aws:iam::123456789012:user/bench-user",
+            }},
+            "ListUsers": {"Users": [{
+                "UserName": "bench-user", "UserId": "AIDABENCH", "Path": "/",
+                "Arn": "arn:aws:iam::123456789012:user/bench-user",
+            }]},
+            "ListRoles": {"Roles": []},
+            "ListAttachedUserPolicies": {"AttachedPolicies": []},
+            "ListAccessKeys": {"AccessKeyMetadata": []},
+        },
+    },
+    "s3_block": {
+        "path": "s3-public-block/s3_block.py",
+        "env": {},
+        "event": {
+            "source": "aws.s3",
+            "detail-type": "AWS API Call via CloudTrail",
+            "detail": {
+                "eventSource": "s3.amazonaws.com",
+                "eventName": "DeleteBucketPublicAccessBlock",
+                "requestParameters": {"bucketName": "bench-bucket"},
+            },
+        },
+        "responses": {},
+    },
+    "repair": {
+        "path": "ec2-monitoring-heal/repair.py",
+        "env": {},
+        "event": {
+            "source": "aws.ec2",
+            "detail-type": "AWS API Call via CloudTrail",
+            "detail": {
+                "eventName": "UnmonitorInstances",
+                "requestParameters": {"instancesSet": {"items": [{"instanceId": "i-0123456789abcdef0"}]}},
+            },
+        },
+        "responses": {
+            "DescribeInstances": {"Reservations": [{"Instances": [
+                {"InstanceId": "i-0123456789abcdef0", "Monitoring": {"State": "disabled"}},
+            ]}]},
+            "MonitorInstances": {"InstanceMonitorings": [
+                {"InstanceId": "i-0123456789abcdef0", "Monitoring": {"State": "pending"}},
+            ]},
+        },
+    },
+    "go_to_deep": {
+        "path": "go-to-deep/go-to-deep.py",
+        "env": {
+            "BACKUP_VAULT_NAME": "bench-vault",
+            "AURORA_CLUSTER_ID": "bench-cluster",
+            "S3_BUCKET_NAME": "bench-archive",
+            "AURORA_EXPORT_KMS_KEY_ARN": "arn:aws:kms:us-east-1:123456789012:key/bench",
+        },
+        "event": {"source": "aws.events", "detail-type": "Scheduled Event", "detail": {}},
+        "responses": {
+            "ListRecoveryPointsByBackupVault": {"RecoveryPoints": []},
+        },
+    },
+}
+
+# 새 인터프리터에서 실행되는 측정 코드 (핸들러 import 전 의존성을 최소화)
+CHILD_SCRIPT = r'''
+import importlib.util, json, os, resource, sys, time
+
+spec_name, path, event_json, responses_json = sys.argv[1:5]
+event = json.loads(event_json)
+responses = json.loads(responses_json)
+
+sys.stderr.write("%s\n")
+sys.stderr.flush()
+started = time.perf_counter()
+spec = importlib.util.spec_from_file_location(spec_name, path)
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+import_ms = (time.perf_counter() - started) * 1000
+
+import boto3
+from botocore.awsrequest import AWSResponse
+
+calls = []
+
+def stub_response(model, **kwargs):
+    calls.append(model.name)
+    return AWSResponse(None, 200, {}, None), dict(responses.get(model.name, {}))
+
+boto3.setup_default_session(region_name=os.environ["AWS_DEFAULT_REGION"])
+boto3.DEFAULT_SESSION.events.register("before-call.*.*", stub_response)
+# 핸들러가 이미 생성해 둔 클라이언트에도 스텁 적용
+for value in vars(module).values():
+    if hasattr(value, "meta") and hasattr(value.meta, "events"):
+        value.meta.events.register("before-call.*.*", stub_response)
+if hasattr(module, "get_client") and hasattr(module.get_client, "cache_clear"):
+    module.get_client.cache_clear()
+
+class Context:
+    function_name = spec_name
+    memory_limit_in_mb = 256
+    aws_request_id = "bench"
+    def get_remaining_time_in_millis(self):
+        return 300000
+
+started = time.perf_counter()
+first = module.lambda_handler(json.loads(json.dumps(event)), Context())
+first_ms = (time.perf_counter() - started) * 1000
+
+started = time.perf_counter()
+module.lambda_handler(json.loads(json.dumps(event)), Context())
+second_ms = (time.perf_counter() - started) * 1000
+
+print(json.dumps({
+    "import_ms": import_ms,
+    "first_invoke_ms": first_ms,
+    "second_invoke_ms": second_ms,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "status_code": (first or {}).get("statusCode") if isinstance(first, dict) else None,
+    "aws_calls": calls,
+}))
+''' % IMPORT_MARKER
+
+METRICS = ["import_ms", "first_invoke_ms", "second_invoke_ms", "max_rss_kb"]
+
+
+def parse_importtime(stderr, top):
+    """-X importtime 출력에서 핸들러 import 이후 상위 두 단계 모듈을 누적 시간 순으로 정렬"""
+    lines = stderr.splitlines()
+    if IMPORT_MARKER in lines:
+        lines = lines[lines.index(IMPORT_MARKER) + 1:]
+
+    modules = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 1:
+            modules.append({"module": name.strip(), "cumulative_us": int(parts[1])})
+
+    modules.sort(key=lambda m: m["cumulative_us"], reverse=True)
+    return modules[:top]
+
+
+def run_once(name, spec, python):
+    """핸들러 하나를 새 인터프리터에서 1회 측정"""
+    env = {
+        key: value for key, value in os.environ.items()
+        if not key.startswith("AWS_")
+    }
+    env.update({
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_SESSION_TOKEN": "testing",
+        "AWS_DEFAULT_REGION": "ap-northeast-2",
+        "AWS_EC2_METADATA_DISABLED": "true",
+        "AWS_CONFIG_FILE": os.devnull,
+        "AWS_SHARED_CREDENTIALS_FILE": os.devnull,
+        "PYTHONDONTWRITEBYTECODE": "1",
+    })
+    env.update(spec["env"])
+
+    proc = subprocess.run(
+        [
+            python, "-X", "importtime", "-c", CHILD_SCRIPT,
+            name,
+            os.path.join(AUTOMATION_DIR, spec["path"]),
+            json.dumps(spec["event"]),
+            json.dumps(spec["responses"]),
+        ],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=os.path.dirname(os.path.join(AUTOMATION_DIR, spec["path"])),
+    )
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"{name} failed:\n" + "\n".join(errors[-20:]))
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["importtime"] = parse_importtime(proc.stderr, top=10)
+    return result
+
+
+def measure(name, spec, runs, python):
+    """여러 번 측정 후 지표별 중앙값 반환"""
+    samples = [run_once(name, spec, python) for _ in range(runs)]
+    summary = {metric: statistics.median(s[metric] for s in samples) for metric in METRICS}
+    summary["status_code"] = samples[-1]["status_code"]
+    summary["aws_calls"] = len(samples[-1]["aws_calls"])
+    summary["importtime"] = samples[-1]["importtime"]
+    return summary
+
+
+def compare(results, baseline, threshold):
+    """baseline 대비 threshold 비율 이상 느려진(커진) 지표 목록"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in METRICS:
+            before = base.get(metric)
+            after = result.get(metric)
+            if before and after is not None and after > before * (1 + threshold):
+                regressions.append({
+                    "handler": name,
+                    "metric": metric,
+                    "baseline": round(before, 2),
+                    "current": round(after, 2),
+                    "change_pct": round((after / before - 1) * 100, 1),
+                })
+    return regressions
+
+
+def print_report(results, regressions):
+    header = f"{'handler':<12} {'import_ms':>10} {'first_ms':>10} {'second_ms':>10} {'max_rss_kb':>11} {'calls':>6}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(f"{name:<12} {r['import_ms']:>10.1f} {r['first_invoke_ms']:>10.1f} "
+              f"{r['second_invoke_ms']:>10.1f} {r['max_rss_kb']:>11.0f} {r['aws_calls']:>6}")
+
+    for name, r in results.items():
+        print(f"\n[{name}] top imports (cumulative)")
+        for m in r["importtime"]:
+            print(f"  {m['cumulative_us'] / 1000:>8.1f} ms  {m['module']}")
+
+    if regressions:
+        print("\nREGRESSIONS")
+        for reg in regressions:
+            print(f"  {reg['handler']}.{reg['metric']}: {reg['baseline']} -> {reg['current']} (+{reg['change_pct']}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the automation Lambda handlers")
+    parser.add_argument("--only", action="append", choices=sorted(HANDLERS), help="Handler to measure (repeatable)")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per handler (median is reported)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown ratio before reporting a regression")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the current results as the new baseline")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--python", default=sys.executable, help="Interpreter to benchmark with")
+    args = parser.parse_args(argv)
+
+    names = args.only or list(HANDLERS)
+    results = {name: measure(name, HANDLERS[name], args.runs, args.python) for name in names}
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.json:
+        print(json.dumps({"results": results, "regressions": regressions}, indent=2))
+    else:
+        print_report(results, regressions)
+
+    if args.update_baseline:
+        baseline.update({
+            name: {metric: round(r[metric], 2) for metric in METRICS}
+            for name, r in results.items()
+        })
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
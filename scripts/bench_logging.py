@@ -0,0 +1,124 @@
+"""
+automation Lambda 핸들러 이벤트 로그 비용 벤치마크
+
+큰 CloudTrail 형태의 이벤트를 만들어 호출당 로그 비용을 비교합니다.
+  - before: 이벤트 전체를 json.dumps 하여 f-string 으로 기록하던 방식
+  - after : 핸들러의 log_event (허용 목록 요약 + LazyJson 지연 직렬화)
+
+로그 핸들러는 메모리 스트림으로 출력하므로 호출당 시간과 기록된 바이트 수를
+함께 보고합니다. LOG_LEVEL 을 WARNING 으로 올린 경우도 측정하여
+INFO 로그가 꺼졌을 때 직렬화 비용이 사라지는지 확인합니다.
+
+사용 예:
+  python scripts/bench_logging.py
+  python scripts/bench_logging.py --only iam_fire --iterations 5000 --event-kb 256
+"""
+import argparse
+import importlib.util
+import io
+import json
+import logging
+import os
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AUTOMATION_DIR = os.path.join(REPO_ROOT, "modules", "automation")
+
+# 핸들러별 소스 파일과 기존 로그 메시지
+HANDLERS = {
+    "sg_checker": {"path": "SG-checker/sg_checker.py", "message": "Event"},
+    "ec2_isol": {"path": "bad-ec2-isol/ec2_isol.py", "message": "Received event"},
+    "iam_fire": {"path": "iam-fire/iam_fire.py", "message": "Received event"},
+}
+
+
+def build_event(size_kb):
+    """requestParameters/responseElements 합계가 약 size_kb 인 CloudTrail 이벤트 생성"""
+    items = []
+    while len(json.dumps(items)) < size_kb * 512:
+        index = len(items)
+        items.append({
+            "groupId": f"sg-{index:017x}",
+            "ipPermissions": {"items": [{
+                "ipProtocol": "tcp",
+                "fromPort": 1024,
+                "toPort": 65535,
+                "ipRanges": {"items": [{"cidrIp": f"10.{index % 256}.0.0/16"}]},
+            }]},
+        })
+    return {
+        "id": "7bf73129-1428-4cd3-a780-95db273d1602",
+        "source": "aws.ec2",
+        "detail-type": "AWS API Call via CloudTrail",
+        "time": "2026-01-01T00:00:00Z",
+        "account": "123456789012",
+        "region": "ap-northeast-2",
+        "detail": {
+            "eventSource": "ec2.amazonaws.com",
+            "eventName": "AuthorizeSecurityGroupIngress",
+            "eventID": "b5e8d2a1-0c1f-4f7e-9d3b-6a2f1e0c9b8a",
+            "awsRegion": "ap-northeast-2",
+            "requestParameters": {"items": items},
+            "responseElements": {"securityGroupRuleSet": {"items": items}},
+        },
+    }
+
+
+def load_handler(name, path):
+    """핸들러 모듈을 import (모듈 수준 AWS 호출 없음)"""
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    spec = importlib.util.spec_from_file_location(f"bench_{name}", os.path.join(AUTOMATION_DIR, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(log_once, iterations, stream):
+    """호출당 평균 시간(us)과 호출당 기록 바이트"""
+    stream.seek(0)
+    stream.truncate()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        log_once()
+    elapsed = time.perf_counter() - started
+    return elapsed / iterations * 1e6, len(stream.getvalue()) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", action="append", choices=sorted(HANDLERS), help="측정할 핸들러 (반복 지정 가능)")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--event-kb", type=int, default=64, help="샘플 이벤트 크기 (KB)")
+    args = parser.parse_args()
+
+    event = build_event(args.event_kb)
+    stream = io.StringIO()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.StreamHandler(stream))
+
+    print(f"event size: {len(json.dumps(event)) / 1024:.1f} KB, iterations: {args.iterations}")
+    print(f"{'handler':<12} {'level':<8} {'before us':>10} {'after us':>10} {'before B':>10} {'after B':>8}")
+    for name in args.only or sorted(HANDLERS):
+        module = load_handler(name, HANDLERS[name]["path"])
+        message = HANDLERS[name]["message"]
+        logger = module.logger
+
+        def before():
+            logger.info(f"{message}: {json.dumps(event)}")
+
+        def after():
+            module.log_event(message, event)
+
+        for level in ("INFO", "WARNING"):
+            logger.setLevel(level)
+            before_us, before_bytes = measure(before, args.iterations, stream)
+            after_us, after_bytes = measure(after, args.iterations, stream)
+            print(f"{name:<12} {level:<8} {before_us:>10.1f} {after_us:>10.1f} {before_bytes:>10.0f} {after_bytes:>8.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
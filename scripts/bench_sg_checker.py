@@ -0,0 +1,192 @@
+"""
+SG-checker 정책 평가 벤치마크
+
+합성 보안 그룹 수천 개를 만들어 아래 항목을 측정합니다 (AWS 호출 없음).
+  - 정책 컴파일 시간 (컨테이너당 1회)
+  - check_vulnerable_ports 전체/그룹당 평가 시간
+  - 권한/CIDR 수 대비 finding 수
+  - 공유 prefix list/참조 SG 해석에 사용한 EC2 API 호출 수 (가짜 클라이언트로 집계)
+  - 신뢰 대역 radix 인덱스 생성 시간과 CIDR 수만 개의 노출 분류 시간
+
+사용 예:
+  python scripts/bench_sg_checker.py
+  python scripts/bench_sg_checker.py --groups 20000 --rounds 5 --seed 7
+  python scripts/bench_sg_checker.py --prefix-lists 200 --prefix-list-size 50
+  python scripts/bench_sg_checker.py --cidrs 100000 --trusted-ranges 2000
+"""
+import argparse
+import importlib.util
+import ipaddress
+import logging
+import os
+import random
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HANDLER_PATH = os.path.join(REPO_ROOT, "modules", "automation", "SG-checker", "sg_checker.py")
+
+PROTOCOLS = ["tcp", "tcp", "tcp", "udp", "-1", "icmp", "6"]
+PORTS = [22, 25, 80, 443, 3389, 5432, 8080]
+IPV4_CIDRS = ["0.0.0.0/0", "10.0.0.0/8", "172.16.0.0/12", "192.168.1.0/24", "203.0.113.10/32"]
+IPV6_CIDRS = ["::/0", "2001:db8::/32", "fd00::/8"]
+
+
+def load_handler():
+    """핸들러 모듈을 import (모듈 수준 AWS 호출 없음)"""
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    spec = importlib.util.spec_from_file_location("bench_sg_checker", HANDLER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeEC2:
+    """prefix list/SG 조회 응답을 만들고 호출 수를 세는 EC2 클라이언트 대역"""
+
+    def __init__(self, prefix_list_size):
+        self.prefix_list_size = prefix_list_size
+        self.calls = {}
+
+    def _count(self, operation):
+        self.calls[operation] = self.calls.get(operation, 0) + 1
+
+    def get_paginator(self, operation):
+        fake = self
+
+        class Paginator:
+            def paginate(self, **kwargs):
+                fake._count(operation)
+                if operation == "describe_managed_prefix_lists":
+                    return [{"PrefixLists": [
+                        {"PrefixListId": pl, "Version": 1, "OwnerId": "123456789012"}
+                        for pl in kwargs["PrefixListIds"]
+                    ]}]
+                if operation == "describe_security_groups":
+                    return [{"SecurityGroups": [
+                        {"GroupId": g, "GroupName": f"ref-{g}"} for g in kwargs["Filters"][0]["Values"]
+                    ]}]
+                index = int(kwargs["PrefixListId"].rsplit("-", 1)[1], 16)
+                entries = [{"Cidr": f"10.{index % 256}.{i % 256}.0/24"} for i in range(fake.prefix_list_size)]
+                if index % 10 == 0:
+                    entries.append({"Cidr": "0.0.0.0/0"})
+                return [{"Entries": entries}]
+
+        return Paginator()
+
+
+def synthetic_permission(rng, prefix_lists):
+    """임의 프로토콜/포트 구간/IPv4·IPv6 CIDR/prefix list/참조 SG를 가진 권한 하나"""
+    protocol = rng.choice(PROTOCOLS)
+    perm = {"IpProtocol": protocol}
+    if protocol in ("tcp", "udp", "6"):
+        start = rng.choice(PORTS)
+        perm["FromPort"] = start if rng.random() < 0.7 else 0
+        perm["ToPort"] = start if rng.random() < 0.7 else 65535
+    elif protocol == "icmp":
+        perm["FromPort"] = perm["ToPort"] = -1
+    perm["IpRanges"] = [{"CidrIp": c} for c in rng.sample(IPV4_CIDRS, rng.randint(0, 3))]
+    perm["Ipv6Ranges"] = [{"CidrIpv6": c} for c in rng.sample(IPV6_CIDRS, rng.randint(0, 2))]
+    if prefix_lists and rng.random() < 0.2:
+        perm["PrefixListIds"] = [{"PrefixListId": f"pl-{rng.randrange(prefix_lists):017x}"}]
+    if rng.random() < 0.2:
+        owner = "123456789012" if rng.random() < 0.8 else "210987654321"
+        perm["UserIdGroupPairs"] = [{"GroupId": f"sg-ref{rng.randrange(100):014x}", "UserId": owner}]
+    return perm
+
+
+def random_cidr(rng):
+    """임의 IPv4(90%)/IPv6 CIDR (prefix 길이 고르게 분포)"""
+    if rng.random() < 0.9:
+        prefixlen = rng.randint(1, 32)
+        address = rng.getrandbits(32) >> (32 - prefixlen) << (32 - prefixlen)
+        return f"{ipaddress.IPv4Address(address)}/{prefixlen}"
+    prefixlen = rng.randint(1, 128)
+    address = rng.getrandbits(128) >> (128 - prefixlen) << (128 - prefixlen)
+    return f"{ipaddress.IPv6Address(address)}/{prefixlen}"
+
+
+def synthetic_groups(count, rng, prefix_lists=0):
+    """인바운드 1~8개, 아웃바운드 1~3개 권한을 가진 보안 그룹 목록"""
+    return [
+        {
+            "GroupId": f"sg-{index:017x}",
+            "GroupName": f"bench-{index}",
+            "OwnerId": "123456789012",
+            "IpPermissions": [synthetic_permission(rng, prefix_lists) for _ in range(rng.randint(1, 8))],
+            "IpPermissionsEgress": [synthetic_permission(rng, prefix_lists) for _ in range(rng.randint(1, 3))],
+        }
+        for index in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--groups", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=3, help="평가 반복 횟수 (최솟값 보고)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--prefix-lists", type=int, default=50, help="그룹들이 공유하는 prefix list 수")
+    parser.add_argument("--prefix-list-size", type=int, default=20, help="prefix list당 엔트리 수")
+    parser.add_argument("--cidrs", type=int, default=50000, help="분류할 임의 CIDR 수")
+    parser.add_argument("--trusted-ranges", type=int, default=500, help="인덱스에 넣을 임의 신뢰 대역 수")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    os.environ["TRUSTED_CIDRS"] = ",".join(
+        f"{ipaddress.IPv4Address(rng.getrandbits(24) << 8)}/{rng.randint(16, 28)}" for _ in range(args.trusted_ranges)
+    )
+    logging.disable(logging.INFO)
+    module = load_handler()
+
+    started = time.perf_counter()
+    index = module.get_cidr_index()
+    index_ms = (time.perf_counter() - started) * 1000
+    sample_cidrs = [random_cidr(rng) for _ in range(args.cidrs)]
+    classify = module.classify_cidr.__wrapped__
+    started = time.perf_counter()
+    classes = {}
+    for cidr in sample_cidrs:
+        cidr_class = classify(cidr)
+        classes[cidr_class] = classes.get(cidr_class, 0) + 1
+    classify_s = time.perf_counter() - started
+    print(f"CIDR index: {index.size} ranges in {index_ms:.2f} ms")
+    print(f"CIDR classification: {len(sample_cidrs)} cidrs in {classify_s * 1000:.1f} ms, "
+          f"{classify_s / len(sample_cidrs) * 1e6:.2f} us/cidr (uncached), classes {classes}")
+    ec2 = FakeEC2(args.prefix_list_size)
+    module.get_client = lambda service: ec2
+    groups = synthetic_groups(args.groups, random.Random(args.seed), args.prefix_lists)
+    permissions = sum(len(g["IpPermissions"]) + len(g["IpPermissionsEgress"]) for g in groups)
+    cidrs = sum(
+        len(p["IpRanges"]) + len(p["Ipv6Ranges"])
+        for g in groups for p in g["IpPermissions"] + g["IpPermissionsEgress"]
+    )
+
+    started = time.perf_counter()
+    policy = module.CompiledPolicy(module.DEFAULT_POLICY_RULES)
+    compile_ms = (time.perf_counter() - started) * 1000
+
+    # 첫 라운드는 cold 캐시 (prefix list 엔트리/참조 SG 조회 포함), 이후는 warm 컨테이너
+    timings = []
+    calls = []
+    findings = 0
+    for _ in range(args.rounds):
+        module.classify_cidr.cache_clear()
+        ec2.calls = {}
+        started = time.perf_counter()
+        resolver = module.ReferenceResolver()
+        resolver.prefetch(groups)
+        findings = sum(len(module.check_vulnerable_ports(sg, "", policy, resolver)) for sg in groups)
+        timings.append(time.perf_counter() - started)
+        calls.append(ec2.calls)
+    best = min(timings)
+
+    print(f"groups: {len(groups)}, permissions: {permissions}, cidrs: {cidrs}, findings: {findings}")
+    print(f"policy compile: {compile_ms:.2f} ms ({len(policy.rules)} rules, {len(policy.port_tables)} port tables)")
+    print(f"evaluation: {best * 1000:.1f} ms total, {best / len(groups) * 1e6:.1f} us/group, "
+          f"{best / max(cidrs, 1) * 1e6:.2f} us/cidr (best of {args.rounds})")
+    print(f"EC2 calls: cold {calls[0]}, warm {calls[-1]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -107,6 +107,10 @@ variable "cloudtrail_bucket_kms_key_arn" {
   default     = ""
 }
 
+variable "aurora_export_kms_key_arn" {
+  type        = string
+}
+
 variable "cloudtrail_bucket_kms_key_account_id" {
   type        = string
   default     = ""